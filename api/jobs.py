@@ -0,0 +1,92 @@
+# api/jobs.py
+from __future__ import annotations
+import asyncio, os, time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from storage.files import new_job_id
+
+# In-process job queue for long verifications: submit() returns a job id at
+# once, a fixed number of worker tasks on the event loop work through the
+# queue, and get() reports queued/running/done with the result. A full queue
+# raises QueueFull (the API answers 429) instead of growing without bound.
+WORKERS = int(os.getenv("CT_JOB_WORKERS", "4"))
+MAX_QUEUED = int(os.getenv("CT_JOB_QUEUE_MAX", "64"))
+KEEP_FINISHED = int(os.getenv("CT_JOB_KEEP", "1000"))  # finished jobs kept for polling
+
+class QueueFull(Exception):
+    pass
+
+class JobQueue:
+    def __init__(self, workers: int = WORKERS, max_queued: int = MAX_QUEUED, keep: int = KEEP_FINISHED):
+        self.workers = max(1, workers)
+        self.max_queued = max(1, max_queued)
+        self.keep = keep
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Create the queue and worker tasks on the running event loop (idempotent)."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def shutdown(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> str:
+        self.start()
+        job_id = new_job_id()
+        try:
+            self._queue.put_nowait((job_id, fn, args, kwargs))
+        except asyncio.QueueFull:
+            raise QueueFull(f"{self.depth} jobs already queued") from None
+        self._jobs[job_id] = {"job_id": job_id, "status": "queued", "submitted": time.time()}
+        self._prune()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        out = dict(job)
+        if job["status"] == "queued":
+            out["queue_depth"] = self.depth
+        return out
+
+    def _prune(self):
+        over = len(self._jobs) - self.keep
+        for job_id in [k for k, j in self._jobs.items() if j["status"] == "done"][:max(0, over)]:
+            del self._jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job_id, fn, args, kwargs = await self._queue.get()
+            job = self._jobs.setdefault(job_id, {"job_id": job_id})
+            job.update(status="running", started=time.time())
+            try:
+                job["result"] = await fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                job["error"] = "cancelled at shutdown"
+                raise
+            except Exception as e:
+                job["error"] = str(e)
+            finally:
+                job.update(status="done", finished=time.time())
+                self._queue.task_done()
+
+_queue: Optional[JobQueue] = None
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = JobQueue()
+    return _queue
@@ -1,10 +1,12 @@
 # api/main.py
 from __future__ import annotations
 from pathlib import Path
-import os
+import asyncio, json, os
+from contextlib import asynccontextmanager
+from typing import Optional
 from dotenv import load_dotenv
 from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 # --- Load environment early ---
@@ -16,20 +18,48 @@ if ENV_PATH.exists():
 else:
     print("⚠️  .env file not found — relying on system environment vars")
 
-from api.schemas import TranslateRequest
-from api.services import translate_only, translate_and_verify
-from storage.mongo import list_recent_jobs
-from storage.files import job_dir
+from api.schemas import Language, TranslateRequest, TranslateBatchRequest
+from api.services import (translate_only_async, translate_and_verify_async, translate_and_verify_targets_async,
+                          translate_many_async, translate_stream_async)
+from api.jobs import QueueFull, get_job_queue
+from api.warmup import Warmup, selected as warmup_steps
+from storage.mongo import close_writer, ensure_indexes, get_job_async, list_jobs_page_async, writer_stats
+from storage.files import get_index, load_artifact
+from storage.retention import CONFIGURED as RETENTION_CONFIGURED, get_retention
+from telemetry.metrics import render as render_metrics
 
 # --- FastAPI setup ---
-app = FastAPI(title="AI Code Translator & Verifier")
+def _ensure_indexes():
+    if not os.getenv("MONGODB_URI"):
+        return
+    try:
+        ensure_indexes()
+    except Exception as e:
+        print(f"⚠️ Could not create MongoDB indexes: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_job_queue().start()
+    if RETENTION_CONFIGURED:
+        get_retention().start()
+    indexes = asyncio.create_task(asyncio.to_thread(_ensure_indexes))  # in the background: Atlas may be slow to answer
+    app.state.warmup = Warmup(warmup_steps())
+    warm = asyncio.create_task(app.state.warmup.run())  # opt-in (CT_WARMUP); /ready reports when it is done
+    yield
+    await warm
+    await indexes
+    await get_job_queue().shutdown()
+    await asyncio.to_thread(close_writer)  # flush buffered job records before exit
+    if RETENTION_CONFIGURED:
+        get_retention().stop()
+
+app = FastAPI(title="AI Code Translator & Verifier", lifespan=lifespan)
 UI = ROOT / "ui"
-ART = ROOT / "artifacts"
-ART.mkdir(exist_ok=True)
+ART = ROOT / "artifacts"  # may not exist until the first job is saved
 
 # Serve UI and local artifacts
 app.mount("/ui", StaticFiles(directory=str(UI), html=True), name="ui")
-app.mount("/artifacts", StaticFiles(directory=str(ART), html=False), name="artifacts")
+app.mount("/artifacts", StaticFiles(directory=str(ART), html=False, check_dir=False), name="artifacts")
 
 @app.get("/")
 def root_page():
@@ -43,77 +73,166 @@ def health():
         "ok": True,
         "openai": bool(os.getenv("OPENAI_API_KEY")),
         "mongo": bool(os.getenv("MONGODB_URI")),
+        "mongo_writer": writer_stats(),
     }
 
+@app.get("/ready")
+def ready():
+    """Readiness: 503 until the CT_WARMUP steps have finished (liveness stays on /health)."""
+    warmup = getattr(app.state, "warmup", None)
+    body = warmup.report() if warmup is not None else {"ready": False, "warmup": {}}
+    return Response(json.dumps(body), status_code=200 if body["ready"] else 503, media_type="application/json")
+
+@app.get("/metrics")
+def metrics():
+    """Stage timings and counters in Prometheus text format."""
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 router = APIRouter(prefix="/api")
 
+def _target(req: TranslateRequest) -> str:
+    if req.target_lang is None:
+        raise HTTPException(422, "target_lang is required here (targets is only for translate_and_verify and jobs)")
+    return req.target_lang
+
+def _verify_call(req: TranslateRequest):
+    """(coroutine function, args, kwargs) for verifying req against target_lang or every language in targets."""
+    kwargs = dict(max_random=8, custom_inputs=req.inputs, param_count=req.param_count,
+                  use_cache=not req.no_cache, fail_fast=req.fail_fast)
+    func_name = req.function_name or "func"
+    if req.targets:
+        return translate_and_verify_targets_async, (req.source_lang, req.targets, req.code, func_name), kwargs
+    return translate_and_verify_async, (req.source_lang, req.target_lang, req.code, func_name), kwargs
+
 # --- Translation ---
 @router.post("/translate")
-def translate_ep(req: TranslateRequest):
-    out = translate_only(
+async def translate_ep(req: TranslateRequest):
+    out = await translate_only_async(
         req.source_lang,
-        req.target_lang,
+        _target(req),
         req.code,
         req.function_name or "func",
         param_count=req.param_count,
+        use_cache=not req.no_cache,
     )
     return {"translated_code": out}
 
+@router.post("/translate/stream")
+async def translate_stream_ep(req: TranslateRequest):
+    """
+    Server-Sent Events: `delta` events carry raw model output as it arrives,
+    then one `done` event with the normalized code and job id (or `error`).
+    """
+    target = _target(req)
+
+    async def events():
+        async for ev in translate_stream_async(
+            req.source_lang,
+            target,
+            req.code,
+            req.function_name or "func",
+            param_count=req.param_count,
+            use_cache=not req.no_cache,
+        ):
+            name = ev.pop("event")
+            yield f"event: {name}\ndata: {json.dumps(ev)}\n\n"
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # keep proxies from buffering the stream
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+@router.post("/translate_batch")
+async def translate_batch_ep(req: TranslateBatchRequest):
+    """Translate many functions in one call; items come back in order, each with code or an error."""
+    items = await translate_many_async(req.items, concurrency=req.concurrency)
+    return {"items": items}
+
 # --- Translation + Verification ---
 @router.post("/translate_and_verify")
-def translate_and_verify_ep(req: TranslateRequest):
-    res = translate_and_verify(
-        req.source_lang,
-        req.target_lang,
-        req.code,
-        req.function_name or "func",
-        max_random=8,
-        custom_inputs=req.inputs,
-        param_count=req.param_count,
-    )
-    return res
+async def translate_and_verify_ep(req: TranslateRequest):
+    """With `targets`, one grouped run and report per target language instead of a single target."""
+    fn, args, kwargs = _verify_call(req)
+    return await fn(*args, **kwargs)
+
+# --- Queued verification (submit, then poll) ---
+@router.post("/jobs", status_code=202)
+async def submit_job_ep(req: TranslateRequest):
+    """Queue a translate-and-verify run and return its id immediately; poll GET /api/jobs/{id}."""
+    fn, args, kwargs = _verify_call(req)
+    try:
+        job_id = get_job_queue().submit(fn, *args, **kwargs)
+    except QueueFull as e:
+        raise HTTPException(429, f"Job queue is full ({e}); retry later", headers={"Retry-After": "5"})
+    return {"job_id": job_id, "status": "queued"}
+
+@router.get("/jobs/{job_id}")
+async def job_status_ep(job_id: str):
+    """Status (queued / running / done) of a submitted job, with its result once done."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job
 
 # --- Job History from MongoDB Atlas ---
 @router.get("/history")
-def history(limit: int = 25):
-    """Retrieve full translation history (latest N jobs) from MongoDB Atlas."""
+async def history(
+    limit: int = 25,
+    cursor: Optional[str] = None,
+    source_lang: Optional[str] = None,
+    target_lang: Optional[str] = None,
+    min_pass_rate: Optional[float] = None,
+    max_pass_rate: Optional[float] = None,
+):
+    """
+    One page of job summaries from MongoDB Atlas, newest first. Pass the
+    returned next_cursor back as `cursor` for the following page.
+    """
     try:
-        items = list_recent_jobs(limit)
-        return {"items": items}
+        return await list_jobs_page_async(limit, cursor, source_lang, target_lang, min_pass_rate, max_pass_rate)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     except Exception as e:
-        return {"items": [], "error": str(e)}
+        return {"items": [], "next_cursor": None, "error": str(e)}
+
+@router.get("/history/{job_id}")
+async def history_detail(job_id: str):
+    """Full stored job (source, translation, cases, report)."""
+    try:
+        job = await get_job_async(job_id)
+    except Exception as e:
+        raise HTTPException(503, f"History unavailable: {e}")
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job
 
 # --- Local artifact download (optional) ---
 @router.get("/job/{job_id}/{kind}")
-def job_file(job_id: str, kind: str):
+def job_file(job_id: str, kind: str, lang: Optional[Language] = None):
     """
     Download artifact files for a specific job:
-    kind ∈ { 'source', 'translated', 'report' }
+    kind ∈ { 'source', 'translated', 'report' }; lang picks the target of a grouped job
     """
-    p = job_dir(job_id)
-    if not p.exists():
-        raise HTTPException(404, "Job not found")
-
-    if kind == "report":
-        f = p / "report.json"
-        if not f.exists():
-            raise HTTPException(404, "Report not found")
-        return FileResponse(f)
-
-    if kind == "source":
-        for s in ("source_python.txt", "source_java.txt", "source_c.txt", "source_cpp.txt"):
-            f = p / s
-            if f.exists():
-                return FileResponse(f)
-        raise HTTPException(404, "Source not found")
-
-    if kind == "translated":
-        for s in ("translated_python.txt", "translated_java.txt", "translated_c.txt", "translated_cpp.txt"):
-            f = p / s
-            if f.exists():
-                return FileResponse(f)
-        raise HTTPException(404, "Translated not found")
-
-    raise HTTPException(400, "Invalid kind")
+    if kind not in ("source", "translated", "report"):
+        raise HTTPException(400, "Invalid kind")
+    art = load_artifact(job_id, kind, lang)
+    if art is None:
+        raise HTTPException(404, f"{kind.capitalize()} not found for job {job_id}")
+    get_index().touch(job_id)  # recently downloaded jobs are evicted last
+    name, body = art
+    if isinstance(body, Path):
+        return FileResponse(body)
+    media = "application/json" if name.endswith(".json") else "text/plain; charset=utf-8"
+    return Response(body, media_type=media)  # bundled: served from memory, nothing extracted
+
+@router.get("/artifacts/usage")
+def artifacts_usage():
+    """Artifact disk usage, retention limits and reclaimed space (read-only)."""
+    return get_retention().report()
+
+@router.post("/artifacts/sweep")
+def artifacts_sweep():
+    """Apply the retention limits now (evicts artifacts); returns the updated usage report."""
+    rm = get_retention()
+    rm.sweep()
+    return rm.report()
 
 app.include_router(router)
@@ -1,14 +1,27 @@
 # api/schemas.py
 from __future__ import annotations
 from typing import Literal, List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 Language = Literal["python", "java", "c", "cpp"]
 
 class TranslateRequest(BaseModel):
     source_lang: Language
-    target_lang: Language
+    target_lang: Optional[Language] = None
+    targets: Optional[List[Language]] = None  # verify against several languages at once (translate_and_verify, jobs)
     code: str
     function_name: Optional[str] = None
     inputs: Optional[List[List[int]]] = None  # e.g., [[12,18],[0,5],[-4,6]]
-    param_count: Optional[int] = None
\ No newline at end of file
+    param_count: Optional[int] = None
+    no_cache: bool = False  # bypass the translation cache and force a fresh model call
+    fail_fast: bool = True  # stop verification at the first reference failure
+
+    @model_validator(mode="after")
+    def _needs_target(self):
+        if self.target_lang is None and not self.targets:
+            raise ValueError("target_lang or targets is required")
+        return self
+
+class TranslateBatchRequest(BaseModel):
+    items: List[TranslateRequest]
+    concurrency: Optional[int] = None  # max model calls in flight (capped server-side)
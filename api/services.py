@@ -1,29 +1,34 @@
 # api/services.py
 from __future__ import annotations
-from typing import Literal, Dict, Any, List, Optional
-import os, re
+from typing import Literal, Dict, Any, AsyncIterator, List, Optional
+import asyncio, os, re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
 
-# --- OpenAI Translation ---
-if not os.getenv("OPENAI_API_KEY"):
-    raise RuntimeError("❌ OPENAI_API_KEY not found in environment or .env file")
-
-from translator.openai_model import translate_with_openai as _llm_call
+# --- OpenAI Translation (the SDK loads, and the API key is checked, on the first model call) ---
+from translator.openai_model import translate_with_openai as _llm_call, translate_with_openai_async as _llm_call_async
+from translator.openai_model import stream_with_openai_async as _llm_stream
 from translator.prompts import make_prompt
 from translator.postprocess import postprocess_for
 
 from verifier.testgen import infer_param_count as infer_param_count_py, gen_examples
 from verifier.compare import build_report
 
-from verifier.runners.python_runner import run_python_func
-from verifier.runners.java_runner import run_java_func
-from verifier.runners.c_runner import run_c_func
-from verifier.runners.cpp_runner import run_cpp_func
+from verifier.runners.python_runner import run_python_func, run_python_batch, run_python_batch_async
+from verifier.runners.java_runner import run_java_func, run_java_batch, run_java_batch_async
+from verifier.runners.c_runner import run_c_func, run_c_batch, run_c_batch_async
+from verifier.runners.cpp_runner import run_cpp_func, run_cpp_batch, run_cpp_batch_async
+from verifier.sandbox import RunResult
+from verifier.executor import CaseBatch, CaseFailed, gather_cases
+from verifier.ref_cache import get_ref_cache
 
-from storage.mongo import save_full_job
-from storage.files import new_job_id, job_dir, save_text, save_json
+from storage.mongo import save_full_job, save_full_job_async, save_many_jobs, save_many_jobs_async
+from storage.files import BUNDLE, new_job_id, job_dir, save_bundle, save_text, save_json, record_job
+from telemetry.metrics import collect_timings, span
 
 Language = Literal["python", "java", "c", "cpp"]
+BATCH_CONCURRENCY = int(os.getenv("CT_BATCH_CONCURRENCY", "8"))  # max model calls in flight per batch
 
 # ---------- Helper: Infer parameter count ----------
 _SIG_RE = re.compile(r"\b(?:int|public\s+static\s+int)\s+([A-Za-z_]\w*)\s*\(([^)]*)\)")
@@ -56,6 +61,146 @@ def run_in_lang(lang: Language, code: str, func_name: str, args: List[int]):
         return run_cpp_func(code, func_name, args)
     raise ValueError(f"Unsupported language: {lang}")
 
+def run_cases(lang: Language, code: str, func_name: str, cases: List[List[int]]) -> List[RunResult]:
+    """Run every case in one go; compiled languages build their harness once per call."""
+    if lang == "python":
+        return run_python_batch(code, func_name, cases)
+    if lang == "java":
+        return run_java_batch(code, func_name, cases)
+    if lang == "c":
+        return run_c_batch(code, func_name, cases)
+    if lang == "cpp":
+        return run_cpp_batch(code, func_name, cases)
+    raise ValueError(f"Unsupported language: {lang}")
+
+async def run_cases_async(lang: Language, code: str, func_name: str, cases: List[List[int]]) -> List[RunResult]:
+    """Async twin of run_cases (C/C++ on asyncio subprocesses, Python/Java via their worker pools)."""
+    if lang == "python":
+        return await run_python_batch_async(code, func_name, cases)
+    if lang == "java":
+        return await run_java_batch_async(code, func_name, cases)
+    if lang == "c":
+        return await run_c_batch_async(code, func_name, cases)
+    if lang == "cpp":
+        return await run_cpp_batch_async(code, func_name, cases)
+    raise ValueError(f"Unsupported language: {lang}")
+
+# ---------- Shared pipeline steps (sync and async paths) ----------
+_LANGS = ("python", "java", "c", "cpp")
+
+def _translation_record(source_lang: str, target_lang: str, code: str, func_name: str, n: int, translated: str) -> Dict[str, Any]:
+    return {
+        "job_id": new_job_id(),
+        "timestamp": datetime.utcnow(),
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "function_name": func_name,
+        "param_count": n,
+        "source_code": code,
+        "translated_code": translated,
+        "verified": False,
+        "pass_rate": None,
+    }
+
+def _collect_cases(n: int, max_random: int, custom_inputs: Optional[List[List[int]]]) -> List[List[int]]:
+    cases: List[List[int]] = gen_examples(n, max_random=max_random)
+    if custom_inputs:
+        for tup in custom_inputs:
+            if isinstance(tup, list) and len(tup) == n and all(isinstance(x, int) for x in tup):
+                cases.append(tup)
+    return cases
+
+def _outputs(source_lang: str, target_lang: str, translated: str,
+             ref: List[RunResult], tgt: List[RunResult]) -> Any:
+    """(ref_out, tgt_out) stdout lists, or the error response for the first failed case."""
+    for r in ref:
+        if not r.ok:
+            return {"error": f"{source_lang} reference failed: {r.stderr}"}
+    for rr in tgt:
+        if not rr.ok:
+            return {
+                "translated_code": translated,
+                "error": f"{target_lang} run failed: {rr.stderr}"
+            }
+    return [r.stdout for r in ref], [rr.stdout for rr in tgt]
+
+def _ref_pending(source_lang: str, code: str, func_name: str,
+                 cases: List[List[int]]) -> Any:
+    """(memoized reference result or None per case, cases that still have to run)."""
+    cached = get_ref_cache().lookup(source_lang, code, func_name, cases)
+    return cached, [c for c, r in zip(cases, cached) if r is None]
+
+def _ref_merge(source_lang: str, code: str, func_name: str, cached: List[Optional[RunResult]],
+               todo: List[List[int]], fresh: List[RunResult]) -> List[RunResult]:
+    """Memoize the fresh reference results and put them back in case order."""
+    get_ref_cache().store(source_lang, code, func_name, todo, fresh)
+    it = iter(fresh)
+    return [r if r is not None else next(it) for r in cached]
+
+def _finish_verified(source_lang: str, target_lang: str, code: str, func_name: str, n: int,
+                     cases: List[List[int]], translated: str, report: Dict[str, Any]) -> Dict[str, Any]:
+    """Save local artifacts and return the verified job record."""
+    job_id = new_job_id()
+    if BUNDLE:
+        save_bundle(job_id, {f"source_{source_lang}.txt": code, f"translated_{target_lang}.txt": translated,
+                             "report.json": report})
+    else:
+        d = job_dir(job_id)
+        save_text(d / f"source_{source_lang}.txt", code)
+        save_text(d / f"translated_{target_lang}.txt", translated)
+        save_json(d / "report.json", report)
+    record_job(job_id, function_name=func_name)
+    return {
+        "job_id": job_id,
+        "timestamp": datetime.utcnow(),
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "function_name": func_name,
+        "param_count": n,
+        "cases": cases,
+        "pass_rate": float(report.get("pass_rate", 0.0)),
+        "source_code": code,
+        "translated_code": translated,
+        "report": report,
+        "verified": True,
+    }
+
+def _translate(source_lang: str, target_lang: str, code: str, func_name: str,
+               param_count: Optional[int], use_cache: bool) -> Dict[str, Any]:
+    """Translate (or just normalize, for same-language requests) and build the job record."""
+    if source_lang not in _LANGS or target_lang not in _LANGS:
+        raise ValueError("Unsupported language")
+
+    n = param_count or infer_param_count_generic(source_lang, code, func_name)
+
+    # Skip translation if same language (normalize only)
+    if source_lang == target_lang:
+        raw = code
+    else:
+        with span("prompt"):
+            prompt = make_prompt(source_lang, target_lang, func_name, n, code)
+        raw = _llm_call(prompt, use_cache=use_cache)
+    with span("postprocess", target_lang):
+        translated = postprocess_for(target_lang, func_name, n, raw)
+    return _translation_record(source_lang, target_lang, code, func_name, n, translated)
+
+async def _translate_async(source_lang: str, target_lang: str, code: str, func_name: str,
+                           param_count: Optional[int], use_cache: bool) -> Dict[str, Any]:
+    if source_lang not in _LANGS or target_lang not in _LANGS:
+        raise ValueError("Unsupported language")
+
+    n = param_count or infer_param_count_generic(source_lang, code, func_name)
+
+    if source_lang == target_lang:
+        raw = code
+    else:
+        with span("prompt"):
+            prompt = make_prompt(source_lang, target_lang, func_name, n, code)
+        raw = await _llm_call_async(prompt, use_cache=use_cache)
+    with span("postprocess", target_lang):
+        translated = postprocess_for(target_lang, func_name, n, raw)
+    return _translation_record(source_lang, target_lang, code, func_name, n, translated)
+
 # ---------- Translate Only ----------
 def translate_only(
     source_lang: Language,
@@ -63,45 +208,83 @@ def translate_only(
     code: str,
     func_name: str,
     param_count: Optional[int] = None,
+    use_cache: bool = True,
 ) -> str:
     """
-    Translate a function using OpenAI.
-    Also stores the translation job in MongoDB (without verification).
+    Translate a function using OpenAI (served from the translation cache when
+    possible). Also stores the translation job in MongoDB (without verification).
     """
-    if source_lang not in ("python", "java", "c", "cpp") or target_lang not in ("python", "java", "c", "cpp"):
-        raise ValueError("Unsupported language")
+    record = _translate(source_lang, target_lang, code, func_name, param_count, use_cache)
 
-    n = param_count or infer_param_count_generic(source_lang, code, func_name)
+    # --- Save immediately to MongoDB ---
+    try:
+        with span("persist"):
+            save_full_job(record)
+        print(f"🟢 Queued translation-only job {record['job_id']} for MongoDB.")
+    except Exception as e:
+        print(f"⚠️ Could not store translation-only job: {e}")
 
-    # Skip translation if same language (normalize only)
-    if source_lang == target_lang:
-        translated = postprocess_for(target_lang, func_name, n, code)
-    else:
-        prompt = make_prompt(source_lang, target_lang, func_name, n, code)
-        raw = _llm_call(prompt)
-        translated = postprocess_for(target_lang, func_name, n, raw)
+    return record["translated_code"]
+
+async def translate_only_async(
+    source_lang: Language,
+    target_lang: Language,
+    code: str,
+    func_name: str,
+    param_count: Optional[int] = None,
+    use_cache: bool = True,
+) -> str:
+    """Async twin of translate_only (async OpenAI client, async Mongo write)."""
+    record = await _translate_async(source_lang, target_lang, code, func_name, param_count, use_cache)
 
-    # --- Save immediately to MongoDB ---
     try:
-        job_id = new_job_id()
-        record = {
-            "job_id": job_id,
-            "timestamp": datetime.utcnow(),
-            "source_lang": source_lang,
-            "target_lang": target_lang,
-            "function_name": func_name,
-            "param_count": n,
-            "source_code": code,
-            "translated_code": translated,
-            "verified": False,
-            "pass_rate": None,
-        }
-        save_full_job(record)
-        print(f"🟢 Stored translation-only job {job_id} in MongoDB.")
+        with span("persist"):
+            await save_full_job_async(record)
+        print(f"🟢 Queued translation-only job {record['job_id']} for MongoDB.")
     except Exception as e:
         print(f"⚠️ Could not store translation-only job: {e}")
 
-    return translated
+    return record["translated_code"]
+
+async def translate_stream_async(
+    source_lang: Language,
+    target_lang: Language,
+    code: str,
+    func_name: str,
+    param_count: Optional[int] = None,
+    use_cache: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming translate_only: yields {"event": "delta", "text"} for raw model
+    output as it arrives, then {"event": "done", "translated_code", "job_id"}
+    with the postprocessed code (or {"event": "error", "error"}).
+    """
+    try:
+        if source_lang not in _LANGS or target_lang not in _LANGS:
+            raise ValueError("Unsupported language")
+        n = param_count or infer_param_count_generic(source_lang, code, func_name)
+        if source_lang == target_lang:
+            raw = code
+        else:
+            with span("prompt"):
+                prompt = make_prompt(source_lang, target_lang, func_name, n, code)
+            parts: List[str] = []
+            async for delta in _llm_stream(prompt, use_cache=use_cache):
+                parts.append(delta)
+                yield {"event": "delta", "text": delta}
+            raw = "".join(parts)
+        with span("postprocess", target_lang):
+            translated = postprocess_for(target_lang, func_name, n, raw)
+    except Exception as e:
+        yield {"event": "error", "error": str(e)}
+        return
+
+    record = _translation_record(source_lang, target_lang, code, func_name, n, translated)
+    try:
+        await save_full_job_async(record)
+    except Exception as e:
+        print(f"⚠️ Could not store translation-only job: {e}")
+    yield {"event": "done", "translated_code": translated, "job_id": record["job_id"]}
 
 # ---------- Translate + Verify ----------
 def translate_and_verify(
@@ -112,68 +295,299 @@ def translate_and_verify(
     max_random: int = 8,
     custom_inputs: Optional[List[List[int]]] = None,
     param_count: Optional[int] = None,
+    use_cache: bool = True,
+    fail_fast: bool = True,
 ) -> Dict[str, Any]:
     """
     Translate with OpenAI, execute both source & target on same test cases,
     compare outputs, and store full results in MongoDB Atlas.
+    Reference and target cases run concurrently; with fail_fast the first
+    reference failure cancels the work that has not started yet.
+    The response carries a `timings` block (ms per stage, see telemetry.metrics).
     """
+    with collect_timings() as timings:
+        res = _verify(source_lang, target_lang, code, func_name, max_random, custom_inputs, param_count,
+                      use_cache, fail_fast)
+    res["timings"] = timings.as_dict()
+    res["timeline"] = timings.timeline()
+    return res
+
+def _verify(source_lang: Language, target_lang: Language, code: str, func_name: str, max_random: int,
+            custom_inputs: Optional[List[List[int]]], param_count: Optional[int], use_cache: bool,
+            fail_fast: bool) -> Dict[str, Any]:
     n = param_count or infer_param_count_generic(source_lang, code, func_name)
-    cases: List[List[int]] = gen_examples(n, max_random=max_random)
-    if custom_inputs:
-        for tup in custom_inputs:
-            if isinstance(tup, list) and len(tup) == n and all(isinstance(x, int) for x in tup):
-                cases.append(tup)
+    cases = _collect_cases(n, max_random, custom_inputs)
 
-    translated = translate_only(source_lang, target_lang, code, func_name, param_count=n)
+    # The reference (source) compiles and runs on the case pool while the
+    # model call is in flight; memoized reference cases are not run again.
+    # The target starts as soon as its translation arrives.
+    cached, todo = _ref_pending(source_lang, code, func_name, cases)
+    ref = CaseBatch(source_lang, partial(run_cases, source_lang, code, func_name), todo)
+    try:
+        translated = translate_only(source_lang, target_lang, code, func_name, param_count=n, use_cache=use_cache)
+    except BaseException:
+        ref.cancel()
+        raise
+    tgt = CaseBatch(target_lang, partial(run_cases, target_lang, translated, func_name), cases)
+    if fail_fast:
+        bad = ref.first_failure()
+        if bad is not None:
+            tgt.cancel()
+            return {"error": f"{source_lang} reference failed: {bad.stderr}"}
 
-    # Run reference (source)
-    ref_out: List[str] = []
-    for args in cases:
-        r = run_in_lang(source_lang, code, func_name, args)
-        if not r.ok:
-            return {"error": f"{source_lang} reference failed: {r.stderr}"}
-        ref_out.append(r.stdout)
-
-    # Run translated (target)
-    tgt_out: List[str] = []
-    for args in cases:
-        rr = run_in_lang(target_lang, translated, func_name, args)
-        if not rr.ok:
-            return {
-                "translated_code": translated,
-                "error": f"{target_lang} run failed: {rr.stderr}"
-            }
-        tgt_out.append(rr.stdout)
+    ref_res = _ref_merge(source_lang, code, func_name, cached, todo, ref.results())
+    outs = _outputs(source_lang, target_lang, translated, ref_res, tgt.results())
+    if isinstance(outs, dict):
+        return outs
+    ref_out, tgt_out = outs
 
     # Compare
-    report = build_report(cases, ref_out, tgt_out)
+    with span("compare"):
+        report = build_report(cases, ref_out, tgt_out, ref_cached=[r is not None for r in cached])
+
+    # Save locally, then store full job (verified) in MongoDB
+    with span("persist"):
+        job_record = _finish_verified(source_lang, target_lang, code, func_name, n, cases, translated, report)
+        try:
+            save_full_job(job_record)
+            print(f"🟢 Queued verified job {job_record['job_id']} for MongoDB.")
+        except Exception as e:
+            print(f"⚠️ Failed to store verified job in MongoDB: {e}")
+
+    return {"job_id": job_record["job_id"], "translated_code": translated, "report": report}
+
+async def translate_and_verify_async(
+    source_lang: Language,
+    target_lang: Language,
+    code: str,
+    func_name: str,
+    max_random: int = 8,
+    custom_inputs: Optional[List[List[int]]] = None,
+    param_count: Optional[int] = None,
+    use_cache: bool = True,
+    fail_fast: bool = True,
+) -> Dict[str, Any]:
+    """
+    Async twin of translate_and_verify: the model call, compiles and runs are
+    awaited, so one worker can keep many verifications in flight.
+    """
+    with collect_timings() as timings:
+        res = await _verify_async(source_lang, target_lang, code, func_name, max_random, custom_inputs, param_count,
+                                  use_cache, fail_fast)
+    res["timings"] = timings.as_dict()
+    res["timeline"] = timings.timeline()
+    return res
 
-    # Save locally (optional)
+async def _verify_async(source_lang: Language, target_lang: Language, code: str, func_name: str, max_random: int,
+                        custom_inputs: Optional[List[List[int]]], param_count: Optional[int], use_cache: bool,
+                        fail_fast: bool) -> Dict[str, Any]:
+    n = param_count or infer_param_count_generic(source_lang, code, func_name)
+    cases = _collect_cases(n, max_random, custom_inputs)
+
+    async def target():
+        translated = await translate_only_async(source_lang, target_lang, code, func_name, param_count=n,
+                                                use_cache=use_cache)
+        return translated, await gather_cases(
+            target_lang, partial(run_cases_async, target_lang, translated, func_name), cases)
+
+    # The reference runs while the model call is in flight (a reference
+    # failure with fail_fast returns before the translation arrives); the
+    # target compiles and runs as soon as its translation is back.
+    cached, todo = _ref_pending(source_lang, code, func_name, cases)
+    tgt_task = asyncio.ensure_future(target())
+    ref_task = asyncio.ensure_future(gather_cases(
+        source_lang, partial(run_cases_async, source_lang, code, func_name), todo, fail_fast=fail_fast))
+    try:
+        ref_res = await ref_task
+        translated, tgt_res = await tgt_task
+    except CaseFailed as e:
+        return {"error": f"{source_lang} reference failed: {e.result.stderr}"}
+    finally:
+        ref_task.cancel()
+        tgt_task.cancel()
+
+    ref_res = _ref_merge(source_lang, code, func_name, cached, todo, ref_res)
+    outs = _outputs(source_lang, target_lang, translated, ref_res, tgt_res)
+    if isinstance(outs, dict):
+        return outs
+    ref_out, tgt_out = outs
+
+    with span("compare"):
+        report = build_report(cases, ref_out, tgt_out, ref_cached=[r is not None for r in cached])
+
+    with span("persist"):
+        job_record = await asyncio.to_thread(_finish_verified, source_lang, target_lang, code, func_name, n, cases, translated, report)
+        try:
+            await save_full_job_async(job_record)
+            print(f"🟢 Queued verified job {job_record['job_id']} for MongoDB.")
+        except Exception as e:
+            print(f"⚠️ Failed to store verified job in MongoDB: {e}")
+
+    return {"job_id": job_record["job_id"], "translated_code": translated, "report": report}
+
+# ---------- Multi-target Verify ----------
+def _finish_grouped(source_lang: str, code: str, func_name: str, n: int, cases: List[List[int]],
+                    results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Save local artifacts and return one job record covering every target."""
     job_id = new_job_id()
-    d = job_dir(job_id)
-    save_text(d / f"source_{source_lang}.txt", code)
-    save_text(d / f"translated_{target_lang}.txt", translated)
-    save_json(d / "report.json", report)
+    reports = {t: r["report"] for t, r in results.items() if "report" in r}
+    translations = {f"translated_{t}.txt": r["translated_code"] for t, r in results.items() if r.get("translated_code")}
+    if BUNDLE:
+        save_bundle(job_id, {f"source_{source_lang}.txt": code, **translations, "report.json": reports})
+    else:
+        d = job_dir(job_id)
+        save_text(d / f"source_{source_lang}.txt", code)
+        for name, text in translations.items():
+            save_text(d / name, text)
+        save_json(d / "report.json", reports)
+    # the group passes only as far as its weakest target; a target that
+    # failed to translate, compile or run counts as 0
+    pass_rate = min(float(reports[t]["pass_rate"]) if t in reports else 0.0 for t in results)
+    record_job(job_id, target_lang=",".join(results), function_name=func_name, pass_rate=pass_rate)
+    return {
+        "job_id": job_id,
+        "timestamp": datetime.utcnow(),
+        "source_lang": source_lang,
+        "target_lang": list(results),  # history filters on one language match any element
+        "function_name": func_name,
+        "param_count": n,
+        "cases": cases,
+        "pass_rate": pass_rate,
+        "failed_targets": [t for t in results if t not in reports],
+        "source_code": code,
+        "targets": results,
+        "grouped": True,
+        "verified": True,
+    }
+
+async def translate_and_verify_targets_async(
+    source_lang: Language,
+    targets: List[Language],
+    code: str,
+    func_name: str,
+    max_random: int = 8,
+    custom_inputs: Optional[List[List[int]]] = None,
+    param_count: Optional[int] = None,
+    use_cache: bool = True,
+    fail_fast: bool = True,
+) -> Dict[str, Any]:
+    """
+    Verify one source against several target languages: the translations are
+    requested concurrently, one case set is generated, the reference runs once
+    and every target runs in parallel. Returns a per-target result (report or
+    error) stored as a single grouped job.
+    """
+    with collect_timings() as timings:
+        res = await _verify_targets_async(source_lang, targets, code, func_name, max_random, custom_inputs,
+                                          param_count, use_cache, fail_fast)
+    res["timings"] = timings.as_dict()
+    res["timeline"] = timings.timeline()
+    return res
+
+async def _verify_targets_async(source_lang: Language, targets: List[Language], code: str, func_name: str,
+                                max_random: int, custom_inputs: Optional[List[List[int]]],
+                                param_count: Optional[int], use_cache: bool, fail_fast: bool) -> Dict[str, Any]:
+    targets = list(dict.fromkeys(targets))
+    if source_lang not in _LANGS or not targets or any(t not in _LANGS for t in targets):
+        raise ValueError("Unsupported language")
+    n = param_count or infer_param_count_generic(source_lang, code, func_name)
+    cases = _collect_cases(n, max_random, custom_inputs)
 
-    # --- Store full job (verified) in MongoDB ---
+    async def target(lang: str):
+        try:
+            translated = await translate_only_async(source_lang, lang, code, func_name, param_count=n,
+                                                    use_cache=use_cache)
+        except Exception as e:
+            return e, None
+        return translated, await gather_cases(lang, partial(run_cases_async, lang, translated, func_name), cases)
+
+    # All model calls and the reference run overlap; each target compiles
+    # and runs as soon as its own translation arrives.
+    cached, todo = _ref_pending(source_lang, code, func_name, cases)
+    tgt_tasks = {t: asyncio.ensure_future(target(t)) for t in targets}
+    ref_task = asyncio.ensure_future(gather_cases(
+        source_lang, partial(run_cases_async, source_lang, code, func_name), todo, fail_fast=fail_fast))
     try:
-        job_record = {
-            "job_id": job_id,
-            "timestamp": datetime.utcnow(),
-            "source_lang": source_lang,
-            "target_lang": target_lang,
-            "function_name": func_name,
-            "param_count": n,
-            "cases": cases,
-            "pass_rate": float(report.get("pass_rate", 0.0)),
-            "source_code": code,
-            "translated_code": translated,
-            "report": report,
-            "verified": True,
-        }
-        save_full_job(job_record)
-        print(f"🟢 Stored verified job {job_id} in MongoDB.")
-    except Exception as e:
-        print(f"⚠️ Failed to store verified job in MongoDB: {e}")
+        ref_res = _ref_merge(source_lang, code, func_name, cached, todo, await ref_task)
+        bad = next((r for r in ref_res if not r.ok), None)
+        if bad is not None:
+            return {"error": f"{source_lang} reference failed: {bad.stderr}"}
+        ref_out = [r.stdout for r in ref_res]
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for t in targets:
+            translated, tgt_res = await tgt_tasks[t]
+            if isinstance(translated, Exception):
+                results[t] = {"error": f"translation failed: {translated}"}
+                continue
+            outs = _outputs(source_lang, t, translated, ref_res, tgt_res)
+            if isinstance(outs, dict):
+                results[t] = outs
+                continue
+            with span("compare", t):
+                report = build_report(cases, ref_out, outs[1], ref_cached=[r is not None for r in cached])
+            results[t] = {"translated_code": translated, "report": report}
+    except CaseFailed as e:
+        return {"error": f"{source_lang} reference failed: {e.result.stderr}"}
+    finally:
+        ref_task.cancel()
+        for task in tgt_tasks.values():
+            task.cancel()
+
+    with span("persist"):
+        job_record = await asyncio.to_thread(_finish_grouped, source_lang, code, func_name, n, cases, results)
+        try:
+            await save_full_job_async(job_record)
+            print(f"🟢 Queued grouped job {job_record['job_id']} ({', '.join(targets)}) for MongoDB.")
+        except Exception as e:
+            print(f"⚠️ Failed to store grouped job in MongoDB: {e}")
+
+    return {"job_id": job_record["job_id"], "targets": results}
+
+# ---------- Batch Translate ----------
+def _batch_limit(concurrency: Optional[int]) -> int:
+    return max(1, min(concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY))
+
+def _batch_results(records: List[Any]) -> List[Dict[str, Any]]:
+    """Per-item responses in request order; failed items carry an error instead of code."""
+    out: List[Dict[str, Any]] = []
+    for rec in records:
+        if isinstance(rec, Exception):
+            out.append({"error": str(rec)})
+        else:
+            out.append({"job_id": rec["job_id"], "translated_code": rec["translated_code"]})
+    return out
+
+def translate_many(reqs: List[Any], concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Translate several TranslateRequest items with at most `concurrency` model
+    calls in flight (capped by CT_BATCH_CONCURRENCY). Results keep request
+    order; all successful jobs are stored with one bulk insert.
+    """
+    def one(req) -> Any:
+        try:
+            return _translate(req.source_lang, req.target_lang, req.code, req.function_name or "func",
+                              req.param_count, not req.no_cache)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=_batch_limit(concurrency), thread_name_prefix="ct-batch") as pool:
+        records = list(pool.map(one, reqs))
+    save_many_jobs([r for r in records if not isinstance(r, Exception)])
+    return _batch_results(records)
+
+async def translate_many_async(reqs: List[Any], concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Async twin of translate_many (one event loop, a semaphore as the concurrency cap)."""
+    sem = asyncio.Semaphore(_batch_limit(concurrency))
+
+    async def one(req) -> Any:
+        async with sem:
+            try:
+                return await _translate_async(req.source_lang, req.target_lang, req.code, req.function_name or "func",
+                                              req.param_count, not req.no_cache)
+            except Exception as e:
+                return e
 
-    return {"job_id": job_id, "translated_code": translated, "report": report}
\ No newline at end of file
+    records = await asyncio.gather(*(one(r) for r in reqs))
+    await save_many_jobs_async([r for r in records if not isinstance(r, Exception)])
+    return _batch_results(records)
@@ -0,0 +1,93 @@
+# api/warmup.py
+from __future__ import annotations
+import asyncio, os, shutil, time
+from typing import Any, Callable, Dict, List
+
+# Opt-in warm-up run from the app lifespan, so the first requests do not pay
+# for connections, SDK imports, compiler probes or worker start-up.
+# CT_WARMUP is a comma-separated list of steps, or "all" (every step except
+# "hf", which loads the local model and must be named explicitly). Steps run
+# in the background; /ready answers 503 until they have finished.
+WARMUP = os.getenv("CT_WARMUP", "")
+
+def _mongo() -> str:
+    if not os.getenv("MONGODB_URI"):
+        return "skipped (MONGODB_URI not set)"
+    from storage.mongo import _get_client
+    _get_client()  # connects and pings
+    return "connected"
+
+def _openai() -> str:
+    if not os.getenv("OPENAI_API_KEY"):
+        return "skipped (OPENAI_API_KEY not set)"
+    from translator.openai_model import _get_async_client, _get_client
+    _get_client()
+    _get_async_client()
+    return "clients ready"
+
+def _compilers() -> str:
+    from verifier.build_cache import compiler_id
+    found = [c for c in ("gcc", "g++", "javac") if shutil.which(c)]
+    for c in found:
+        compiler_id(c)  # version probe, part of every build cache key
+    return ", ".join(found) or "none installed"
+
+def _python_pool() -> str:
+    from verifier.runners.python_worker import get_pool
+    pool = get_pool()
+    return f"{pool.prestart()} workers started" if pool is not None else "disabled"
+
+def _java_pool() -> str:
+    if not shutil.which("javac"):
+        return "skipped (javac not installed)"
+    from verifier.runners.java_worker import get_pool
+    pool = get_pool()
+    return f"{pool.prestart(1)} JVM started" if pool is not None else "disabled"
+
+def _hf() -> str:
+    from translator.hf_model import _lazy_load
+    _lazy_load()
+    return "model loaded"
+
+STEPS: Dict[str, Callable[[], str]] = {
+    "mongo": _mongo, "openai": _openai, "compilers": _compilers,
+    "python": _python_pool, "java": _java_pool, "hf": _hf,
+}
+
+def selected(spec: str = WARMUP) -> List[str]:
+    names = [s.strip() for s in spec.split(",") if s.strip()]
+    if "all" in names:
+        return [s for s in STEPS if s != "hf"] + (["hf"] if "hf" in names else [])
+    unknown = [s for s in names if s not in STEPS]
+    if unknown:
+        print(f"⚠️ Ignoring unknown CT_WARMUP steps: {', '.join(unknown)}")
+    return [s for s in names if s in STEPS]
+
+class Warmup:
+    def __init__(self, steps: List[str]):
+        self.steps = steps
+        self.done = not steps
+        self.results: Dict[str, Any] = {}
+
+    async def run(self):
+        """Run the steps concurrently (each in a thread); failures are reported, not raised."""
+        async def one(name: str):
+            t0 = time.perf_counter()
+            try:
+                status = await asyncio.to_thread(STEPS[name])
+                self.results[name] = {"ok": True, "status": status}
+            except Exception as e:
+                self.results[name] = {"ok": False, "status": str(e)}
+                print(f"⚠️ Warm-up step {name} failed: {e}")
+            self.results[name]["seconds"] = round(time.perf_counter() - t0, 3)
+
+        try:
+            await asyncio.gather(*(one(s) for s in self.steps))
+        finally:
+            self.done = True
+        if self.steps:
+            summary = ", ".join(f"{k} ({v['status']})" for k, v in self.results.items())
+            print(f"🟢 Warm-up finished: {summary}")
+
+    def report(self) -> Dict[str, Any]:
+        return {"ready": self.done, "warmup": self.results}
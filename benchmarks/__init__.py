@@ -0,0 +1,4 @@
+# benchmarks/__init__.py
+# Offline performance tooling: `python -m benchmarks.run` (micro-benchmarks),
+# `python -m benchmarks.loadtest` (end-to-end load against local stand-ins)
+# and `python -m benchmarks.hf_backends` (local translator backends).
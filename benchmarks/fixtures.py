@@ -0,0 +1,44 @@
+# benchmarks/fixtures.py
+from __future__ import annotations
+import re
+from typing import Dict
+
+# The same small integer functions in every supported language, written
+# with the a0, a1, ... parameter names postprocess_for puts in signatures. Benchmarks
+# use them as sources, and the stub translator below answers with the
+# target-language version wrapped the way a model usually answers (in a
+# markdown fence), so postprocess_for does its normal work.
+FIXTURES: Dict[str, Dict[str, str]] = {
+    "gcd": {
+        "python": "def gcd(a0, a1):\n    a, b = abs(a0), abs(a1)\n    while b:\n        a, b = b, a % b\n    return a\n",
+        "c": "int gcd(int a0, int a1) {\n    int a = a0 < 0 ? -a0 : a0, b = a1 < 0 ? -a1 : a1;\n"
+             "    while (b) { int t = a % b; a = b; b = t; }\n    return a;\n}\n",
+        "cpp": "int gcd(int a0, int a1) {\n    int a = a0 < 0 ? -a0 : a0, b = a1 < 0 ? -a1 : a1;\n"
+               "    while (b) { int t = a % b; a = b; b = t; }\n    return a;\n}\n",
+        "java": "public static int gcd(int a0, int a1) {\n    int a = Math.abs(a0), b = Math.abs(a1);\n"
+                "    while (b != 0) { int t = a % b; a = b; b = t; }\n    return a;\n}\n",
+    },
+    "square": {
+        "python": "def square(a0):\n    return a0 * a0\n",
+        "c": "int square(int a0) {\n    return a0 * a0;\n}\n",
+        "cpp": "int square(int a0) {\n    return a0 * a0;\n}\n",
+        "java": "public static int square(int a0) {\n    return a0 * a0;\n}\n",
+    },
+}
+ARITY = {"gcd": 2, "square": 1}
+
+_TARGET_RE = re.compile(r"into (PYTHON|JAVA|CPP|C)\.")
+_SIG_RE = re.compile(r"(?:def|int)\s+(\w+)\(")
+
+def canned_translation(prompt: str) -> str:
+    """Model-style answer for a make_prompt() prompt about one of the FIXTURES."""
+    target = _TARGET_RE.search(prompt).group(1).lower()
+    func = next(m.group(1) for m in _SIG_RE.finditer(prompt) if m.group(1) in FIXTURES)
+    return f"```{target}\n{FIXTURES[func][target]}```"
+
+def stub_translate(prompt: str, use_cache: bool = True) -> str:
+    """Drop-in for translate_with_openai (no network)."""
+    return canned_translation(prompt)
+
+async def stub_translate_async(prompt: str, use_cache: bool = True) -> str:
+    return canned_translation(prompt)
@@ -0,0 +1,98 @@
+# benchmarks/hf_backends.py
+from __future__ import annotations
+import argparse, json, os, resource, statistics, subprocess, sys, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Compares the local translator's inference backends (translator/hf_model.py):
+#
+#   python -m benchmarks.hf_backends
+#   python -m benchmarks.hf_backends --configs torch:beam,int8:greedy --repeat 5 --out hf.json
+#
+# Each backend:decode pair runs in its own interpreter (so peak RSS is that
+# backend's alone) over prompts for the benchmark fixtures, one prompt at a
+# time. Reports load time, median/p95 latency, peak RSS, and output parity
+# against the first config (exact match of the decoded text).
+
+ROOT = Path(__file__).resolve().parents[1]
+CONFIGS = "torch:beam,torch:greedy,int8:beam,int8:greedy,onnx:beam,onnx:greedy"
+
+def _prompts() -> List[str]:
+    from benchmarks.fixtures import ARITY, FIXTURES
+    from translator.prompts import make_prompt
+    return [make_prompt("python", tgt, func, ARITY[func], FIXTURES[func]["python"])
+            for func in FIXTURES for tgt in ("c", "cpp", "java")]
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+def measure_one(repeat: int, max_new_tokens: int) -> Dict[str, Any]:
+    """Runs inside the child interpreter; backend and decoding come from the environment."""
+    from translator import hf_model
+    t0 = time.perf_counter()
+    hf_model._lazy_load()
+    load_s = time.perf_counter() - t0
+    rss_loaded = _peak_rss_mb()
+    prompts = _prompts()
+    outputs = [hf_model.translate_raw(p, max_new_tokens) for p in prompts]  # also warms up
+    samples = []
+    for _ in range(repeat):
+        for p in prompts:
+            t0 = time.perf_counter()
+            hf_model.translate_raw(p, max_new_tokens)
+            samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "load_s": round(load_s, 2),
+        "median_ms": round(statistics.median(samples), 1),
+        "p95_ms": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 1),
+        "rss_loaded_mb": round(rss_loaded, 1),
+        "rss_peak_mb": round(_peak_rss_mb(), 1),
+        "outputs": outputs,
+    }
+
+def _run_config(config: str, repeat: int, max_new_tokens: int) -> Dict[str, Any]:
+    backend, _, decode = config.partition(":")
+    env = dict(os.environ, CT_HF_BACKEND=backend, CT_HF_DECODE=decode or "beam", CT_HF_MAX_BATCH="1")
+    cp = subprocess.run([sys.executable, "-m", "benchmarks.hf_backends", "--child", "--repeat", str(repeat),
+                         "--max-new-tokens", str(max_new_tokens)], cwd=ROOT, env=env, capture_output=True, text=True)
+    lines = [l for l in cp.stdout.splitlines() if l.startswith("{")]
+    if cp.returncode != 0 or not lines:
+        err = (cp.stderr.strip().splitlines() or [f"exit code {cp.returncode}"])[-1]
+        return {"error": err}
+    return json.loads(lines[-1])
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Latency, memory and parity of the local translator backends.")
+    ap.add_argument("--configs", default=CONFIGS, help="backend:decode pairs; the first is the parity reference")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-new-tokens", type=int, default=256)
+    ap.add_argument("--out", help="write results as JSON")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure_one(args.repeat, args.max_new_tokens)))
+        return 0
+
+    results: Dict[str, Dict[str, Any]] = {}
+    ref: Optional[List[str]] = None
+    print(f"{'config':<14} {'load s':>7} {'median ms':>10} {'p95 ms':>9} {'peak MB':>8} {'parity':>7}")
+    for config in args.configs.split(","):
+        r = _run_config(config, args.repeat, args.max_new_tokens)
+        results[config] = r
+        if "error" in r:
+            print(f"{config:<14} ⚠️ {r['error']}")
+            continue
+        if ref is None:
+            ref = r["outputs"]
+        r["parity"] = round(sum(a == b for a, b in zip(r["outputs"], ref)) / len(ref), 3)
+        print(f"{config:<14} {r['load_s']:>7.2f} {r['median_ms']:>10.1f} {r['p95_ms']:>9.1f} "
+              f"{r['rss_peak_mb']:>8.0f} {r['parity']:>7.0%}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"🟢 Wrote {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
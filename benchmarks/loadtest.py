@@ -0,0 +1,210 @@
+# benchmarks/loadtest.py
+from __future__ import annotations
+import argparse, asyncio, json, math, os, random, socket, subprocess, sys, tempfile, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# End-to-end load test of api/main.py with OpenAI and MongoDB replaced by the
+# local stand-ins in benchmarks/standins.py:
+#
+#   python -m benchmarks.loadtest --concurrency 16 --requests 200
+#   python -m benchmarks.loadtest --endpoints translate_and_verify --targets c,cpp --latency 1.0 --jitter 0.3
+#   python -m benchmarks.loadtest --url http://127.0.0.1:8000   # drive a server you started yourself
+#
+# Without --url it starts the fake Responses API and the app (with an
+# in-memory Mongo) as subprocesses on free ports. Unless --cache is given,
+# requests bypass the translation cache and each source gets a unique
+# trailing comment (so single-flight coalescing does not merge them either):
+# every request reaches the fake model. Reports throughput, p50/p95/p99 latency and error rate per endpoint.
+
+ROOT = Path(__file__).resolve().parents[1]
+ENDPOINTS = ("translate", "translate_and_verify")
+
+# ---------- stand-in processes ----------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def serve_fake_openai(port: int, latency: float, jitter: float, fail_rate: float):
+    import uvicorn
+    from benchmarks.standins import fake_openai_app
+    uvicorn.run(fake_openai_app(latency, jitter, fail_rate), host="127.0.0.1", port=port, log_level="warning")
+
+def serve_app(port: int, mongo_latency: float):
+    import uvicorn
+    from benchmarks.standins import MemoryMongo
+    from storage import mongo
+    mongo._client = MemoryMongo(mongo_latency)  # _get_client() returns it; nothing dials out
+    from api.main import app
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+def _spawn(args: List[str], env: Dict[str, str], log) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", "benchmarks.loadtest", *args], cwd=ROOT, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {proc.returncode} before becoming ready")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+# ---------- load ----------
+def _payloads(endpoint: str, targets: List[str], cache: bool) -> List[Dict[str, Any]]:
+    from benchmarks.fixtures import FIXTURES
+    return [{"source_lang": "python", "target_lang": t, "code": FIXTURES[f]["python"], "function_name": f,
+             "no_cache": not cache} for f in FIXTURES for t in targets]
+
+def _pct(sorted_ms: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not sorted_ms:
+        return None
+    k = max(0, math.ceil(p / 100 * len(sorted_ms)) - 1)
+    return round(sorted_ms[k], 2)
+
+def summarize(samples: List[tuple], wall: float) -> Dict[str, Any]:
+    """samples: (latency_ms, ok, error) per request."""
+    lat = sorted(s[0] for s in samples if s[1])
+    errors: Dict[str, int] = {}
+    for _, ok, err in samples:
+        if not ok:
+            errors[err] = errors.get(err, 0) + 1
+    n = len(samples)
+    return {
+        "requests": n, "ok": len(lat), "error_rate": round((n - len(lat)) / n, 4) if n else 0.0,
+        "throughput_rps": round(n / wall, 2) if wall else 0.0,
+        "p50_ms": _pct(lat, 50), "p95_ms": _pct(lat, 95), "p99_ms": _pct(lat, 99),
+        "max_ms": round(lat[-1], 2) if lat else None, "errors": errors,
+    }
+
+async def _one(client: httpx.AsyncClient, endpoint: str, body: Dict[str, Any]) -> tuple:
+    t0 = time.perf_counter()
+    try:
+        r = await client.post(f"/api/{endpoint}", json=body)
+        ms = (time.perf_counter() - t0) * 1000
+        if r.status_code != 200:
+            return ms, False, f"HTTP {r.status_code}"
+        data = r.json()
+        if data.get("error"):
+            return ms, False, str(data["error"]).splitlines()[0][:80]
+        if endpoint == "translate_and_verify" and data.get("report", {}).get("pass_rate") != 1.0:
+            return ms, False, "verification did not pass"
+        return ms, True, ""
+    except httpx.HTTPError as e:
+        return (time.perf_counter() - t0) * 1000, False, type(e).__name__
+
+def _body(bodies: List[Dict[str, Any]], i: int, unique: bool) -> Dict[str, Any]:
+    body = bodies[i % len(bodies)]
+    return dict(body, code=f"{body['code']}# loadtest {i}\n") if unique else body
+
+async def drive(url: str, endpoint: str, bodies: List[Dict[str, Any]], requests: int, concurrency: int,
+                warmup: int, timeout: float, unique: bool = True) -> Dict[str, Any]:
+    """Issue `requests` calls with `concurrency` in flight; warm-up calls are not counted."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        for i in range(warmup):
+            await _one(client, endpoint, _body(bodies, requests + i, unique))
+        samples: List[tuple] = []
+        counter = iter(range(requests))
+
+        async def worker():
+            for i in counter:
+                samples.append(await _one(client, endpoint, _body(bodies, i, unique)))
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(samples, time.perf_counter() - t0)
+
+def _print(endpoint: str, r: Dict[str, Any]):
+    fmt = lambda v: "-" if v is None else f"{v:.1f}"
+    print(f"  {endpoint:<22} {r['requests']:>6} req  {r['throughput_rps']:>8.2f} req/s  "
+          f"p50 {fmt(r['p50_ms'])} ms  p95 {fmt(r['p95_ms'])} ms  p99 {fmt(r['p99_ms'])} ms  "
+          f"errors {r['error_rate']:.1%}")
+    for err, n in r["errors"].items():
+        print(f"      {n} x {err}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Load test /api/translate and /api/translate_and_verify.")
+    ap.add_argument("mode", nargs="?", default="run", choices=("run", "fake-openai", "app"))
+    ap.add_argument("--url", help="existing server to drive (skips starting the stand-ins)")
+    ap.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    ap.add_argument("--targets", default="c", help="target languages cycled through the request mix")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=100, help="per endpoint")
+    ap.add_argument("--warmup", type=int, default=4, help="uncounted requests per endpoint")
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--cache", action="store_true", help="let requests hit the translation cache")
+    ap.add_argument("--latency", type=float, default=0.5, help="fake model latency, seconds")
+    ap.add_argument("--jitter", type=float, default=0.1, help="uniform +/- jitter on the latency, seconds")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="fraction of fake model calls answering 500")
+    ap.add_argument("--mongo-latency", type=float, default=0.01, help="per-write delay of the in-memory Mongo")
+    ap.add_argument("--port", type=int, default=0)
+    ap.add_argument("--out", help="write the results as JSON")
+    args = ap.parse_args(argv)
+
+    if args.mode == "fake-openai":
+        serve_fake_openai(args.port, args.latency, args.jitter, args.fail_rate)
+        return 0
+    if args.mode == "app":
+        serve_app(args.port, args.mongo_latency)
+        return 0
+
+    procs: List[subprocess.Popen] = []
+    log = tempfile.NamedTemporaryFile("w+", prefix="ct_loadtest_", suffix=".log", delete=False)
+    url, fake = args.url, None
+    try:
+        if url is None:
+            oport, aport = _free_port(), _free_port()
+            fake = f"http://127.0.0.1:{oport}"
+            env = dict(os.environ, PYTHONUNBUFFERED="1")
+            procs.append(_spawn(["fake-openai", "--port", str(oport), "--latency", str(args.latency),
+                                 "--jitter", str(args.jitter), "--fail-rate", str(args.fail_rate)], env, log))
+            _wait_ready(f"{fake}/stats", procs[-1])
+            env.update(OPENAI_BASE_URL=f"{fake}/v1", OPENAI_API_KEY="loadtest", MONGODB_URI="mongodb://memory-standin",
+                       CT_TRANSLATION_CACHE_DB="")
+            procs.append(_spawn(["app", "--port", str(aport), "--mongo-latency", str(args.mongo_latency)], env, log))
+            url = f"http://127.0.0.1:{aport}"
+            _wait_ready(f"{url}/health", procs[-1])
+            print(f"🟢 Stand-ins up: app {url}, fake OpenAI {fake} ({args.latency}s ± {args.jitter}s); log {log.name}")
+
+        targets = args.targets.split(",")
+        results: Dict[str, Any] = {}
+        print(f"concurrency {args.concurrency}, {args.requests} requests per endpoint")
+        for endpoint in args.endpoints.split(","):
+            if endpoint not in ENDPOINTS:
+                raise SystemExit(f"unknown endpoint {endpoint!r} (choose from {', '.join(ENDPOINTS)})")
+            bodies = _payloads(endpoint, targets, args.cache)
+            random.Random(0).shuffle(bodies)
+            results[endpoint] = asyncio.run(drive(url, endpoint, bodies, args.requests, args.concurrency,
+                                                  args.warmup, args.timeout, not args.cache))
+            _print(endpoint, results[endpoint])
+        if fake:
+            results["fake_openai"] = httpx.get(f"{fake}/stats").json()
+        results["mongo_writer"] = httpx.get(f"{url}/health").json().get("mongo_writer")
+        if args.out:
+            doc = {"config": {k: v for k, v in vars(args).items() if k not in ("mode", "out")}, "results": results}
+            Path(args.out).write_text(json.dumps(doc, indent=2), encoding="utf-8")
+            print(f"🟢 Wrote {args.out}")
+        failed = any(r["error_rate"] > 0 for k, r in results.items() if k in ENDPOINTS)
+        return 1 if failed else 0
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            try:
+                p.wait(10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        log.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
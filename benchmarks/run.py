@@ -0,0 +1,218 @@
+# benchmarks/run.py
+"""
+Micro-benchmarks for the verification pipeline, offline (stub translator).
+
+  python -m benchmarks.run                                  # all groups, print a table
+  python -m benchmarks.run --out bench.json                 # also write JSON
+  python -m benchmarks.run --baseline benchmarks/baseline.json --max-regression 0.25
+
+Groups: runners (compile vs execute, cold vs warm, per case count),
+testgen, postprocess, report, pipeline (translate_and_verify end to end).
+Every result is a distribution over --repeat runs; comparisons use medians.
+"""
+from __future__ import annotations
+import argparse, contextlib, json, os, platform, shutil, statistics, subprocess, sys, tempfile, time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.fixtures import ARITY, FIXTURES, stub_translate
+from translator.postprocess import postprocess_for
+from verifier import build_cache
+from verifier.compare import build_report
+from verifier.sandbox import mkworkdir, cleanup, run_batch
+from verifier.testgen import gen_examples
+from verifier.runners import c_runner, cpp_runner, java_runner, python_runner, python_worker
+
+LANGS = ("python", "c", "cpp", "java")
+RESULTS: Dict[str, Dict[str, float]] = {}
+
+def measure(name: str, fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None):
+    """Time fn() `repeat` times (setup() runs untimed before each) and record ms stats."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    RESULTS[name] = {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(samples[0], 4),
+        "max_ms": round(samples[-1], 4),
+        "runs": len(samples),
+    }
+    print(f"  {name:<48} median {RESULTS[name]['median_ms']:>10.3f} ms   min {RESULTS[name]['min_ms']:>10.3f} ms")
+
+def _cases(n: int, arity: int) -> List[List[int]]:
+    return [[(i * 7 + k * 3) % 97 - 40 for k in range(arity)] for i in range(n)]
+
+def _available(lang: str) -> bool:
+    tool = {"python": sys.executable, "c": "gcc", "cpp": "g++", "java": "javac"}[lang]
+    return shutil.which(tool) is not None
+
+# ---------- runners ----------
+def _reset_python_pool():
+    pool = python_worker._pool
+    if pool is not None:
+        pool.shutdown()
+    python_worker._pool = None
+
+def _run_python_one(code: str, func_name: str, args: List[int]):
+    return python_runner.run_python_batch(code, func_name, [args])[0]
+
+_COMPILED = {"c": (c_runner, "prog.c"), "cpp": (cpp_runner, "prog.cpp")}
+
+def bench_runners(langs: List[str], counts: List[int], repeat: int):
+    func = "gcd"
+    for lang in langs:
+        if not _available(lang):
+            print(f"  (skipping {lang}: toolchain not installed)")
+            continue
+        code = FIXTURES[func][lang]
+        single = _cases(1, ARITY[func])[0]
+        if lang in _COMPILED:
+            mod, src = _COMPILED[lang]
+            sources = {src: mod._harness(code, func, ARITY[func])}
+            measure(f"runners.{lang}.compile.cold", lambda: build_cache.build(sources, mod.COMPILE_CMD, ["prog.exe"]),
+                    repeat, setup=build_cache.clear)
+            measure(f"runners.{lang}.compile.warm", lambda: build_cache.build(sources, mod.COMPILE_CMD, ["prog.exe"]), repeat)
+            exe_dir, _ = build_cache.build(sources, mod.COMPILE_CMD, ["prog.exe"])
+            work = mkworkdir("ct_bench_")
+            try:
+                for n in counts:
+                    cases = _cases(n, ARITY[func])
+                    measure(f"runners.{lang}.execute.n{n}", lambda: run_batch([str(exe_dir / "prog.exe")], work, cases), repeat)
+            finally:
+                cleanup(work)
+        # one case through the normal entry point: for python that is the worker
+        # pool, so cold (pool reset) and warm (pool running) measure different paths
+        run_func = {"python": _run_python_one, "c": c_runner.run_c_func,
+                    "cpp": cpp_runner.run_cpp_func, "java": java_runner.run_java_func}[lang]
+        run_batch_fn = {"python": python_runner.run_python_batch, "c": c_runner.run_c_batch,
+                        "cpp": cpp_runner.run_cpp_batch, "java": java_runner.run_java_batch}[lang]
+        cold = {"python": _reset_python_pool, "c": build_cache.clear, "cpp": build_cache.clear, "java": build_cache.clear}[lang]
+        measure(f"runners.{lang}.func.cold", lambda: run_func(code, func, single), repeat, setup=cold)
+        measure(f"runners.{lang}.func.warm", lambda: run_func(code, func, single), repeat)
+        for n in counts:
+            cases = _cases(n, ARITY[func])
+            measure(f"runners.{lang}.batch.cold.n{n}", lambda: run_batch_fn(code, func, cases), repeat, setup=cold)
+            measure(f"runners.{lang}.batch.warm.n{n}", lambda: run_batch_fn(code, func, cases), repeat)
+
+# ---------- pure-Python stages ----------
+def bench_testgen(counts: List[int], repeat: int):
+    for arity in (1, 2, 3):
+        for n in counts:
+            measure(f"testgen.gen_examples.p{arity}.r{n}", lambda: gen_examples(arity, max_random=n), repeat)
+
+def bench_postprocess(repeat: int):
+    for lang in LANGS:
+        raw = f"```{lang}\n{FIXTURES['gcd'][lang]}```"
+        measure(f"postprocess.{lang}", lambda: postprocess_for(lang, "gcd", 2, raw), repeat)
+
+def bench_report(counts: List[int], repeat: int):
+    for n in counts:
+        cases = _cases(n, 2)
+        outs = [f"{i}\n" for i in range(n)]
+        measure(f"report.build_report.n{n}", lambda: build_report(cases, outs, outs), repeat)
+
+# ---------- end to end ----------
+@contextlib.contextmanager
+def _scratch_artifacts() -> Iterator[Path]:
+    """Point job artifacts and their index at a temp dir, so runs leave artifacts/ alone."""
+    from storage import files
+    saved = files.ART, files.INDEX_DB, files._index
+    with tempfile.TemporaryDirectory(prefix="ct_bench_art_") as tmp:
+        files.ART, files.INDEX_DB, files._index = Path(tmp), Path(tmp) / ".index.sqlite3", None
+        try:
+            yield Path(tmp)
+        finally:
+            files.ART, files.INDEX_DB, files._index = saved
+
+def bench_pipeline(langs: List[str], repeat: int):
+    from api import services
+    services._llm_call = stub_translate
+    services.save_full_job = lambda job: None
+    with _scratch_artifacts():
+        for target in langs:
+            if target == "python" or not _available(target):
+                continue
+            src = FIXTURES["gcd"]["python"]
+            run = lambda: services.translate_and_verify("python", target, src, "gcd", max_random=8, use_cache=False)
+            measure(f"pipeline.python_to_{target}.cold", run, repeat, setup=build_cache.clear)
+            measure(f"pipeline.python_to_{target}.warm", run, repeat)
+
+# ---------- output / baseline ----------
+def _meta() -> Dict[str, object]:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.TimeoutExpired):
+        rev = ""
+    return {"when": datetime.utcnow().isoformat(timespec="seconds"), "git": rev, "python": platform.python_version(),
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], max_regression: float) -> List[str]:
+    """Names whose median got slower than the baseline by more than max_regression (a fraction)."""
+    slower = []
+    print(f"\n{'benchmark':<50} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(set(current) & set(baseline)):
+        old, new = baseline[name]["median_ms"], current[name]["median_ms"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > max_regression:
+            slower.append(name)
+            flag = "  << slower"
+        print(f"{name:<50} {old:>10.3f} {new:>10.3f} {change:>+7.0%}{flag}")
+    return slower
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--groups", default="runners,testgen,postprocess,report,pipeline")
+    ap.add_argument("--langs", default=",".join(LANGS))
+    ap.add_argument("--cases", default="1,8,32", help="case counts for runners/report/testgen")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", help="write results as JSON to this file")
+    ap.add_argument("--baseline", help="compare medians against a saved JSON result")
+    ap.add_argument("--max-regression", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args = ap.parse_args(argv)
+
+    groups = set(args.groups.split(","))
+    langs = [l for l in args.langs.split(",") if l in LANGS]
+    counts = [int(c) for c in args.cases.split(",")]
+    if "runners" in groups:
+        print("runners")
+        bench_runners(langs, counts, args.repeat)
+    if "testgen" in groups:
+        print("testgen")
+        bench_testgen(counts, max(args.repeat, 50))
+    if "postprocess" in groups:
+        print("postprocess")
+        bench_postprocess(max(args.repeat, 200))
+    if "report" in groups:
+        print("report")
+        bench_report(counts, max(args.repeat, 200))
+    if "pipeline" in groups:
+        print("pipeline")
+        bench_pipeline(langs, args.repeat)
+    _reset_python_pool()
+
+    doc = {"meta": _meta(), "results": RESULTS}
+    if args.out:
+        Path(args.out).write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        print(f"\n🟢 Wrote {len(RESULTS)} results to {args.out}")
+    if args.baseline:
+        base = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+        slower = compare(RESULTS, base, args.max_regression)
+        if slower:
+            print(f"\n⚠️ {len(slower)} benchmarks regressed by more than {args.max_regression:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
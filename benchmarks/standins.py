@@ -0,0 +1,120 @@
+# benchmarks/standins.py
+from __future__ import annotations
+import asyncio, itertools, json, random, threading, time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from benchmarks.fixtures import canned_translation
+
+# Local replacements for the two network services the API depends on, so a
+# load test measures this code base and not OpenAI or Atlas:
+#   fake_openai_app()  - POST /v1/responses with configurable latency, jitter and
+#                        failure rate; answers with the canned fixture translations
+#                        (plain and stream=True); GET /stats counts calls.
+#   MemoryMongo        - the slice of pymongo's client that storage.mongo writes
+#                        through, kept in memory with an optional per-write delay.
+
+# ---------- fake Responses API ----------
+def _response(text: str, model: str) -> Dict[str, Any]:
+    rid = f"resp_{random.getrandbits(48):012x}"
+    return {
+        "id": rid, "object": "response", "created_at": int(time.time()), "model": model, "status": "completed",
+        "output": [{"type": "message", "id": f"msg_{rid[5:]}", "role": "assistant", "status": "completed",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}]}],
+        "parallel_tool_calls": False, "tool_choice": "auto", "tools": [],
+        "usage": {"input_tokens": 0, "output_tokens": len(text.split()), "total_tokens": len(text.split())},
+    }
+
+def _sse(kind: str, body: Dict[str, Any], seq: int) -> str:
+    return f"event: {kind}\ndata: {json.dumps({'type': kind, 'sequence_number': seq, **body})}\n\n"
+
+def fake_openai_app(latency: float = 0.5, jitter: float = 0.1, fail_rate: float = 0.0, chunks: int = 8) -> FastAPI:
+    """`latency` +/- uniform `jitter` seconds per call; `fail_rate` of calls answer HTTP 500."""
+    app = FastAPI()
+    stats = {"calls": 0, "streams": 0, "failed": 0, "in_flight": 0, "max_in_flight": 0}
+
+    @app.get("/stats")
+    def get_stats():
+        return stats
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        body = await request.json()
+        stats["calls"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            delay = max(0.0, latency + random.uniform(-jitter, jitter))
+            if random.random() < fail_rate:
+                await asyncio.sleep(delay)
+                stats["failed"] += 1
+                return JSONResponse({"error": {"message": "injected failure", "type": "server_error"}}, status_code=500)
+            text = canned_translation(body["input"])
+            model = body.get("model", "fake")
+            if not body.get("stream"):
+                await asyncio.sleep(delay)
+                return _response(text, model)
+            stats["streams"] += 1
+        finally:
+            stats["in_flight"] -= 1
+
+        async def events():
+            seq = itertools.count()
+            final = _response(text, model)
+            yield _sse("response.created", {"response": {**final, "status": "in_progress", "output": []}}, next(seq))
+            step = max(1, -(-len(text) // chunks))
+            for i in range(0, len(text), step):
+                await asyncio.sleep(delay / chunks)
+                yield _sse("response.output_text.delta", {"item_id": final["output"][0]["id"], "output_index": 0,
+                                                          "content_index": 0, "delta": text[i:i + step]}, next(seq))
+            yield _sse("response.completed", {"response": final}, next(seq))
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+# ---------- in-memory Mongo ----------
+class MemoryCollection:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.docs: List[Dict[str, Any]] = []
+        self.upserts = 0
+        self._lock = threading.Lock()
+
+    def insert_many(self, docs, ordered: bool = True):
+        from bson import ObjectId
+        time.sleep(self.latency)
+        with self._lock:
+            for d in docs:
+                d.setdefault("_id", ObjectId())
+                self.docs.append(d)
+        return SimpleNamespace(inserted_ids=[d["_id"] for d in docs])
+
+    def bulk_write(self, ops, ordered: bool = True):
+        time.sleep(self.latency)
+        with self._lock:
+            self.upserts += len(ops)
+        return SimpleNamespace(upserted_count=len(ops))
+
+    def create_index(self, keys, **kw):
+        return kw.get("name", str(keys))
+
+class MemoryMongo:
+    """Stands in for MongoClient: client[db][coll] with insert_many / bulk_write / create_index."""
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._colls: Dict[tuple, MemoryCollection] = {}
+        self.admin = SimpleNamespace(command=lambda *a, **kw: {"ok": 1})
+
+    def __getitem__(self, db: str):
+        client = self
+
+        class _Db:
+            def __getitem__(self, name: str) -> MemoryCollection:
+                return client._colls.setdefault((db, name), MemoryCollection(client.latency))
+        return _Db()
+
+    def counts(self) -> Dict[str, int]:
+        return {f"{db}.{name}": len(c.docs) or c.upserts for (db, name), c in self._colls.items()}
@@ -0,0 +1,54 @@
+# storage/bundle.py
+from __future__ import annotations
+import os, struct, uuid, zipfile, zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+# Single-file job bundles: all artifacts of a job in one deflated zip. Each
+# member's data offset is recorded in the job index when the bundle is
+# written, so a download seeks straight to the member and inflates it
+# without reading the zip directory or extracting anything to disk.
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")  # zip local file header, fixed part
+_LOCAL_MAGIC = b"PK\x03\x04"
+
+class Member(NamedTuple):
+    name: str
+    offset: int  # start of the member's (compressed) data
+    csize: int
+    size: int
+    method: int
+
+def member_offsets(path: Path) -> List[Member]:
+    """Locate every member's data in a bundle (used on write and on index rebuild)."""
+    out: List[Member] = []
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as fh:
+        for info in zf.infolist():
+            fh.seek(info.header_offset)
+            fields = _LOCAL_HEADER.unpack(fh.read(_LOCAL_HEADER.size))
+            if fields[0] != _LOCAL_MAGIC:
+                raise zipfile.BadZipFile(f"bad local header for {info.filename} in {path}")
+            name_len, extra_len = fields[-2], fields[-1]
+            offset = info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+            out.append(Member(info.filename, offset, info.compress_size, info.file_size, info.compress_type))
+    return out
+
+def write_bundle(path: Path, members: Dict[str, str]) -> List[Member]:
+    """Atomically write `members` (name -> text) as one deflated zip."""
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        for name, text in members.items():
+            zf.writestr(name, text)
+    os.replace(tmp, path)
+    return member_offsets(path)
+
+def read_member(path: Path, offset: int, csize: int, method: int) -> bytes:
+    """Read one member by its recorded offset."""
+    with open(path, "rb") as fh:
+        fh.seek(offset)
+        raw = fh.read(csize)
+    if method == zipfile.ZIP_STORED:
+        return raw
+    if method == zipfile.ZIP_DEFLATED:
+        return zlib.decompress(raw, -15)
+    raise ValueError(f"unsupported zip compression method {method}")
@@ -2,10 +2,29 @@
 from __future__ import annotations
 from pathlib import Path
 from datetime import datetime
-import json, shutil, uuid
+from typing import Any, Dict, Optional, Tuple, Union
+import json, os, shutil, threading, uuid
+from storage.bundle import read_member, write_bundle
+from storage.job_index import JobIndex
 
-ART = Path(__file__).resolve().parents[1] / "artifacts"
-ART.mkdir(exist_ok=True)
+ART = Path(__file__).resolve().parents[1] / "artifacts"  # created on first write
+INDEX_DB = Path(os.getenv("CT_JOB_INDEX_DB", str(ART / ".index.sqlite3")))
+BUNDLE = os.getenv("CT_ARTIFACT_BUNDLE", "0") == "1"  # one <job_id>.zip per job instead of loose files
+
+_index: Optional[JobIndex] = None
+_index_lock = threading.Lock()
+
+def get_index() -> JobIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                fresh = not INDEX_DB.exists()
+                INDEX_DB.parent.mkdir(parents=True, exist_ok=True)
+                _index = JobIndex(INDEX_DB, ART)
+                if fresh:
+                    _index.rebuild()  # first run over an existing artifacts dir
+    return _index
 
 def new_job_id() -> str:
     ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
@@ -17,27 +36,55 @@ def job_dir(job_id: str) -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
+def _record(path: Path, size: int, obj: Any = None):
+    if path.parent.parent == ART:
+        get_index().record_file(path.parent.name, path.name, size, obj)
+
 def save_text(path: Path, text: str):
     path.write_text(text, encoding="utf-8")
+    _record(path, len(text.encode("utf-8")))
 
 def save_json(path: Path, obj):
-    path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    data = json.dumps(obj, ensure_ascii=False, indent=2)
+    path.write_text(data, encoding="utf-8")
+    _record(path, len(data.encode("utf-8")), obj)
+
+def save_bundle(job_id: str, members: Dict[str, Any]):
+    """Write a job's artifacts as one compressed bundle; dict/list members are stored as compact JSON."""
+    texts = {name: v if isinstance(v, str) else json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+             for name, v in members.items()}
+    ART.mkdir(exist_ok=True)
+    path = ART / f"{job_id}.zip"
+    get_index().record_bundle(path, write_bundle(path, texts),
+                              {n: v for n, v in members.items() if not isinstance(v, str)})
+
+def record_job(job_id: str, **fields):
+    """Index job metadata (languages, function name, pass rate) next to its files."""
+    get_index().record_job(job_id, **fields)
+
+def load_artifact(job_id: str, kind: str, lang: Optional[str] = None) -> Optional[Tuple[str, Union[Path, bytes]]]:
+    """
+    Artifact of `kind` (source / translated / report) for a job, via the
+    index: (file name, path) for a loose file or (member name, bytes) read
+    straight out of the job's bundle. `lang` picks one target of a grouped job.
+    """
+    if not job_id or job_id.startswith(".") or "/" in job_id or "\\" in job_id:
+        return None
+    idx = get_index()
+    loc = idx.locate(job_id, kind, lang)
+    if loc is None and not idx.has_job(job_id) and (ART / job_id).is_dir():
+        idx.index_dir(ART / job_id)  # written by an older version or another process
+        loc = idx.locate(job_id, kind, lang)
+    if loc is None:
+        return None
+    name, bundle, offset, size, method = loc
+    try:
+        if bundle:
+            return name, read_member(ART / bundle, offset, size, method)
+        p = ART / job_id / name
+        return (name, p) if p.exists() else None
+    except OSError:
+        return None
 
 def list_jobs(limit: int = 50):
-    items = []
-    for p in sorted(ART.glob("*"), reverse=True):
-        if not p.is_dir(): continue
-        rep = p / "report.json"
-        meta = p / "meta.json"
-        row = {"job_id": p.name}
-        if meta.exists():
-            try: row.update(json.loads(meta.read_text(encoding="utf-8")))
-            except: pass
-        if rep.exists():
-            try:
-                r = json.loads(rep.read_text(encoding="utf-8"))
-                row["pass_rate"] = r.get("pass_rate")
-            except: pass
-        items.append(row)
-        if len(items) >= limit: break
-    return items
+    return get_index().list_jobs(limit)
@@ -0,0 +1,257 @@
+# storage/job_index.py
+from __future__ import annotations
+import json, re, sqlite3, threading, time, zipfile, zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from storage.bundle import Member, member_offsets, read_member
+
+# SQLite index over the artifacts directory: one row per job (languages,
+# function, pass rate) and one per artifact file, so listing jobs and
+# resolving downloads are indexed queries instead of directory scans. Rows
+# are written by storage.files as artifacts are saved; `rebuild()` (also
+# `python -m storage.job_index rebuild`) recreates the index from disk.
+# Jobs stored as single-file bundles (<job_id>.zip) have their members
+# indexed with the bundle name and data offset (see storage/bundle.py).
+# Files are keyed by (job, file name): a grouped job has one translated file
+# per target language, told apart by the `lang` column.
+
+_FILE_RE = re.compile(r"^(source|translated)_(python|java|c|cpp)\.txt$")
+
+def classify(name: str) -> Optional[tuple]:
+    """(kind, lang) for an artifact file name, or None for files we do not index."""
+    m = _FILE_RE.match(name)
+    if m:
+        return m.group(1), m.group(2)
+    if name == "report.json":
+        return "report", None
+    if name == "meta.json":
+        return "meta", None
+    return None
+
+class JobIndex:
+    def __init__(self, path: Path, root: Path):
+        self.root = root
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY, source_lang TEXT, target_lang TEXT,
+                function_name TEXT, pass_rate REAL, meta TEXT, created REAL, accessed REAL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                job_id TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, size INTEGER NOT NULL,
+                bundle TEXT, offset INTEGER, method INTEGER, lang TEXT,
+                PRIMARY KEY (job_id, name)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_pair ON jobs (source_lang, target_lang, job_id);
+        """)
+        self._migrate_files()
+        have = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for col in ("created", "accessed"):  # indexes written before retention tracking
+            if col not in have:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {col} REAL")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_accessed ON jobs (accessed)")
+        self._db.commit()
+
+    def _migrate_files(self):
+        """Re-key a files table from an older version ((job_id, kind) primary key, fewer columns)."""
+        info = {row[1]: row[5] for row in self._db.execute("PRAGMA table_info(files)")}  # column -> pk position
+        if info.get("name") and "lang" in info:
+            return
+        cols = [c for c in ("job_id", "kind", "name", "size", "bundle", "offset", "method") if c in info]
+        rows = self._db.execute(f"SELECT {', '.join(cols)} FROM files").fetchall()
+        self._db.execute("DROP TABLE files")
+        self._db.execute("""
+            CREATE TABLE files (
+                job_id TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, size INTEGER NOT NULL,
+                bundle TEXT, offset INTEGER, method INTEGER, lang TEXT,
+                PRIMARY KEY (job_id, name)
+            )""")
+        for row in rows:
+            r = dict(zip(cols, row))
+            kc = classify(r["name"])
+            self._db.execute(
+                "INSERT OR REPLACE INTO files (job_id, kind, name, size, bundle, offset, method, lang) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (r["job_id"], r["kind"], r["name"], r["size"], r.get("bundle"), r.get("offset"), r.get("method"),
+                 kc[1] if kc else None))
+
+    def record_file(self, job_id: str, name: str, size: int, obj: Any = None):
+        """Index one saved artifact; `obj` is the JSON payload for report/meta files."""
+        with self._lock:
+            self._record_file(job_id, name, size, obj)
+            self._db.commit()
+
+    def record_bundle(self, bundle: Path, members: List[Member], objs: Dict[str, Any]):
+        """Index every member of a job bundle (`objs` holds the parsed JSON members)."""
+        with self._lock:
+            self._record_bundle(bundle, members, objs)
+            self._db.commit()
+
+    def _record_bundle(self, bundle: Path, members: List[Member], objs: Dict[str, Any], now: Optional[float] = None):
+        for m in members:
+            self._record_file(bundle.stem, m.name, m.csize, objs.get(m.name), now, bundle.name, m.offset, m.method)
+
+    def _record_file(self, job_id: str, name: str, size: int, obj: Any = None, now: Optional[float] = None,
+                     bundle: Optional[str] = None, offset: Optional[int] = None, method: Optional[int] = None):
+        kc = classify(name)
+        if kc is None:
+            return
+        kind, lang = kc
+        cols: Dict[str, Any] = {}
+        if kind == "source":
+            cols["source_lang"] = lang
+        elif kind == "translated":
+            cols["target_lang"] = lang
+        elif kind == "report" and isinstance(obj, dict):
+            cols["pass_rate"] = obj.get("pass_rate")
+        elif kind == "meta" and isinstance(obj, dict):
+            cols["meta"] = json.dumps(obj, ensure_ascii=False, default=str)
+            cols.update({k: obj[k] for k in ("source_lang", "target_lang", "function_name") if k in obj})
+        self._upsert_job(job_id, cols, now)
+        self._db.execute(
+            "INSERT OR REPLACE INTO files (job_id, kind, name, size, bundle, offset, method, lang) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, name, size, bundle, offset, method, lang))
+
+    def record_job(self, job_id: str, source_lang: Optional[str] = None, target_lang: Optional[str] = None,
+                   function_name: Optional[str] = None, pass_rate: Optional[float] = None):
+        """Index job-level fields that are not derivable from file names."""
+        cols = {k: v for k, v in (("source_lang", source_lang), ("target_lang", target_lang),
+                                  ("function_name", function_name), ("pass_rate", pass_rate)) if v is not None}
+        with self._lock:
+            self._upsert_job(job_id, cols)
+            self._db.commit()
+
+    def _upsert_job(self, job_id: str, cols: Dict[str, Any], now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self._db.execute("INSERT OR IGNORE INTO jobs (job_id, created, accessed) VALUES (?, ?, ?)", (job_id, now, now))
+        if cols:
+            sets = ", ".join(f"{k} = ?" for k in cols)
+            self._db.execute(f"UPDATE jobs SET {sets} WHERE job_id = ?", (*cols.values(), job_id))
+
+    def find_file(self, job_id: str, kind: str, lang: Optional[str] = None) -> Optional[str]:
+        loc = self.locate(job_id, kind, lang)
+        return loc[0] if loc else None
+
+    def locate(self, job_id: str, kind: str, lang: Optional[str] = None) -> Optional[tuple]:
+        """
+        (name, bundle, offset, size, method) of an artifact; bundle is None for a
+        loose file. Without `lang`, a job with several files of one kind (a
+        grouped job's translations) gives the first by name.
+        """
+        q = "SELECT name, bundle, offset, size, method FROM files WHERE job_id = ? AND kind = ?"
+        args: tuple = (job_id, kind)
+        if lang is not None:
+            q, args = q + " AND lang = ?", args + (lang,)
+        with self._lock:
+            return self._db.execute(q + " ORDER BY name LIMIT 1", args).fetchone()
+
+    def has_job(self, job_id: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone() is not None
+
+    def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Newest first (job ids start with their UTC timestamp)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_id, source_lang, target_lang, function_name, pass_rate, meta FROM jobs "
+                "ORDER BY job_id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        items = []
+        for job_id, src, tgt, fn, rate, meta in rows:
+            row: Dict[str, Any] = {"job_id": job_id}
+            if meta:
+                row.update(json.loads(meta))
+            row.update({k: v for k, v in (("source_lang", src), ("target_lang", tgt),
+                                          ("function_name", fn), ("pass_rate", rate)) if v is not None})
+            items.append(row)
+        return items
+
+    def touch(self, job_id: str):
+        """Mark a job as used now (downloads keep it away from LRU eviction)."""
+        with self._lock:
+            self._db.execute("UPDATE jobs SET accessed = ? WHERE job_id = ?", (time.time(), job_id))
+            self._db.commit()
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            jobs = self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+        return {"jobs": jobs, "bytes": size}
+
+    def by_last_access(self) -> List[tuple]:
+        """(job_id, created, accessed, bytes) for every job, least recently accessed first."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT j.job_id, j.created, j.accessed, COALESCE(SUM(f.size), 0) FROM jobs j "
+                "LEFT JOIN files f ON f.job_id = j.job_id GROUP BY j.job_id ORDER BY j.accessed, j.job_id"
+            ).fetchall()
+
+    def forget(self, job_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM files WHERE job_id = ?", (job_id,))
+            self._db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            self._db.commit()
+
+    def index_dir(self, job: Path):
+        """(Re)index every artifact in one job directory."""
+        with self._lock:
+            self._index_dir(job)
+            self._db.commit()
+
+    def _index_dir(self, job: Path):
+        try:
+            mtime = job.stat().st_mtime  # best guess at creation / last use for pre-existing jobs
+        except OSError:
+            return
+        for f in job.iterdir():
+            kc = classify(f.name)
+            if kc is None:
+                continue
+            obj = None
+            if f.suffix == ".json":
+                try:
+                    obj = json.loads(f.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    pass
+            self._record_file(job.name, f.name, f.stat().st_size, obj, mtime)
+
+    def _index_bundle(self, bundle: Path):
+        try:
+            mtime = bundle.stat().st_mtime
+            members = member_offsets(bundle)
+            objs = {}
+            for m in members:
+                if m.name.endswith(".json"):
+                    objs[m.name] = json.loads(read_member(bundle, m.offset, m.csize, m.method))
+        except (OSError, ValueError, zipfile.BadZipFile, zlib.error) as e:
+            print(f"⚠️ Skipping unreadable bundle {bundle.name}: {e}")
+            return
+        self._record_bundle(bundle, members, objs, mtime)
+
+    def rebuild(self) -> int:
+        """Drop every row and index the artifacts directory from scratch (one transaction); returns the job count."""
+        n = 0
+        with self._lock:
+            self._db.execute("DELETE FROM files")
+            self._db.execute("DELETE FROM jobs")
+            for p in sorted(self.root.iterdir()) if self.root.exists() else []:
+                if p.is_dir():
+                    self._index_dir(p)
+                    n += 1
+                elif p.suffix == ".zip" and not p.name.startswith("."):
+                    self._index_bundle(p)
+                    n += 1
+            self._db.commit()
+        return n
+
+if __name__ == "__main__":
+    import sys
+    from storage.files import get_index
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m storage.job_index rebuild")
+    t0 = time.perf_counter()
+    n = get_index().rebuild()
+    print(f"🟢 Indexed {n} jobs in {time.perf_counter() - t0:.2f}s")
@@ -1,10 +1,15 @@
 # storage/mongo.py
 from __future__ import annotations
-import os
+import asyncio, atexit, base64, hashlib, json, os, threading, time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 from datetime import datetime
-from pymongo import MongoClient, errors
 from pathlib import Path
 from dotenv import load_dotenv
+from telemetry.metrics import span
+
+if TYPE_CHECKING:
+    from pymongo import MongoClient
 
 # --------------------------------------------------------------------
 # Load environment (.env)
@@ -22,12 +27,16 @@ else:
 MONGO_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME", "code_translator")
 COLL_NAME = os.getenv("COLLECTION_NAME", "job_history")
+PAYLOAD_COLL_NAME = os.getenv("PAYLOAD_COLLECTION_NAME", f"{COLL_NAME}_payloads")
+PAYLOAD_TTL_DAYS = float(os.getenv("CT_PAYLOAD_TTL_DAYS", "0"))  # 0 = keep payloads forever
 
 _client: MongoClient | None = None
+_async_client = None
 
 # --------------------------------------------------------------------
 # Connect / Get client
 # --------------------------------------------------------------------
+# pymongo is imported on first use, not when this module is imported.
 def _get_client() -> MongoClient:
     global _client
     if _client is not None:
@@ -36,6 +45,7 @@ def _get_client() -> MongoClient:
     if not MONGO_URI:
         raise RuntimeError("❌ MONGODB_URI not found in environment or .env file")
 
+    from pymongo import MongoClient, errors
     try:
         _client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
         _client.admin.command("ping")
@@ -45,41 +55,425 @@ def _get_client() -> MongoClient:
         raise RuntimeError(f"❌ Could not connect to MongoDB Atlas: {e}") from e
 
 
+# --------------------------------------------------------------------
+# Summary / payload split
+# --------------------------------------------------------------------
+# The history collection only holds compact summaries. Source, translation
+# and the verification details (cases + report, or the per-target results of
+# a grouped job) are stored in a separate content-addressed collection keyed
+# by the sha256 of their content, so a re-run of the same code shares one
+# payload document. The summary keeps the hashes under "payload". With
+# CT_PAYLOAD_TTL_DAYS set, payloads not written again for that long expire
+# (a TTL index on "touched").
+PAYLOAD_FIELDS = {"source": ("source_code",), "translated": ("translated_code",), "details": ("cases", "report", "targets")}
+
+def _content_hash(kind: str, value) -> str:
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{kind}\0{raw}".encode("utf-8")).hexdigest()
+
+def split_job(doc: dict):
+    """(summary doc, [payload docs]) for one full job document."""
+    summary = dict(doc)
+    refs, payloads = {}, []
+    for kind, fields in PAYLOAD_FIELDS.items():
+        data = {f: summary.pop(f) for f in fields if f in summary}
+        if not data:
+            continue
+        h = _content_hash(kind, data)
+        refs[kind] = h
+        payloads.append({"_id": h, "kind": kind, "data": data})
+    if "cases" in doc:
+        summary["n_cases"] = len(doc["cases"] or [])
+    if refs:
+        summary["payload"] = refs
+    return summary, payloads
+
+def join_job(summary: dict, payloads: list) -> dict:
+    """Inverse of split_job; marks payloads that are gone (expired) instead of failing."""
+    doc = dict(summary)
+    found = {p["_id"]: p["data"] for p in payloads}
+    refs = doc.pop("payload", None) or {}
+    missing = [kind for kind, h in refs.items() if h not in found]
+    for kind, h in refs.items():
+        doc.update(found.get(h, {}))
+    if missing:
+        doc["payload_missing"] = missing
+    return doc
+
+def _payload_upserts(payloads: list, now: datetime) -> list:
+    from pymongo import UpdateOne
+    return [UpdateOne({"_id": p["_id"]}, {"$setOnInsert": {"kind": p["kind"], "data": p["data"]},
+                                         "$set": {"touched": now}}, upsert=True)
+            for p in payloads]
+
+# --------------------------------------------------------------------
+# Write-behind buffer
+# --------------------------------------------------------------------
+# Job documents are queued in memory and written by a background thread with
+# insert_many(ordered=False) once FLUSH_SIZE docs are waiting or FLUSH_SECS
+# have passed. When BUFFER_MAX docs are pending, writers block until the
+# flusher catches up (back-pressure), but for at most PUT_TIMEOUT seconds:
+# after that the record is logged and dropped rather than holding a request.
+# Failed batches are retried up to MAX_RETRIES times in a row; while the
+# database keeps failing beyond that, batches get one attempt and are then
+# dropped with a log line (the job artifacts on disk are unaffected), so an
+# outage drains the buffer instead of wedging it. Documents rejected by the
+# server itself are logged. CT_MONGO_WRITE_BEHIND=0 writes synchronously instead.
+WRITE_BEHIND = os.getenv("CT_MONGO_WRITE_BEHIND", "1") != "0"
+BUFFER_MAX = int(os.getenv("CT_MONGO_BUFFER_MAX", "1000"))
+FLUSH_SIZE = int(os.getenv("CT_MONGO_FLUSH_SIZE", "100"))
+FLUSH_SECS = float(os.getenv("CT_MONGO_FLUSH_SECS", "1.0"))
+RETRY_SECS = 2.0
+MAX_RETRIES = int(os.getenv("CT_MONGO_MAX_RETRIES", "5"))
+PUT_TIMEOUT = float(os.getenv("CT_MONGO_PUT_TIMEOUT", "5"))
+
+def _insert_many(docs: list):
+    """Upsert the payloads of `docs`, then insert their summaries (one bulk call each)."""
+    from pymongo import errors
+    db = _get_client()[DB_NAME]
+    summaries, payloads = [], {}
+    for doc in docs:
+        summary, parts = split_job(doc)
+        summaries.append(summary)
+        payloads.update((p["_id"], p) for p in parts)
+    with span("mongo_write"):
+        if payloads:
+            try:
+                db[PAYLOAD_COLL_NAME].bulk_write(_payload_upserts(list(payloads.values()), datetime.utcnow()), ordered=False)
+            except errors.BulkWriteError as e:
+                # keep the summaries: a job with a missing payload still shows up in history
+                print(f"⚠️ MongoDB rejected job payloads: {e.details.get('writeErrors', [])[:1]}")
+        return db[COLL_NAME].insert_many(summaries, ordered=False)
+
+class JobWriter:
+    def __init__(self, insert=_insert_many, max_docs: int = BUFFER_MAX,
+                 flush_size: int = FLUSH_SIZE, flush_secs: float = FLUSH_SECS, max_retries: int = MAX_RETRIES):
+        self._insert = insert
+        self.max_docs = max(1, max_docs)
+        self.flush_size = max(1, min(flush_size, self.max_docs))
+        self.flush_secs = flush_secs
+        self.max_retries = max(0, max_retries)
+        self._failing = 0  # consecutive failed attempts
+        self._buf: list = []
+        self._inflight = 0
+        self._cond = threading.Condition()
+        self._closing = False
+        self._urgent = False
+        self._stats = {"written": 0, "rejected": 0, "batches": 0, "failures": 0, "dropped": 0,
+                       "blocked_puts": 0, "timed_out_puts": 0,
+                       "last_flush_ms": 0.0, "max_flush_ms": 0.0}
+        self._thread = threading.Thread(target=self._run, name="ct-mongo-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, doc: dict, block: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Queue one document; when the buffer is full wait up to `timeout` seconds
+        (forever if None). Returns False if it was not queued (block=False or timed out).
+        """
+        with self._cond:
+            if len(self._buf) >= self.max_docs:
+                if not block:
+                    return False
+                self._stats["blocked_puts"] += 1
+                if not self._cond.wait_for(lambda: len(self._buf) < self.max_docs or self._closing, timeout):
+                    self._stats["timed_out_puts"] += 1
+                    return False
+            if self._closing:
+                raise RuntimeError("job writer is closed")
+            self._buf.append(doc)
+            if len(self._buf) == 1 or len(self._buf) >= self.flush_size:
+                self._cond.notify_all()  # start the flush timer / flush a full batch
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued so far now and wait for it; False on timeout."""
+        with self._cond:
+            self._urgent = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._buf and not self._inflight, timeout)
+
+    def close(self, timeout: Optional[float] = 30):
+        if not self.flush(timeout):
+            print(f"⚠️ MongoDB writer closed with {self.stats()['queued']} job docs unwritten")
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(1)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {**self._stats, "queued": len(self._buf) + self._inflight, "capacity": self.max_docs}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._buf or self._closing)
+                if not self._buf:
+                    return  # closing and drained
+                # a full batch, an explicit flush or FLUSH_SECS after the first queued doc
+                self._cond.wait_for(lambda: len(self._buf) >= self.flush_size or self._urgent or self._closing,
+                                    self.flush_secs)
+                batch, self._buf = self._buf[:self.flush_size], self._buf[self.flush_size:]
+                self._inflight = len(batch)
+                self._cond.notify_all()  # room for blocked writers
+            retry = self._write(batch)
+            with self._cond:
+                self._buf[:0] = retry
+                self._inflight = 0
+                if not self._buf:
+                    self._urgent = False
+                self._cond.notify_all()
+            if retry:
+                time.sleep(RETRY_SECS)
+
+    def _write(self, batch: list) -> list:
+        """Insert a batch; returns the documents worth retrying."""
+        from pymongo import errors
+        t0 = time.perf_counter()
+        try:
+            self._insert(batch)
+            written, retry = len(batch), []
+        except errors.BulkWriteError as e:
+            bad = {w["index"] for w in e.details.get("writeErrors", [])}
+            written, retry = e.details.get("nInserted", len(batch) - len(bad)), []
+            with self._cond:
+                self._stats["rejected"] += len(bad)
+            print(f"⚠️ MongoDB rejected {len(bad)} job docs: {e.details.get('writeErrors', [])[:1]}")
+        except Exception as e:
+            with self._cond:
+                self._stats["failures"] += 1
+                self._failing += 1
+                failing = self._failing
+                give_up = failing > self.max_retries
+                if give_up:
+                    self._stats["dropped"] += len(batch)
+            if give_up:
+                ids = [d.get("job_id") for d in batch]
+                print(f"⚠️ Dropped {len(batch)} jobs after {failing} failed MongoDB writes in a row: {e} (job_ids: {ids})")
+                return []
+            print(f"⚠️ Could not save {len(batch)} jobs to MongoDB (will retry): {e}")
+            return batch
+        ms = (time.perf_counter() - t0) * 1000
+        with self._cond:
+            self._failing = 0
+            self._stats["written"] += written
+            self._stats["batches"] += 1
+            self._stats["last_flush_ms"] = round(ms, 2)
+            self._stats["max_flush_ms"] = round(max(ms, self._stats["max_flush_ms"]), 2)
+        return retry
+
+_writer: Optional[JobWriter] = None
+_writer_lock = threading.Lock()
+
+def get_writer() -> JobWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = JobWriter()
+                atexit.register(_writer.close)
+    return _writer
+
+def close_writer():
+    """Flush pending job documents and stop the writer thread (app shutdown)."""
+    global _writer
+    with _writer_lock:
+        w, _writer = _writer, None
+    if w is not None:
+        w.close()
+
+def writer_stats() -> dict:
+    return _writer.stats() if _writer is not None else {"queued": 0}
+
+
 # --------------------------------------------------------------------
 # Store full job record
 # --------------------------------------------------------------------
 def save_full_job(job_data: dict):
-    """Insert full job record (source, translated, report, metadata)."""
-    try:
-        client = _get_client()
-        db = client[DB_NAME]
-        coll = db[COLL_NAME]
-
-        doc = {**job_data, "timestamp": datetime.utcnow()}
-        result = coll.insert_one(doc)
-        print(f"🟢 Stored job {doc.get('job_id')} in MongoDB (inserted_id={result.inserted_id})")
+    """Store full job record (source, translated, report, metadata) via the write-behind buffer."""
+    save_many_jobs([job_data])
 
+def save_many_jobs(jobs: list):
+    """Store several job records; with the buffer they go out in the next bulk insert."""
+    if not jobs:
+        return
+    if not MONGO_URI:  # nothing to write to: do not park records in a buffer that can never drain
+        print("⚠️ Could not save jobs to MongoDB: MONGODB_URI is not set")
+        return
+    now = datetime.utcnow()
+    docs = [{**j, "timestamp": now} for j in jobs]
+    try:
+        if WRITE_BEHIND:
+            _put_all(get_writer(), docs, time.monotonic() + PUT_TIMEOUT)
+        else:
+            result = _insert_many(docs)
+            print(f"🟢 Stored {len(result.inserted_ids)} jobs in MongoDB")
     except Exception as e:
-        print(f"⚠️ Could not save job to MongoDB: {e}")
+        print(f"⚠️ Could not save jobs to MongoDB: {e}")
 
+def _put_all(w: JobWriter, docs: list, deadline: float):
+    """Queue docs until `deadline`; the ones that do not fit in time are logged and dropped."""
+    for i, doc in enumerate(docs):
+        if not w.put(doc, timeout=max(0.0, deadline - time.monotonic())):
+            ids = [d.get("job_id") for d in docs[i:]]
+            print(f"⚠️ MongoDB write buffer still full after {PUT_TIMEOUT:g}s, dropped {len(ids)} jobs: {ids}")
+            return
 
 
 # --------------------------------------------------------------------
 # Retrieve recent jobs
 # --------------------------------------------------------------------
+# History pages are keyset-paginated on (timestamp, _id), newest first, and
+# only carry the summary fields the sidebar shows; full documents are fetched
+# one at a time with get_job().
+SUMMARY_FIELDS = {
+    "_id": 1, "job_id": 1, "timestamp": 1, "source_lang": 1, "target_lang": 1,
+    "function_name": 1, "param_count": 1, "verified": 1, "pass_rate": 1,
+}
+MAX_PAGE = 100
+
+def ensure_indexes():
+    """Create the indexes history queries rely on (idempotent; run at startup)."""
+    coll = _get_client()[DB_NAME][COLL_NAME]
+    coll.create_index([("timestamp", -1), ("_id", -1)], name="timestamp_desc")
+    coll.create_index([("source_lang", 1), ("target_lang", 1), ("timestamp", -1), ("_id", -1)], name="pair_timestamp_desc")
+    coll.create_index("job_id", name="job_id_unique", unique=True)  # a retried batch cannot duplicate a job
+    payloads = _get_client()[DB_NAME][PAYLOAD_COLL_NAME]
+    if PAYLOAD_TTL_DAYS > 0:
+        payloads.create_index("touched", name="touched_ttl", expireAfterSeconds=int(PAYLOAD_TTL_DAYS * 86400))
+
+def encode_cursor(doc: dict) -> str:
+    raw = f"{doc['timestamp'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str):
+    from bson import ObjectId
+    try:
+        ts, oid = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(ts), ObjectId(oid)
+    except Exception:
+        raise ValueError("Invalid history cursor") from None
+
+def _history_query(cursor: Optional[str], source_lang: Optional[str], target_lang: Optional[str],
+                   min_pass_rate: Optional[float], max_pass_rate: Optional[float]) -> dict:
+    q: dict = {}
+    if source_lang:
+        q["source_lang"] = source_lang
+    if target_lang:
+        q["target_lang"] = target_lang
+    if min_pass_rate is not None or max_pass_rate is not None:
+        q["pass_rate"] = {}
+        if min_pass_rate is not None:
+            q["pass_rate"]["$gte"] = min_pass_rate
+        if max_pass_rate is not None:
+            q["pass_rate"]["$lte"] = max_pass_rate
+    if cursor:
+        ts, oid = decode_cursor(cursor)
+        q["$or"] = [{"timestamp": {"$lt": ts}}, {"timestamp": ts, "_id": {"$lt": oid}}]
+    return q
+
+def _history_page(docs: list, limit: int) -> dict:
+    """Trim the extra look-ahead doc into a next_cursor and drop Mongo's _id."""
+    more = len(docs) > limit
+    docs = docs[:limit]
+    next_cursor = encode_cursor(docs[-1]) if more else None
+    for d in docs:
+        d.pop("_id", None)
+    return {"items": docs, "next_cursor": next_cursor}
+
+def list_jobs_page(limit: int = 25, cursor: Optional[str] = None, source_lang: Optional[str] = None,
+                   target_lang: Optional[str] = None, min_pass_rate: Optional[float] = None,
+                   max_pass_rate: Optional[float] = None) -> dict:
+    """One page of job summaries, newest first: {"items": [...], "next_cursor": str | None}."""
+    limit = max(1, min(limit, MAX_PAGE))
+    coll = _get_client()[DB_NAME][COLL_NAME]
+    q = _history_query(cursor, source_lang, target_lang, min_pass_rate, max_pass_rate)
+    cur = coll.find(q, SUMMARY_FIELDS).sort([("timestamp", -1), ("_id", -1)]).limit(limit + 1)
+    return _history_page(list(cur), limit)
+
+def get_job(job_id: str) -> Optional[dict]:
+    """Full job document (summary joined with its payloads) or None."""
+    db = _get_client()[DB_NAME]
+    doc = db[COLL_NAME].find_one({"job_id": job_id}, {"_id": 0})
+    if doc is None or not doc.get("payload"):
+        return doc  # also covers documents stored before the split
+    return join_job(doc, list(db[PAYLOAD_COLL_NAME].find({"_id": {"$in": list(doc["payload"].values())}})))
+
 def list_recent_jobs(limit: int = 25):
     try:
-        client = _get_client()
-        db = client[DB_NAME]
-        coll = db[COLL_NAME]
-        print(f"Using DB={DB_NAME}, Collection={COLL_NAME}")
-        count = coll.count_documents({})
-        print(f"Total jobs in MongoDB: {count}")
-
-        cur = coll.find({}, {"_id": 0}).sort("timestamp", -1).limit(limit)
-        jobs = list(cur)
-        print(f"📄 Retrieved {len(jobs)} job docs.")
-        return jobs
+        return list_jobs_page(limit)["items"]
+    except Exception as e:
+        print(f"⚠️ Could not fetch jobs from MongoDB: {e}")
+        return []
+
+
+# --------------------------------------------------------------------
+# Async variants (used by the async API routes)
+# --------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def _async_client_cls():
+    """pymongo's AsyncMongoClient (pymongo >= 4.10), or None on older versions."""
+    try:
+        from pymongo import AsyncMongoClient
+    except ImportError:
+        return None
+    return AsyncMongoClient
+
+def _get_async_client():
+    global _async_client
+    if _async_client is None:
+        if not MONGO_URI:
+            raise RuntimeError("❌ MONGODB_URI not found in environment or .env file")
+        # constructing the client does no I/O; it connects on first operation
+        _async_client = _async_client_cls()(MONGO_URI, serverSelectionTimeoutMS=5000)
+    return _async_client
+
+async def save_full_job_async(job_data: dict):
+    await save_many_jobs_async([job_data])
+
+async def save_many_jobs_async(jobs: list):
+    """
+    Queue job records without blocking the loop; only when the buffer is full
+    does it wait, in a thread and for at most PUT_TIMEOUT seconds.
+    """
+    if not jobs:
+        return
+    if not MONGO_URI:
+        return save_many_jobs(jobs)  # only logs, no I/O
+    if WRITE_BEHIND:
+        now = datetime.utcnow()
+        w = get_writer()
+        docs = [{**j, "timestamp": now} for j in jobs]
+        for i, doc in enumerate(docs):
+            if not w.put(doc, block=False):
+                return await asyncio.to_thread(_put_all, w, docs[i:], time.monotonic() + PUT_TIMEOUT)
+        return
+    await asyncio.to_thread(save_many_jobs, jobs)
+
+async def list_jobs_page_async(limit: int = 25, cursor: Optional[str] = None, source_lang: Optional[str] = None,
+                               target_lang: Optional[str] = None, min_pass_rate: Optional[float] = None,
+                               max_pass_rate: Optional[float] = None) -> dict:
+    if _async_client_cls() is None:
+        return await asyncio.to_thread(list_jobs_page, limit, cursor, source_lang, target_lang, min_pass_rate, max_pass_rate)
+    limit = max(1, min(limit, MAX_PAGE))
+    coll = _get_async_client()[DB_NAME][COLL_NAME]
+    q = _history_query(cursor, source_lang, target_lang, min_pass_rate, max_pass_rate)
+    cur = coll.find(q, SUMMARY_FIELDS).sort([("timestamp", -1), ("_id", -1)]).limit(limit + 1)
+    return _history_page(await cur.to_list(length=limit + 1), limit)
+
+async def get_job_async(job_id: str) -> Optional[dict]:
+    if _async_client_cls() is None:
+        return await asyncio.to_thread(get_job, job_id)
+    db = _get_async_client()[DB_NAME]
+    doc = await db[COLL_NAME].find_one({"job_id": job_id}, {"_id": 0})
+    if doc is None or not doc.get("payload"):
+        return doc
+    cur = db[PAYLOAD_COLL_NAME].find({"_id": {"$in": list(doc["payload"].values())}})
+    return join_job(doc, await cur.to_list(length=len(PAYLOAD_FIELDS)))
+
+async def list_recent_jobs_async(limit: int = 25):
+    try:
+        return (await list_jobs_page_async(limit))["items"]
     except Exception as e:
         print(f"⚠️ Could not fetch jobs from MongoDB: {e}")
         return []
@@ -0,0 +1,104 @@
+# storage/retention.py
+from __future__ import annotations
+import os, shutil, threading, time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from storage.job_index import JobIndex
+
+# Keeps the artifacts directory within bounds: total bytes, job age and job
+# count. A background thread sweeps every INTERVAL seconds and removes the
+# least recently accessed jobs first (downloads bump a job's access time in
+# the index). Jobs younger than GRACE seconds are never evicted, so a job
+# whose files are still being written is safe. 0 disables a limit.
+MAX_BYTES = int(float(os.getenv("CT_ARTIFACT_MAX_MB", "1024")) * 1024 * 1024)
+MAX_AGE = float(os.getenv("CT_ARTIFACT_MAX_AGE_DAYS", "0")) * 86400
+MAX_JOBS = int(os.getenv("CT_ARTIFACT_MAX_JOBS", "0"))
+INTERVAL = float(os.getenv("CT_RETENTION_INTERVAL", "300"))
+# The app only runs the background sweep when a limit is set explicitly; the
+# defaults still apply to on-demand sweeps (GET /api/artifacts/usage?sweep=true).
+CONFIGURED = any(os.getenv(k) for k in ("CT_ARTIFACT_MAX_MB", "CT_ARTIFACT_MAX_AGE_DAYS", "CT_ARTIFACT_MAX_JOBS"))
+GRACE = 60.0
+
+class RetentionManager:
+    def __init__(self, index: JobIndex, root: Path, max_bytes: int = MAX_BYTES, max_age: float = MAX_AGE,
+                 max_jobs: int = MAX_JOBS, grace: float = GRACE):
+        self.index = index
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_jobs = max_jobs
+        self.grace = grace
+        self.last: Dict[str, Any] = {}
+        self.totals = {"sweeps": 0, "evicted": 0, "bytes_freed": 0}
+        self._lock = threading.Lock()  # one sweep at a time
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sweep(self) -> Dict[str, Any]:
+        """Evict until every limit holds; returns what was reclaimed."""
+        with self._lock:
+            t0 = time.time()
+            rows = self.index.by_last_access()
+            jobs = len(rows)
+            total = sum(r[3] for r in rows)
+            evicted, freed = 0, 0
+            for job_id, created, accessed, size in rows:
+                if created is not None and t0 - created < self.grace:
+                    continue
+                too_old = bool(self.max_age) and created is not None and t0 - created > self.max_age
+                too_big = bool(self.max_bytes) and total > self.max_bytes
+                too_many = bool(self.max_jobs) and jobs > self.max_jobs
+                if not (too_old or too_big or too_many):
+                    continue
+                shutil.rmtree(self.root / job_id, ignore_errors=True)
+                (self.root / f"{job_id}.zip").unlink(missing_ok=True)  # bundled jobs
+                self.index.forget(job_id)
+                jobs -= 1
+                total -= size
+                evicted += 1
+                freed += size
+            self.last = {"at": t0, "evicted": evicted, "bytes_freed": freed, "jobs": jobs, "bytes": total,
+                         "seconds": round(time.time() - t0, 3)}
+            self.totals["sweeps"] += 1
+            self.totals["evicted"] += evicted
+            self.totals["bytes_freed"] += freed
+            if evicted:
+                print(f"🟢 Artifact retention: evicted {evicted} jobs, reclaimed {freed / 1e6:.1f} MB")
+            return dict(self.last)
+
+    def report(self) -> Dict[str, Any]:
+        return {"limits": {"max_bytes": self.max_bytes, "max_age_s": self.max_age, "max_jobs": self.max_jobs},
+                "usage": self.index.usage(), "last_sweep": self.last, "totals": dict(self.totals)}
+
+    def start(self, interval: float = INTERVAL):
+        if self._thread is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="ct-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def _run(self, interval: float):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️ Artifact retention sweep failed: {e}")
+            self._stop.wait(interval)
+
+_manager: Optional[RetentionManager] = None
+_manager_lock = threading.Lock()
+
+def get_retention() -> RetentionManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                from storage.files import ART, get_index
+                _manager = RetentionManager(get_index(), ART)
+    return _manager
@@ -0,0 +1,169 @@
+# telemetry/metrics.py
+from __future__ import annotations
+import bisect, contextvars, threading, time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Process-wide histograms and counters, rendered in the Prometheus text
+# exposition format for GET /metrics. Pipeline stages are timed with
+# `span(stage, lang)`; while a `collect_timings()` block is active the same
+# spans are also summed per stage for that one request (a context variable,
+# so it follows asyncio tasks, asyncio.to_thread and the case executor).
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(names, values) if v]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, n: float = 1, **labels: str):
+        key = tuple(str(labels.get(k, "")) for k in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + n
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels.get(k, "")) for k in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                out.append(f"{self.name}{_labels(self.labelnames, key)} {_num(v)}")
+        return out
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = BUCKETS):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # per-bucket counts, then sum, then count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels.get(k, "")) for k in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        s = self._series.get(tuple(str(labels.get(k, "")) for k in self.labelnames))
+        return int(s[-1]) if s else 0
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, list(s)) for k, s in self._series.items())
+        for key, s in series:
+            cum = 0
+            for le, n in zip(self.buckets, s):
+                cum += int(n)
+                le_label = _labels(self.labelnames, key, 'le="%s"' % le)
+                out.append(f"{self.name}_bucket{le_label} {cum}")
+            inf_label = _labels(self.labelnames, key, 'le="+Inf"')
+            out.append(f"{self.name}_bucket{inf_label} {int(s[-1])}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {s[-2]!r}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {int(s[-1])}")
+        return out
+
+_registry: List[object] = []
+
+def counter(name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    c = Counter(name, help, labelnames)
+    _registry.append(c)
+    return c
+
+def histogram(name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = BUCKETS) -> Histogram:
+    h = Histogram(name, help, labelnames, buckets)
+    _registry.append(h)
+    return h
+
+def render() -> str:
+    """Every registered metric in Prometheus text format (version 0.0.4)."""
+    lines: List[str] = []
+    for m in _registry:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+# ---------- pipeline metrics ----------
+STAGE_SECONDS = histogram("ct_stage_seconds", "Time spent per pipeline stage.", ("stage", "lang"))
+TIMEOUTS = counter("ct_timeouts_total", "Test cases that hit the run timeout.", ("lang",))
+COMPILE_FAILURES = counter("ct_compile_failures_total", "Harness builds that failed to compile.", ("lang",))
+CACHE_HITS = counter("ct_cache_hits_total", "Lookups served from a cache.", ("cache",))
+CACHE_MISSES = counter("ct_cache_misses_total", "Lookups that had to compute the value.", ("cache",))
+
+# ---------- per-request timings ----------
+class Timings:
+    """Milliseconds per stage for one request; parallel spans of a stage add up."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._ms: Dict[str, float] = {}
+        self._windows: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, seconds: float, start: Optional[float] = None):
+        with self._lock:
+            self._ms[key] = self._ms.get(key, 0.0) + seconds * 1000
+            if start is not None:
+                s = (start - self.started) * 1000
+                w = self._windows.get(key, (s, s + seconds * 1000))
+                self._windows[key] = (min(w[0], s), max(w[1], s + seconds * 1000))
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            out = {k: round(v, 2) for k, v in self._ms.items()}
+        out["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return out
+
+    def timeline(self) -> Dict[str, List[float]]:
+        """[first start, last end] of each stage in ms since the request began; overlapping windows ran concurrently."""
+        with self._lock:
+            items = sorted(self._windows.items(), key=lambda kv: kv[1])
+        return {k: [round(s, 2), round(e, 2)] for k, (s, e) in items}
+
+_current: contextvars.ContextVar[Optional[Timings]] = contextvars.ContextVar("ct_timings", default=None)
+
+@contextmanager
+def collect_timings() -> Iterator[Timings]:
+    t = Timings()
+    token = _current.set(t)
+    try:
+        yield t
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def span(stage: str, lang: str = "") -> Iterator[None]:
+    """Time a block into ct_stage_seconds and the active request's timings."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.observe(dt, stage=stage, lang=lang)
+        t = _current.get()
+        if t is not None:
+            t.add(f"{stage}.{lang}" if lang else stage, dt, t0)
+
+def count_timeouts(lang: str, results) -> None:
+    n = sum(1 for r in results if not r.ok and r.stderr.startswith("TIMEOUT"))
+    if n:
+        TIMEOUTS.inc(n, lang=lang)
@@ -0,0 +1,61 @@
+import asyncio, shutil
+import pytest
+from verifier.runners.c_runner import run_c_batch_async
+from verifier.executor import CaseFailed, gather_cases
+from verifier.sandbox import RunResult
+
+needs_gcc = pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+
+@needs_gcc
+def test_async_c_batch_matches_sync_semantics():
+    src = "int f(int a){ if (a == 2) { int *p = 0; return *(volatile int*)p; } return a + 1; }"
+    rs = asyncio.run(run_c_batch_async(src, "f", [[1], [2], [3]]))
+    assert [r.ok for r in rs] == [True, False, True]
+    assert rs[2].stdout.strip() == "4"
+
+def test_gather_cases_orders_and_fails_fast():
+    async def run(chunk):
+        await asyncio.sleep(0.01 * (5 - chunk[0][0] % 5))
+        return [RunResult(a[0] != 7, 0, f"{a[0]}\n", "bad", None) for a in chunk]
+
+    async def main():
+        ok = await gather_cases("python", run, [[i] for i in range(6)])
+        assert [r.stdout.strip() for r in ok] == [str(i) for i in range(6)]
+        with pytest.raises(CaseFailed):
+            await gather_cases("python", run, [[i] for i in range(10)], fail_fast=True)
+    asyncio.run(main())
+
+def test_reference_runs_while_the_model_call_is_in_flight(monkeypatch):
+    from api import services
+    from telemetry.metrics import span
+    from verifier.ref_cache import RefCache
+
+    ref_ran = asyncio.Event()
+
+    async def slow_llm(prompt, use_cache=True):
+        with span("llm"):
+            # only returns once the reference has run, which it can only do
+            # if it was started before the translation came back
+            await asyncio.wait_for(ref_ran.wait(), 10)
+        return "int add(int a0, int a1) {\n    return a0 + a1;\n}\n"
+
+    async def fake_run_cases(lang, code, func_name, cases):
+        with span("run", lang):
+            await asyncio.sleep(0.01)
+        if lang == "python":
+            ref_ran.set()
+        return [RunResult(True, 0, f"{a + b}\n", "", None) for a, b in cases]
+
+    monkeypatch.setattr(services, "_llm_call_async", slow_llm)
+    monkeypatch.setattr(services, "run_cases_async", fake_run_cases)
+    monkeypatch.setattr(services, "get_ref_cache", lambda c=RefCache(): c)
+    monkeypatch.setattr(services, "_finish_verified", lambda *a: {"job_id": "j"})
+    monkeypatch.setattr(services, "save_full_job_async", lambda job: asyncio.sleep(0))
+    monkeypatch.setattr(services, "save_full_job", lambda job: None)
+
+    res = asyncio.run(services.translate_and_verify_async("python", "c", "def add(a, b):\n    return a + b\n", "add",
+                                                          max_random=0))
+    tl = res["timeline"]
+    assert res["report"]["pass_rate"] == 1.0
+    assert tl["run.python"][1] <= tl["llm"][1]  # reference done before the translation arrived
+    assert tl["run.c"][0] >= tl["llm"][1]
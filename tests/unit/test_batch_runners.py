@@ -0,0 +1,86 @@
+import shutil
+import pytest
+from verifier.runners.c_runner import run_c_batch, run_c_func
+from verifier.runners.cpp_runner import run_cpp_batch
+from verifier.runners.java_runner import run_java_batch
+
+C_GCD = "int gcd(int a, int b){ if(a<0) a=-a; if(b<0) b=-b; while(b){ int t=b; b=a%b; a=t; } return a; }"
+
+needs_gcc = pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+needs_gxx = pytest.mark.skipif(shutil.which("g++") is None, reason="g++ not installed")
+needs_javac = pytest.mark.skipif(shutil.which("javac") is None, reason="JDK not installed")
+
+@needs_gcc
+def test_c_batch_runs_all_cases():
+    rs = run_c_batch(C_GCD, "gcd", [[12, 18], [0, 5], [-4, 6]])
+    assert [r.ok for r in rs] == [True, True, True]
+    assert [r.stdout.strip() for r in rs] == ["6", "5", "2"]
+
+@needs_gcc
+def test_c_single_case_wrapper():
+    r = run_c_func(C_GCD, "gcd", [21, 14])
+    assert r.ok, r.stderr
+    assert r.stdout.strip() == "7"
+
+@needs_gcc
+def test_c_batch_isolates_crash_and_timeout():
+    src = """
+int f(int a){
+    volatile int spin = 0;
+    if (a == 7) { for(;;) spin++; }
+    if (a == 3) { int *p = 0; return *(volatile int*)p; }
+    return a * 2;
+}
+"""
+    rs = run_c_batch(src, "f", [[1], [3], [4], [7], [5]], timeout=1)
+    assert [r.ok for r in rs] == [True, False, True, False, True]
+    assert rs[0].stdout.strip() == "2"
+    assert rs[2].stdout.strip() == "8"
+    assert "TIMEOUT" in rs[3].stderr
+    assert rs[4].stdout.strip() == "10"
+
+@needs_gcc
+def test_c_batch_compile_error_fails_every_case():
+    rs = run_c_batch("int f(int a){ return a + ; }", "f", [[1], [2]])
+    assert len(rs) == 2 and not any(r.ok for r in rs)
+
+@needs_gxx
+def test_cpp_batch_keeps_user_output_with_case():
+    src = "int sq(int a){ cout << \"dbg\\n\"; return a*a; }"
+    rs = run_cpp_batch(src, "sq", [[2], [3]])
+    assert [r.ok for r in rs] == [True, True]
+    assert rs[1].stdout.splitlines() == ["dbg", "9"]
+
+@needs_gcc
+def test_c_batch_times_out_a_case_that_prints_forever():
+    import asyncio, time
+    from verifier.runners.c_runner import run_c_batch_async
+    from verifier.sandbox import MAX_CASE_OUTPUT
+    src = 'int f(int a){ if(a==2){ for(;;) printf("x\\n"); } return a; }'
+    for run in (lambda: run_c_batch(src, "f", [[1], [2], [3]], timeout=1),
+                lambda: asyncio.run(run_c_batch_async(src, "f", [[1], [2], [3]], timeout=1))):
+        t0 = time.monotonic()
+        rs = run()
+        assert time.monotonic() - t0 < 20
+        assert [r.ok for r in rs] == [True, False, True]
+        assert rs[1].stderr.startswith("TIMEOUT") and len(rs[1].stdout) <= MAX_CASE_OUTPUT + 100
+        assert rs[2].stdout.strip() == "3"
+
+STATIC_COUNTER = "int f(int a){ static int calls = 0; return a + calls++; }"
+
+@needs_gcc
+def test_c_batch_resets_static_state_per_case():
+    rs = run_c_batch(STATIC_COUNTER, "f", [[1], [1], [1]])
+    assert [r.stdout.strip() for r in rs] == ["1", "1", "1"]
+
+@needs_gxx
+def test_cpp_batch_resets_static_state_per_case():
+    src = "int total = 0;\nint f(int a){ total += a; cout << total << endl; return total; }"
+    rs = run_cpp_batch(src, "f", [[2], [2]])
+    assert [r.stdout.splitlines() for r in rs] == [["2", "2"], ["2", "2"]]
+
+@needs_javac
+def test_java_batch_resets_static_state_per_case():
+    src = "static int calls = 0;\npublic static int f(int a) { return a + calls++; }"
+    rs = run_java_batch(src, "f", [[1], [1], [1]])
+    assert [r.stdout.strip() for r in rs] == ["1", "1", "1"]
@@ -0,0 +1,39 @@
+import threading, time
+import pytest
+from translator.batching import DynamicBatcher
+
+def test_concurrent_requests_share_a_batch_per_key():
+    calls = []
+
+    def run(items, key):
+        calls.append((key, list(items)))
+        return [f"{i}:{key}" for i in items]
+
+    b = DynamicBatcher(run, max_batch=4, max_wait=0.05)
+    futs = [b.submit(i, key=256) for i in range(6)] + [b.submit("x", key=64)]
+    assert [f.result(2) for f in futs] == [f"{i}:256" for i in range(6)] + ["x:64"]
+    assert sorted(len(items) for _, items in calls) == [1, 2, 4]  # 4 + 2 for key 256, 1 for key 64
+    assert all(item == "x" for key, items in calls if key == 64 for item in items)
+    b.close()
+
+def test_lone_request_waits_at_most_max_wait():
+    b = DynamicBatcher(lambda items, key: items, max_batch=8, max_wait=0.02)
+    t0 = time.monotonic()
+    assert b.submit("a").result(2) == "a"
+    assert time.monotonic() - t0 < 0.5
+    b.close()
+
+def test_errors_reach_every_caller_in_the_batch():
+    gate = threading.Event()
+
+    def run(items, key):
+        gate.wait(2)
+        raise ValueError("model failed")
+
+    b = DynamicBatcher(run, max_batch=2, max_wait=0.5)
+    futs = [b.submit(1), b.submit(2)]
+    gate.set()
+    for f in futs:
+        with pytest.raises(ValueError):
+            f.result(2)
+    b.close()
@@ -0,0 +1,7 @@
+from benchmarks.run import compare
+
+def test_compare_flags_only_regressions_past_the_threshold():
+    base = {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}, "c": {"median_ms": 10.0}, "gone": {"median_ms": 1.0}}
+    cur = {"a": {"median_ms": 12.0}, "b": {"median_ms": 14.0}, "c": {"median_ms": 5.0}, "new": {"median_ms": 1.0}}
+    assert compare(cur, base, 0.25) == ["b"]
+    assert compare(cur, base, 0.5) == []
@@ -0,0 +1,65 @@
+import shutil
+import pytest
+from verifier import build_cache
+from verifier.runners.c_runner import run_c_batch
+
+pytestmark = pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+
+SRC = {"prog.c": "int main(void){ return 0; }\n"}
+CMD = ["gcc", "prog.c", "-O2", "-o", "prog.exe"]
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(build_cache, "_stats", {"hits": 0, "misses": 0, "evictions": 0})
+
+def test_second_build_is_a_hit():
+    d1, r1 = build_cache.build(SRC, CMD, ["prog.exe"])
+    d2, r2 = build_cache.build(SRC, CMD, ["prog.exe"])
+    assert r1.ok and r2.ok and d1 == d2
+    assert (d1 / "prog.exe").exists()
+    s = build_cache.stats()
+    assert (s["hits"], s["misses"], s["entries"]) == (1, 1, 1)
+
+def test_flags_are_part_of_the_key():
+    d1, _ = build_cache.build(SRC, CMD, ["prog.exe"])
+    d2, _ = build_cache.build(SRC, CMD[:2] + ["-O0"] + CMD[3:], ["prog.exe"])
+    assert d1 != d2
+
+def test_compile_failures_are_not_cached():
+    bad = {"prog.c": "int main(void){ return ; "}
+    d, r = build_cache.build(bad, CMD, ["prog.exe"])
+    assert d is None and not r.ok
+    assert build_cache.stats()["entries"] == 0
+
+def test_lru_eviction_keeps_newest(monkeypatch):
+    d1, _ = build_cache.build(SRC, CMD, ["prog.exe"])
+    one_entry = build_cache.stats()["bytes"]
+    monkeypatch.setattr(build_cache, "MAX_BYTES", one_entry)
+    d2, _ = build_cache.build({"prog.c": "int main(void){ return 1; }\n"}, CMD, ["prog.exe"])
+    assert not d1.exists() and d2.exists()
+    assert build_cache.stats()["evictions"] == 1
+
+def test_runner_reuses_cached_harness():
+    code = "int inc(int a){ return a + 1; }"
+    assert [r.stdout.strip() for r in run_c_batch(code, "inc", [[1], [2]])] == ["2", "3"]
+    assert [r.stdout.strip() for r in run_c_batch(code, "inc", [[5]])] == ["6"]
+    assert build_cache.stats()["hits"] == 1
+
+def test_linked_outputs_survive_eviction(tmp_path):
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+    d, r = build_cache.build(SRC, CMD, ["prog.exe"], into=run_dir)
+    assert r.ok and d == run_dir
+    build_cache.clear()  # another request's build evicts the entry while this one still runs
+    assert build_cache.stats()["entries"] == 0 and (run_dir / "prog.exe").exists()
+
+def test_async_builds_from_separate_event_loops(tmp_path):
+    import asyncio
+    for i in range(2):  # each asyncio.run() is a new loop; no future crosses between them
+        run_dir = tmp_path / f"run{i}"
+        run_dir.mkdir()
+        d, r = asyncio.run(build_cache.build_async(SRC, CMD, ["prog.exe"], into=run_dir))
+        assert r.ok and (d / "prog.exe").exists()
+    s = build_cache.stats()
+    assert (s["hits"], s["misses"]) == (1, 1)
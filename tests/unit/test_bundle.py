@@ -0,0 +1,29 @@
+import json
+from storage.bundle import member_offsets, read_member, write_bundle
+from storage.job_index import JobIndex
+
+MEMBERS = {"source_python.txt": "def f(a):\n    return a\n" * 50,
+           "translated_c.txt": "int f(int a0) {\n    return a0;\n}\n",
+           "report.json": json.dumps({"pass_rate": 0.5, "cases": []})}
+
+def test_members_are_read_by_offset(tmp_path):
+    path = tmp_path / "20250101-000000-aaaa.zip"
+    members = write_bundle(path, MEMBERS)
+    assert [m.name for m in members] == list(MEMBERS)
+    assert members == member_offsets(path)
+    for m in members:
+        assert read_member(path, m.offset, m.csize, m.method).decode("utf-8") == MEMBERS[m.name]
+    assert members[0].csize < members[0].size  # deflated
+    assert not list(tmp_path.glob(".*"))  # no temp file left behind
+
+def test_index_locates_bundle_members_and_rebuild_finds_bundles(tmp_path):
+    path = tmp_path / "20250101-000000-aaaa.zip"
+    idx = JobIndex(tmp_path / ".idx.sqlite3", tmp_path)
+    idx.record_bundle(path, write_bundle(path, MEMBERS), {"report.json": json.loads(MEMBERS["report.json"])})
+    for _ in range(2):
+        name, bundle, offset, size, method = idx.locate("20250101-000000-aaaa", "translated")
+        assert (name, bundle) == ("translated_c.txt", path.name)
+        assert read_member(path, offset, size, method).decode("utf-8") == MEMBERS[name]
+        assert idx.list_jobs(5) == [{"job_id": "20250101-000000-aaaa", "source_lang": "python",
+                                     "target_lang": "c", "pass_rate": 0.5}]
+        assert idx.rebuild() == 1
@@ -0,0 +1,50 @@
+import threading, time
+from verifier import executor
+from verifier.executor import CaseBatch
+from verifier.sandbox import RunResult
+
+def _echo(chunk):
+    return [RunResult(True, 0, f"{a[0]}\n", "", None) for a in chunk]
+
+def test_results_keep_case_order(monkeypatch):
+    monkeypatch.setattr(executor, "MIN_CHUNK", 1)
+    cases = [[i] for i in range(20)]
+    out = CaseBatch("c", _echo, cases).results()
+    assert [r.stdout.strip() for r in out] == [str(i) for i in range(20)]
+
+def test_first_failure_is_reported(monkeypatch):
+    monkeypatch.setattr(executor, "MIN_CHUNK", 1)
+    def run(chunk):
+        return [RunResult(a[0] != 3, 0, "", f"bad {a[0]}", None) for a in chunk]
+    bad = CaseBatch("python", run, [[i] for i in range(6)]).first_failure()
+    assert bad is not None and bad.stderr == "bad 3"
+
+def _one_slot(monkeypatch, lang):
+    monkeypatch.setattr(executor, "MIN_CHUNK", 1)
+    monkeypatch.setitem(executor.LANG_LIMITS, lang, 1)
+    monkeypatch.setattr(executor, "_pools", {})
+
+def test_cancel_skips_chunks_queued_behind_the_limit(monkeypatch):
+    _one_slot(monkeypatch, "java")
+    gate = threading.Event()
+    busy = CaseBatch("java", lambda chunk: gate.wait(5) and _echo(chunk), [[9]])  # occupies the only java slot
+    ran = []
+    batch = CaseBatch("java", lambda chunk: ran.append(chunk) or _echo(chunk), [[0], [1], [2]])
+    batch.cancel()
+    gate.set()
+    busy.results()
+    for f in batch.futures:
+        assert f.cancelled() or f.result() == []
+    assert ran == []
+
+def test_a_java_burst_does_not_hold_threads_other_languages_need(monkeypatch):
+    _one_slot(monkeypatch, "java")
+    gate = threading.Event()
+    java = CaseBatch("java", lambda chunk: gate.wait(5) and _echo(chunk), [[i] for i in range(8)])
+    try:
+        t0 = time.monotonic()
+        assert [r.stdout.strip() for r in CaseBatch("c", _echo, [[1], [2]]).results()] == ["1", "2"]
+        assert time.monotonic() - t0 < 4  # did not wait for the java gate
+    finally:
+        gate.set()
+    assert len(java.results()) == 8
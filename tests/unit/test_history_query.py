@@ -0,0 +1,39 @@
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from storage.mongo import _history_page, _history_query, decode_cursor, encode_cursor, join_job, split_job
+
+def test_cursor_round_trip_and_rejects_garbage():
+    doc = {"timestamp": datetime(2025, 3, 1, 12, 30, 5, 123000), "_id": ObjectId()}
+    assert decode_cursor(encode_cursor(doc)) == (doc["timestamp"], doc["_id"])
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+def test_query_combines_filters_with_the_keyset_condition():
+    doc = {"timestamp": datetime(2025, 3, 1), "_id": ObjectId()}
+    q = _history_query(encode_cursor(doc), "python", "c", 0.5, None)
+    assert q["source_lang"] == "python" and q["target_lang"] == "c"
+    assert q["pass_rate"] == {"$gte": 0.5}
+    assert q["$or"] == [{"timestamp": {"$lt": doc["timestamp"]}},
+                        {"timestamp": doc["timestamp"], "_id": {"$lt": doc["_id"]}}]
+    assert _history_query(None, None, None, None, None) == {}
+
+def test_page_uses_the_look_ahead_doc_for_next_cursor():
+    docs = [{"_id": ObjectId(), "timestamp": datetime(2025, 3, 1, 0, 0, i), "job_id": str(i)} for i in (3, 2, 1)]
+    page = _history_page([dict(d) for d in docs], 2)
+    assert [d["job_id"] for d in page["items"]] == ["3", "2"]
+    assert all("_id" not in d for d in page["items"])
+    assert decode_cursor(page["next_cursor"])[1] == docs[1]["_id"]
+    assert _history_page([dict(d) for d in docs], 3)["next_cursor"] is None
+
+def test_split_and_join_jobs():
+    job = {"job_id": "j1", "pass_rate": 1.0, "source_code": "def f(a): return a", "translated_code": "int f(int a0) {}",
+           "cases": [[1], [2]], "report": {"pass_rate": 1.0, "cases": []}}
+    summary, payloads = split_job(job)
+    assert set(summary) == {"job_id", "pass_rate", "n_cases", "payload"} and summary["n_cases"] == 2
+    assert {p["kind"] for p in payloads} == {"source", "translated", "details"}
+    again, _ = split_job({**job, "job_id": "j2"})
+    assert again["payload"] == summary["payload"]  # identical content -> same payload documents
+    assert join_job(summary, payloads) == {**job, "n_cases": 2}
+    partial = join_job(summary, [p for p in payloads if p["kind"] != "details"])
+    assert partial["payload_missing"] == ["details"] and "report" not in partial
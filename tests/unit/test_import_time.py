@@ -0,0 +1,16 @@
+import json, os, subprocess, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BUDGET_S = float(os.getenv("CT_IMPORT_BUDGET_S", "3.0"))  # generous: CI machines vary
+
+def test_api_main_imports_fast_without_credentials_or_heavy_sdks():
+    env = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "MONGODB_URI")}
+    code = ("import json, sys, time; t = time.perf_counter(); import api.main; "
+            "print(json.dumps({'s': time.perf_counter() - t, 'mods': sorted(m for m in ('openai', 'pymongo', 'torch') "
+            "if m in sys.modules)}))")
+    cp = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+    assert cp.returncode == 0, cp.stderr
+    out = json.loads(cp.stdout.strip().splitlines()[-1])
+    assert out["mods"] == []  # loaded on first use, not at import
+    assert out["s"] < BUDGET_S
@@ -0,0 +1,62 @@
+import json, sqlite3
+from storage.job_index import JobIndex
+
+def _write_job(root, job_id, src="python", tgt="c", rate=0.5):
+    d = root / job_id
+    d.mkdir()
+    (d / f"source_{src}.txt").write_text("def f(a): return a")
+    (d / f"translated_{tgt}.txt").write_text("int f(int a0) { return a0; }")
+    (d / "report.json").write_text(json.dumps({"pass_rate": rate}))
+    return d
+
+def test_records_on_write_and_lists_newest_first(tmp_path):
+    idx = JobIndex(tmp_path / "idx.sqlite3", tmp_path)
+    idx.record_file("20250101-000000-aaaa", "source_python.txt", 10)
+    idx.record_file("20250101-000000-aaaa", "translated_cpp.txt", 12)
+    idx.record_file("20250101-000000-aaaa", "report.json", 30, {"pass_rate": 0.75})
+    idx.record_job("20250101-000000-aaaa", function_name="gcd")
+    idx.record_file("20250102-000000-bbbb", "source_c.txt", 10)
+    rows = idx.list_jobs(10)
+    assert [r["job_id"] for r in rows] == ["20250102-000000-bbbb", "20250101-000000-aaaa"]
+    assert rows[1] == {"job_id": "20250101-000000-aaaa", "source_lang": "python", "target_lang": "cpp",
+                       "function_name": "gcd", "pass_rate": 0.75}
+    assert idx.find_file("20250101-000000-aaaa", "translated") == "translated_cpp.txt"
+    assert idx.find_file("20250102-000000-bbbb", "report") is None
+
+def test_rebuild_reindexes_the_artifacts_dir(tmp_path):
+    art = tmp_path / "artifacts"
+    art.mkdir()
+    _write_job(art, "20250101-000000-aaaa", rate=1.0)
+    _write_job(art, "20250103-000000-cccc", tgt="java")
+    idx = JobIndex(tmp_path / "idx.sqlite3", art)
+    idx.record_file("stale", "source_c.txt", 1)
+    assert idx.rebuild() == 2
+    assert [r["job_id"] for r in idx.list_jobs(10)] == ["20250103-000000-cccc", "20250101-000000-aaaa"]
+    assert idx.find_file("20250103-000000-cccc", "translated") == "translated_java.txt"
+    assert not idx.has_job("stale")
+
+def test_grouped_job_keeps_every_translation(tmp_path):
+    idx = JobIndex(tmp_path / "idx.sqlite3", tmp_path)
+    for name, size in (("source_python.txt", 10), ("translated_c.txt", 20), ("translated_java.txt", 40)):
+        idx.record_file("g", name, size)
+    assert idx.find_file("g", "translated", "java") == "translated_java.txt"
+    assert idx.find_file("g", "translated", "c") == "translated_c.txt"
+    assert idx.find_file("g", "translated", "cpp") is None
+    assert idx.usage() == {"jobs": 1, "bytes": 70}
+    assert idx.by_last_access()[0][3] == 70
+
+def test_migrates_an_index_keyed_by_kind(tmp_path):
+    db = sqlite3.connect(str(tmp_path / "idx.sqlite3"))
+    db.executescript("""
+        CREATE TABLE jobs (job_id TEXT PRIMARY KEY, source_lang TEXT, target_lang TEXT,
+                           function_name TEXT, pass_rate REAL, meta TEXT);
+        CREATE TABLE files (job_id TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, size INTEGER NOT NULL,
+                            PRIMARY KEY (job_id, kind));
+        INSERT INTO jobs (job_id) VALUES ('old');
+        INSERT INTO files VALUES ('old', 'translated', 'translated_cpp.txt', 5);
+    """)
+    db.close()
+    idx = JobIndex(tmp_path / "idx.sqlite3", tmp_path)
+    assert idx.find_file("old", "translated", "cpp") == "translated_cpp.txt"
+    idx.record_file("old", "translated_c.txt", 7)
+    assert idx.usage()["bytes"] == 12
@@ -0,0 +1,57 @@
+import asyncio, time
+import pytest
+from fastapi.testclient import TestClient
+from api import jobs, main
+from storage import files, retention
+from api.jobs import JobQueue, QueueFull
+
+def test_queue_runs_jobs_with_bounded_workers_and_rejects_overflow():
+    async def main_():
+        q = JobQueue(workers=2, max_queued=2)
+        live, peak = [0], [0]
+        gate = asyncio.Event()
+
+        async def work(x):
+            live[0] += 1
+            peak[0] = max(peak[0], live[0])
+            await gate.wait()
+            live[0] -= 1
+            if x == 3:
+                raise ValueError("bad input")
+            return x * 10
+
+        ids = [q.submit(work, i) for i in range(2)]
+        await asyncio.sleep(0)  # both workers pick a job up
+        ids += [q.submit(work, i) for i in range(2, 4)]
+        with pytest.raises(QueueFull):
+            q.submit(work, 99)
+        assert [q.get(i)["status"] for i in ids] == ["running", "running", "queued", "queued"]
+        gate.set()
+        while any(q.get(i)["status"] != "done" for i in ids):
+            await asyncio.sleep(0.01)
+        assert peak[0] == 2
+        assert [q.get(i).get("result") for i in ids] == [0, 10, 20, None]
+        assert q.get(ids[3])["error"] == "bad input"
+        await q.shutdown()
+    asyncio.run(main_())
+
+def test_submit_and_poll_endpoints(monkeypatch, tmp_path):
+    # the app lifespan must not touch the repo's own artifacts directory
+    monkeypatch.setattr(files, "ART", tmp_path)
+    monkeypatch.setattr(files, "INDEX_DB", tmp_path / ".index.sqlite3")
+    monkeypatch.setattr(files, "_index", None)
+    monkeypatch.setattr(retention, "_manager", None)
+    async def fake_verify(*args, **kwargs):
+        return {"job_id": "artifact-1", "report": {"pass_rate": 1.0}}
+
+    monkeypatch.setattr(main, "translate_and_verify_async", fake_verify)
+    monkeypatch.setattr(jobs, "_queue", JobQueue(workers=1, max_queued=4))
+    with TestClient(main.app) as c:
+        r = c.post("/api/jobs", json={"source_lang": "python", "target_lang": "c", "code": "def f(a):\n    return a\n"})
+        assert r.status_code == 202
+        job_id = r.json()["job_id"]
+        deadline = time.time() + 5
+        while (body := c.get(f"/api/jobs/{job_id}").json())["status"] != "done" and time.time() < deadline:
+            time.sleep(0.01)
+        assert body["result"]["report"]["pass_rate"] == 1.0
+        assert c.get("/api/jobs/nope").status_code == 404
@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+from benchmarks.fixtures import FIXTURES
+from benchmarks.loadtest import summarize
+from benchmarks.standins import MemoryMongo, fake_openai_app
+from translator.prompts import make_prompt
+
+def test_summary_percentiles_and_error_rate():
+    samples = [(float(ms), True, "") for ms in range(1, 101)] + [(5.0, False, "HTTP 500")] * 4
+    r = summarize(samples, wall=2.0)
+    assert (r["p50_ms"], r["p95_ms"], r["p99_ms"]) == (50.0, 95.0, 99.0)
+    assert r["throughput_rps"] == 52.0 and r["error_rate"] == round(4 / 104, 4)
+    assert r["errors"] == {"HTTP 500": 4}
+
+def test_fake_responses_api_answers_with_the_fixture():
+    client = TestClient(fake_openai_app(latency=0.0, jitter=0.0))
+    prompt = make_prompt("python", "c", "square", 1, FIXTURES["square"]["python"])
+    body = client.post("/v1/responses", json={"model": "m", "input": prompt}).json()
+    assert FIXTURES["square"]["c"] in body["output"][0]["content"][0]["text"]
+    assert client.get("/stats").json()["calls"] == 1
+
+def test_memory_mongo_counts_writes():
+    db = MemoryMongo()["db"]
+    db["jobs"].insert_many([{"job_id": "a"}, {"job_id": "b"}])
+    assert len(db["jobs"].docs) == 2 and "_id" in db["jobs"].docs[0]
@@ -0,0 +1,33 @@
+import asyncio, time
+from telemetry.metrics import Histogram, collect_timings, span, STAGE_SECONDS
+from verifier.executor import CaseBatch
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("t_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, stage="x")
+    lines = h.render()
+    assert 't_seconds_bucket{stage="x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="x",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="x",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="x"} 3' in lines
+
+def test_timings_follow_tasks_and_executor_threads():
+    def run(chunk):
+        with span("unit_run", "python"):
+            time.sleep(0.01)
+        return []
+
+    async def main():
+        with collect_timings() as t:
+            async def child():
+                with span("unit_llm"):
+                    await asyncio.sleep(0.01)
+            await asyncio.ensure_future(child())
+            CaseBatch("python", run, [[1]] * 8).results()
+        return t.as_dict()
+
+    before = STAGE_SECONDS.count(stage="unit_run", lang="python")
+    t = asyncio.run(main())
+    assert t["unit_llm"] >= 10 and t["unit_run.python"] >= 10 and t["total"] >= 20
+    assert STAGE_SECONDS.count(stage="unit_run", lang="python") > before
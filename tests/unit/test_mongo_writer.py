@@ -0,0 +1,97 @@
+import threading, time
+from pymongo import errors
+from storage import mongo
+from storage.mongo import JobWriter
+
+class FakeColl:
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def insert_many(self, docs):
+        self.gate.wait()
+        if self.fail_times:
+            self.fail_times -= 1
+            raise errors.AutoReconnect("primary stepped down")
+        self.batches.append([d["n"] for d in docs])
+
+def test_flushes_on_size_and_on_time():
+    coll = FakeColl()
+    w = JobWriter(coll.insert_many, max_docs=100, flush_size=3, flush_secs=0.2)
+    for n in range(4):
+        w.put({"n": n})
+    deadline = time.time() + 2
+    while sum(map(len, coll.batches)) < 4 and time.time() < deadline:
+        time.sleep(0.01)
+    assert coll.batches == [[0, 1, 2], [3]]  # full batch at once, the rest after flush_secs
+    assert w.stats()["written"] == 4 and w.stats()["queued"] == 0
+    w.close()
+
+def test_full_buffer_applies_back_pressure_without_dropping():
+    coll = FakeColl()
+    coll.gate.clear()  # the database is stalled
+    w = JobWriter(coll.insert_many, max_docs=2, flush_size=2, flush_secs=0.05)
+    w.put({"n": 0})
+    w.put({"n": 1})
+    time.sleep(0.1)  # flusher takes the first batch and blocks in insert_many
+    w.put({"n": 2})
+    w.put({"n": 3})
+    assert w.put({"n": 4}, block=False) is False
+    t = threading.Thread(target=w.put, args=({"n": 4},))
+    t.start()
+    time.sleep(0.05)
+    assert t.is_alive()  # blocked, not dropped
+    coll.gate.set()
+    t.join(2)
+    w.close()
+    assert sorted(n for b in coll.batches for n in b) == [0, 1, 2, 3, 4]
+    assert w.stats()["blocked_puts"] == 1
+
+def test_failed_batches_are_retried(monkeypatch):
+    monkeypatch.setattr(mongo, "RETRY_SECS", 0.01)
+    coll = FakeColl(fail_times=2)
+    w = JobWriter(coll.insert_many, flush_size=10, flush_secs=0.01)
+    w.put({"n": 7})
+    assert w.flush(2)
+    assert coll.batches == [[7]] and w.stats()["failures"] == 2
+    w.close()
+
+def test_single_doc_is_written_after_flush_secs():
+    coll = FakeColl()
+    w = JobWriter(coll.insert_many, flush_size=50, flush_secs=0.05)
+    w.put({"n": 1})
+    time.sleep(0.5)
+    assert coll.batches == [[1]]
+    w.close()
+
+def test_outage_drops_batches_after_max_retries(monkeypatch):
+    monkeypatch.setattr(mongo, "RETRY_SECS", 0.01)
+    coll = FakeColl(fail_times=100)
+    w = JobWriter(coll.insert_many, flush_size=1, flush_secs=0.01, max_retries=2)
+    w.put({"n": 1})
+    w.put({"n": 2})
+    assert w.flush(2)  # drained, not wedged
+    st = w.stats()
+    assert st["dropped"] == 2 and st["failures"] == 4  # three tries for the first doc, one for the next
+    coll.fail_times = 0
+    w.put({"n": 3})
+    assert w.flush(2) and coll.batches == [[3]]
+    w.close()
+
+def test_put_gives_up_after_timeout_when_the_buffer_stays_full(monkeypatch):
+    coll = FakeColl()
+    coll.gate.clear()
+    w = JobWriter(coll.insert_many, max_docs=1, flush_size=1, flush_secs=0.01)
+    w.put({"n": 0})
+    time.sleep(0.1)  # flusher is stuck on doc 0
+    w.put({"n": 1})
+    t0 = time.monotonic()
+    assert w.put({"n": 2}, timeout=0.1) is False
+    assert time.monotonic() - t0 < 1 and w.stats()["timed_out_puts"] == 1
+    monkeypatch.setattr(mongo, "PUT_TIMEOUT", 0.1)
+    mongo._put_all(w, [{"n": 3, "job_id": "j3"}], time.monotonic() + 0.1)  # logs and returns
+    coll.gate.set()
+    w.close()
+    assert sorted(n for b in coll.batches for n in b) == [0, 1]
@@ -0,0 +1,72 @@
+import os
+import threading
+import pytest
+from verifier.runners.python_runner import run_python_batch
+from verifier.runners.python_worker import PythonWorkerPool
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="worker pool needs os.fork")
+
+PY_GCD = """\
+def gcd(a:int, b:int)->int:
+    a = abs(a); b = abs(b)
+    while b != 0:
+        a, b = b, a % b
+    return a
+"""
+
+def test_python_batch_results_in_order():
+    rs = run_python_batch(PY_GCD, "gcd", [[12, 18], [0, 5], [-4, 6]])
+    assert [r.ok for r in rs] == [True, True, True]
+    assert [r.stdout.strip() for r in rs] == ["6", "5", "2"]
+
+def test_pool_isolates_errors_hangs_and_hard_exits():
+    src = """\
+import os
+def f(a):
+    print("dbg", a)
+    if a == 1:
+        raise ValueError("boom")
+    if a == 2:
+        while True: pass
+    if a == 3:
+        os._exit(3)
+    return a * 10
+"""
+    pool = PythonWorkerPool(size=1)
+    try:
+        rs = pool.run(src, "f", [[0], [1], [2], [3], [4]], timeout=1)
+    finally:
+        pool.shutdown()
+    assert [r.ok for r in rs] == [True, False, False, False, True]
+    assert rs[0].stdout.splitlines() == ["dbg 0", "0"]
+    assert "ValueError" in rs[1].stderr
+    assert "TIMEOUT" in rs[2].stderr
+    assert rs[3].exit_code == 3
+    assert rs[4].stdout.splitlines() == ["dbg 4", "40"]
+
+def test_pool_reports_syntax_error_per_case():
+    pool = PythonWorkerPool(size=1)
+    try:
+        rs = pool.run("def f(a) return a", "f", [[1], [2]])
+    finally:
+        pool.shutdown()
+    assert len(rs) == 2 and not any(r.ok for r in rs)
+    assert "SyntaxError" in rs[0].stderr
+
+def test_pool_callers_outnumber_recycled_workers():
+    pool = PythonWorkerPool(size=1, max_jobs=1)
+    out = {}
+
+    def call(i):
+        out[i] = pool.run(PY_GCD, "gcd", [[12 * i, 18]])[0].stdout.strip()
+
+    threads = [threading.Thread(target=call, args=(i,), daemon=True) for i in range(1, 4)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+    finally:
+        pool.shutdown()
+    assert not any(t.is_alive() for t in threads)
+    assert out == {1: "6", 2: "6", 3: "18"}
@@ -0,0 +1,42 @@
+from api import services
+from verifier.ref_cache import RefCache, source_hash
+from verifier.sandbox import RunResult
+
+PY = "def add(a, b):\n    return a + b\n"
+
+def _ok(args):
+    return RunResult(True, 0, f"{sum(args)}\n", "", None)
+
+def test_ref_cache_normalizes_source_skips_failures_and_evicts_lru():
+    c = RefCache(max_items=2)
+    assert source_hash(PY) == source_hash(PY.replace("\n", "\r\n"))
+    assert source_hash('s = """a\n"""') != source_hash('s = """a  \n\n"""')  # whitespace inside literals counts
+    c.store("python", PY, "add", [[1, 2], [3, 4]], [_ok([1, 2]), RunResult(False, 1, "", "boom", None)])
+    hits = c.lookup("python", PY.replace("\n", "\r\n"), "add", [[1, 2], [3, 4]])
+    assert hits[0].stdout == "3\n" and hits[1] is None
+    assert c.lookup("c", PY, "add", [[1, 2]]) == [None]
+    c.store("python", PY, "add", [[5, 6], [7, 8]], [_ok([5, 6]), _ok([7, 8])])  # evicts [1, 2]
+    assert [r is not None for r in c.lookup("python", PY, "add", [[1, 2], [5, 6], [7, 8]])] == [False, True, True]
+    assert c.stats["evictions"] == 1
+
+def test_verify_runs_only_uncached_reference_cases(monkeypatch):
+    ran = []
+
+    def fake_run_cases(lang, code, func_name, cases):
+        if code == PY:
+            ran.extend(cases)
+        return [_ok(a) for a in cases]
+
+    monkeypatch.setattr(services, "get_ref_cache", lambda c=RefCache(): c)
+    monkeypatch.setattr(services, "run_cases", fake_run_cases)
+    monkeypatch.setattr(services, "_finish_verified", lambda *a: {"job_id": "j"})
+    monkeypatch.setattr(services, "save_full_job", lambda job: None)
+
+    first = services.translate_and_verify("python", "python", PY, "add", max_random=0)["report"]
+    assert first["ref_cached"] == 0 and len(ran) == first["total"]
+    ran.clear()
+    second = services.translate_and_verify("python", "python", PY, "add", max_random=0,
+                                           custom_inputs=[[1000, 2000]])["report"]
+    assert ran == [[1000, 2000]]
+    assert second["ref_cached"] == first["total"] and second["passed"] == second["total"]
+    assert [row["ref_cached"] for row in second["cases"]][-2:] == [True, False]
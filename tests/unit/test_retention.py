@@ -0,0 +1,47 @@
+import time
+from storage.job_index import JobIndex
+from storage.retention import RetentionManager
+
+def _setup(tmp_path, n=4, size=100):
+    art = tmp_path / "artifacts"
+    art.mkdir()
+    idx = JobIndex(tmp_path / "idx.sqlite3", art)
+    ids = [f"2025010{i}-000000-job{i}" for i in range(n)]
+    for i, job_id in enumerate(ids):
+        (art / job_id).mkdir()
+        (art / job_id / "report.json").write_text("x" * size)
+        idx.record_file(job_id, "report.json", size, {"pass_rate": 1.0})
+        idx._db.execute("UPDATE jobs SET created = ?, accessed = ? WHERE job_id = ?", (1000.0 + i, 1000.0 + i, job_id))
+    idx._db.commit()
+    return art, idx, ids
+
+def test_evicts_least_recently_accessed_until_under_budget(tmp_path):
+    art, idx, ids = _setup(tmp_path)
+    idx.touch(ids[0])  # downloaded just now: becomes the most recently used
+    rm = RetentionManager(idx, art, max_bytes=250, max_age=0, max_jobs=0)
+    rep = rm.sweep()
+    assert rep["evicted"] == 2 and rep["bytes_freed"] == 200 and rep["bytes"] == 200
+    assert sorted(p.name for p in art.iterdir()) == [ids[0], ids[3]]
+    assert idx.usage() == {"jobs": 2, "bytes": 200}
+    assert rm.report()["totals"]["bytes_freed"] == 200
+
+def test_age_and_count_limits_and_grace(tmp_path):
+    art, idx, ids = _setup(tmp_path)
+    idx.record_file("20990101-000000-new", "report.json", 100)  # created now: protected by the grace period
+    rm = RetentionManager(idx, art, max_bytes=0, max_age=0, max_jobs=2)
+    assert rm.sweep()["evicted"] == 3
+    assert idx.has_job("20990101-000000-new")
+    rm = RetentionManager(idx, art, max_bytes=0, max_age=time.time() - 1500, max_jobs=0)
+    assert rm.sweep()["evicted"] == 1  # the remaining old job is past max_age
+
+def test_usage_is_read_only_and_sweep_is_a_post(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from api import main
+    art, idx, ids = _setup(tmp_path)
+    rm = RetentionManager(idx, art, max_bytes=250, max_age=0, max_jobs=0)
+    monkeypatch.setattr(main, "get_retention", lambda: rm)
+    client = TestClient(main.app)
+    assert client.get("/api/artifacts/usage", params={"sweep": "true"}).json()["usage"]["jobs"] == 4
+    assert client.get("/api/artifacts/sweep").status_code == 405
+    rep = client.post("/api/artifacts/sweep").json()
+    assert rep["last_sweep"]["evicted"] == 2 and rep["usage"]["jobs"] == 2
@@ -0,0 +1,47 @@
+import asyncio
+from api import services
+from api.schemas import TranslateRequest
+
+PY = "def add(a, b):\n    return a + b\n"
+
+def _reqs():
+    return [
+        TranslateRequest(source_lang="python", target_lang="c", code=PY, function_name="add"),
+        TranslateRequest(source_lang="python", target_lang="cpp", code=PY, function_name="add"),
+        TranslateRequest(source_lang="python", target_lang="c", code="BOOM", function_name="add", param_count=2),
+        TranslateRequest(source_lang="python", target_lang="java", code=PY, function_name="add"),
+    ]
+
+def test_async_batch_is_ordered_bounded_and_bulk_saved(monkeypatch):
+    state = {"live": 0, "peak": 0}
+    saved = []
+
+    async def fake_llm(prompt, use_cache=True):
+        state["live"] += 1
+        state["peak"] = max(state["peak"], state["live"])
+        await asyncio.sleep(0.02)
+        state["live"] -= 1
+        if "BOOM" in prompt:
+            raise RuntimeError("model unavailable")
+        return "int add(int a, int b) {\n    return a + b;\n}\n"
+
+    async def fake_save_many(jobs):
+        saved.append(list(jobs))
+
+    monkeypatch.setattr(services, "_llm_call_async", fake_llm)
+    monkeypatch.setattr(services, "save_many_jobs_async", fake_save_many)
+    items = asyncio.run(services.translate_many_async(_reqs(), concurrency=2))
+
+    assert [("error" in it) for it in items] == [False, False, True, False]
+    assert "model unavailable" in items[2]["error"]
+    assert all("add" in items[i]["translated_code"] for i in (0, 1, 3))
+    assert state["peak"] == 2
+    assert len(saved) == 1 and [j["job_id"] for j in saved[0]] == [items[i]["job_id"] for i in (0, 1, 3)]
+
+def test_sync_batch_matches(monkeypatch):
+    saved = []
+    monkeypatch.setattr(services, "_llm_call", lambda prompt, use_cache=True: "int add(int a, int b) {\n    return a + b;\n}\n")
+    monkeypatch.setattr(services, "save_many_jobs", lambda jobs: saved.append(list(jobs)))
+    items = services.translate_many(_reqs()[:2])
+    assert all("translated_code" in it for it in items)
+    assert len(saved) == 1 and len(saved[0]) == 2
@@ -0,0 +1,44 @@
+import json
+from fastapi.testclient import TestClient
+from api import main, services
+
+def _events(body: str):
+    out = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+def test_stream_forwards_deltas_then_normalized_code(monkeypatch):
+    saved = []
+
+    async def fake_stream(prompt, use_cache=True):
+        for part in ["```c\n", "int whatever(int x, int y) {\n", "    return x + y;\n", "}\n```"]:
+            yield part
+
+    async def fake_save(job):
+        saved.append(job)
+
+    monkeypatch.setattr(services, "_llm_stream", fake_stream)
+    monkeypatch.setattr(services, "save_full_job_async", fake_save)
+    r = TestClient(main.app).post("/api/translate/stream", json={
+        "source_lang": "python", "target_lang": "c", "function_name": "add",
+        "code": "def add(a, b):\n    return a + b\n",
+    })
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/event-stream")
+    evs = _events(r.text)
+    assert [n for n, _ in evs] == ["delta"] * 4 + ["done"]
+    done = evs[-1][1]
+    assert done["translated_code"].startswith("int add(int a0, int a1) {") and "```" not in done["translated_code"]
+    assert saved and saved[0]["job_id"] == done["job_id"]
+
+def test_stream_reports_errors_as_an_event(monkeypatch):
+    async def broken(prompt, use_cache=True):
+        raise RuntimeError("upstream down")
+        yield ""
+
+    monkeypatch.setattr(services, "_llm_stream", broken)
+    r = TestClient(main.app).post("/api/translate/stream", json={
+        "source_lang": "python", "target_lang": "c", "function_name": "f", "code": "def f(a):\n    return a\n",
+    })
+    assert _events(r.text) == [("error", {"error": "upstream down"})]
@@ -0,0 +1,114 @@
+import threading, time
+from translator.cache import TranslationCache, cache_key
+
+def test_key_depends_on_model_instructions_and_prompt():
+    k = cache_key("m", "i", "p")
+    assert k == cache_key("m", "i", "p")
+    assert len({k, cache_key("m2", "i", "p"), cache_key("m", "i2", "p"), cache_key("m", "i", "p2")}) == 4
+
+def test_persistent_tier_survives_a_new_instance(tmp_path):
+    db = str(tmp_path / "t.sqlite3")
+    TranslationCache(db).put("k", "int f(){ return 1; }")
+    c2 = TranslationCache(db)
+    assert c2.get("k") == "int f(){ return 1; }"
+    assert c2.stats["disk_hits"] == 1
+
+def test_ttl_expires_entries(tmp_path):
+    c = TranslationCache(str(tmp_path / "t.sqlite3"), ttl=0)
+    c.put("k", "v")
+    assert c.get("k") is None
+
+def test_bypass_forces_a_fresh_call():
+    c = TranslationCache("")
+    calls = []
+    fn = lambda: calls.append(1) or f"v{len(calls)}"
+    assert c.get_or_compute("k", fn) == "v1"
+    assert c.get_or_compute("k", fn) == "v1"
+    assert c.get_or_compute("k", fn, bypass=True) == "v2"
+    assert c.get_or_compute("k", fn) == "v2"
+
+def test_concurrent_misses_share_one_call():
+    c = TranslationCache("")
+    calls = []
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "v"
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(c.get_or_compute("k", slow))) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert out == ["v"] * 8
+    assert len(calls) == 1
+
+def test_async_path_keeps_sqlite_off_the_event_loop(tmp_path, monkeypatch):
+    import asyncio
+    db = str(tmp_path / "t.sqlite3")
+    TranslationCache(db).put("old", "v0")
+    c = TranslationCache(db)
+    threads = []
+    for name in ("_disk_get", "_disk_put"):
+        orig = getattr(c, name)
+        monkeypatch.setattr(c, name, lambda *a, _orig=orig: threads.append(threading.current_thread()) or _orig(*a))
+
+    async def compute():
+        return "v1"
+
+    async def main():
+        assert await c.aget_or_compute("old", compute) == "v0"  # disk hit, read in a worker thread
+        assert await c.aget_or_compute("new", compute) == "v1"
+    asyncio.run(main())  # waits for the default executor, so the write-behind has finished
+    assert len(threads) == 3 and threading.main_thread() not in threads
+    assert TranslationCache(db).get("new") == "v1"
+
+def test_stream_reads_and_writes_the_cache_off_the_event_loop(tmp_path, monkeypatch):
+    import asyncio
+    from types import SimpleNamespace
+    from translator import openai_model
+    c = TranslationCache(str(tmp_path / "t.sqlite3"))
+    threads = []
+    for name in ("_disk_get", "_disk_put"):
+        orig = getattr(c, name)
+        monkeypatch.setattr(c, name, lambda *a, _orig=orig: threads.append(threading.current_thread()) or _orig(*a))
+
+    async def events():
+        for d in ("int f", "() {}"):
+            yield SimpleNamespace(type="response.output_text.delta", delta=d)
+
+    async def create(**kw):
+        return events()
+
+    client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    monkeypatch.setattr(openai_model, "get_cache", lambda: c)
+    monkeypatch.setattr(openai_model, "_get_async_client", lambda: client)
+
+    async def collect():
+        return [d async for d in openai_model.stream_with_openai_async("p")]
+    assert asyncio.run(collect()) == ["int f", "() {}"]
+    c._mem.clear()
+    assert asyncio.run(collect()) == ["int f() {}"]  # served from SQLite
+    assert len(threads) == 3 and threading.main_thread() not in threads
+
+def test_async_flights_are_per_event_loop():
+    import asyncio
+    c = TranslationCache("")
+    started, release = threading.Event(), threading.Event()
+    out = {}
+
+    async def slow():
+        started.set()
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return "a"
+
+    async def fast():
+        return "b"
+
+    t = threading.Thread(target=lambda: out.update(a=asyncio.run(c.aget_or_compute("k", slow))))
+    t.start()
+    assert started.wait(2)
+    threading.Timer(2, release.set).start()  # a flight shared across loops would wait for this
+    out["b"] = asyncio.run(asyncio.wait_for(c.aget_or_compute("k", fast), 5))  # another loop: its own flight
+    release.set()
+    t.join(2)
+    assert out == {"a": "a", "b": "b"}
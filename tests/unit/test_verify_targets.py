@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from api import services
+from api.schemas import TranslateRequest
+from verifier.ref_cache import RefCache
+from verifier.sandbox import RunResult
+
+PY = "def add(a, b):\n    return a + b\n"
+CODE = {"c": "int add(int a, int b) {\n    return a + b;\n}\n",
+        "cpp": "int add(int a, int b) {\n    return a - b;\n}\n"}
+
+def test_schema_needs_target_lang_or_targets():
+    with pytest.raises(ValueError):
+        TranslateRequest(source_lang="python", code=PY)
+    assert TranslateRequest(source_lang="python", targets=["c", "java"], code=PY).target_lang is None
+
+def test_targets_share_cases_and_one_reference_run(monkeypatch):
+    runs = {}
+    saved = []
+    live, peak = [0], [0]
+
+    async def fake_llm(prompt, use_cache=True):
+        live[0] += 1
+        peak[0] = max(peak[0], live[0])
+        await asyncio.sleep(0.05)
+        live[0] -= 1
+        if "into JAVA" in prompt:
+            raise RuntimeError("model unavailable")
+        return CODE["cpp" if "into CPP" in prompt else "c"]
+
+    async def fake_run_cases(lang, code, func_name, cases):
+        runs.setdefault(lang, []).extend(cases)
+        sign = -1 if "a - b" in code else 1
+        return [RunResult(True, 0, f"{a + sign * b}\n", "", None) for a, b in cases]
+
+    async def fake_save(job):
+        saved.append(job)
+
+    monkeypatch.setattr(services, "_llm_call_async", fake_llm)
+    monkeypatch.setattr(services, "run_cases_async", fake_run_cases)
+    monkeypatch.setattr(services, "get_ref_cache", lambda c=RefCache(): c)
+    monkeypatch.setattr(services, "_finish_grouped", lambda *a: {"job_id": "g", "targets": a[-1]})
+    monkeypatch.setattr(services, "save_full_job_async", fake_save)
+    monkeypatch.setattr(services, "save_full_job", lambda job: None)
+
+    res = asyncio.run(services.translate_and_verify_targets_async("python", ["c", "cpp", "java", "c"], PY, "add",
+                                                                  max_random=2))
+    assert peak[0] == 3  # the three model calls were in flight together
+    assert list(res["targets"]) == ["c", "cpp", "java"]
+    assert res["targets"]["c"]["report"]["pass_rate"] == 1.0
+    assert res["targets"]["cpp"]["report"]["pass_rate"] < 1.0
+    assert "model unavailable" in res["targets"]["java"]["error"]
+    assert runs["python"] == runs["c"] == runs["cpp"]  # one case set, reference run once
+    assert saved[-1]["job_id"] == res["job_id"] == "g"  # one grouped job after the translation records
+
+def test_grouped_job_counts_a_failed_target_as_zero(monkeypatch, tmp_path):
+    monkeypatch.setattr(services, "BUNDLE", False)
+    monkeypatch.setattr(services, "job_dir", lambda job_id: tmp_path)
+    indexed = {}
+    monkeypatch.setattr(services, "record_job", lambda job_id, **fields: indexed.update(fields))
+    results = {"c": {"translated_code": CODE["c"], "report": {"pass_rate": 1.0}},
+               "java": {"translated_code": "int add() {}", "error": "java run failed: does not compile"}}
+    job = services._finish_grouped("python", PY, "add", 2, [[1, 2]], results)
+    assert job["pass_rate"] == indexed["pass_rate"] == 0.0 and job["failed_targets"] == ["java"]
+    assert (tmp_path / "translated_java.txt").exists()
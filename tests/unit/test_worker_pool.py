@@ -0,0 +1,46 @@
+import threading
+import pytest
+from verifier.sandbox import WorkerPool
+
+class _Worker:
+    def __init__(self):
+        self.alive, self.jobs = True, 0
+
+    def kill(self):
+        self.alive = False
+
+class _Pool(WorkerPool):
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.spawned = 0
+
+    def _spawn(self):
+        self.spawned += 1
+        return _Worker()
+
+def test_waiters_get_a_replacement_when_workers_are_recycled():
+    pool = _Pool(size=2, max_jobs=1, acquire_timeout=5)
+    done = []
+
+    def call():
+        for _ in range(5):
+            w = pool.acquire()
+            w.jobs += 1
+            pool.release(w, True)  # worn out after one job: killed and replaced
+        done.append(1)
+
+    threads = [threading.Thread(target=call, daemon=True) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    assert len(done) == 6 and pool.spawned == 30
+    assert pool._created == 0
+
+def test_acquire_times_out_when_every_worker_is_busy():
+    pool = _Pool(size=1, max_jobs=10, acquire_timeout=0.1)
+    w = pool.acquire()
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    pool.release(w, True)
+    assert pool.acquire() is w
@@ -0,0 +1,95 @@
+# translator/batching.py
+from __future__ import annotations
+import threading, time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# Dynamic batching for a local model: concurrent submit() calls are queued,
+# and one scheduler thread hands them to `run(items, key)` in batches of up
+# to `max_batch`. A batch starts as soon as it is full, or `max_wait` seconds
+# after its oldest request arrived. Requests are only batched with others of
+# the same key (e.g. the same max_new_tokens); a full batch of any key goes
+# first, otherwise the key holding the oldest request.
+
+class _Pending:
+    __slots__ = ("item", "future", "arrived")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.future: Future = Future()
+        self.arrived = time.monotonic()
+
+class DynamicBatcher:
+    def __init__(self, run: Callable[[List[Any], Hashable], List[Any]], max_batch: int = 8,
+                 max_wait: float = 0.01, name: str = "ct-batcher"):
+        self.run = run
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait)
+        self.stats = {"requests": 0, "batches": 0, "max_batch_seen": 0}
+        self._queues: Dict[Hashable, List[_Pending]] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any, key: Hashable = None) -> Future:
+        """Queue one request; the future resolves to its entry of run()'s result list."""
+        p = _Pending(item)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("batcher is closed")
+            self._queues.setdefault(key, []).append(p)
+            self.stats["requests"] += 1
+            self._cond.notify()
+        return p.future
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Stop accepting requests; queued ones are still run."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _next_batch(self) -> Optional[tuple]:
+        with self._cond:
+            while True:
+                if not self._queues:
+                    if self._closed:
+                        return None
+                    self._cond.wait()
+                    continue
+                full = [k for k, q in self._queues.items() if len(q) >= self.max_batch]
+                key = full[0] if full else min(self._queues, key=lambda k: self._queues[k][0].arrived)
+                queue = self._queues[key]
+                due = queue[0].arrived + self.max_wait
+                now = time.monotonic()
+                if full or now >= due or self._closed:
+                    batch, rest = queue[:self.max_batch], queue[self.max_batch:]
+                    if rest:
+                        self._queues[key] = rest
+                    else:
+                        del self._queues[key]
+                    self.stats["batches"] += 1
+                    self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(batch))
+                    return key, batch
+                self._cond.wait(due - now)
+
+    def _loop(self):
+        while True:
+            nxt = self._next_batch()
+            if nxt is None:
+                return
+            key, batch = nxt
+            live = [p for p in batch if p.future.set_running_or_notify_cancel()]
+            if not live:
+                continue
+            try:
+                results = self.run([p.item for p in live], key)
+                if len(results) != len(live):
+                    raise RuntimeError(f"batch of {len(live)} returned {len(results)} results")
+            except BaseException as e:
+                for p in live:
+                    p.future.set_exception(e)
+                continue
+            for p, r in zip(live, results):
+                p.future.set_result(r)
@@ -0,0 +1,201 @@
+# translator/cache.py
+from __future__ import annotations
+import asyncio, hashlib, os, sqlite3, threading, time, weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from telemetry.metrics import CACHE_HITS, CACHE_MISSES
+
+# Two-tier cache for model completions: an in-process LRU in front of a local
+# SQLite file, both with a TTL. Identical concurrent misses are coalesced so
+# only one upstream call is made (single flight).
+ROOT = Path(__file__).resolve().parents[1]
+DB_PATH = os.getenv("CT_TRANSLATION_CACHE_DB", str(ROOT / ".cache" / "translations.sqlite3"))  # "" = memory only
+TTL = int(os.getenv("CT_TRANSLATION_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+MEM_ITEMS = int(os.getenv("CT_TRANSLATION_CACHE_SIZE", "512"))
+
+def cache_key(model: str, instructions: str, prompt: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, instructions, prompt):
+        h.update(part.encode("utf-8") + b"\0")
+    return h.hexdigest()
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+class TranslationCache:
+    def __init__(self, path: str = DB_PATH, ttl: int = TTL, max_items: int = MEM_ITEMS):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._mem: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()  # memory tier and flights; never held across SQLite calls
+        self._db_lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        # async single flight; futures belong to one event loop, so one table per loop
+        self._aflights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+            weakref.WeakKeyDictionary()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def _fresh(self, created: float) -> bool:
+        return time.time() - created < self.ttl
+
+    def _remember(self, key: str, value: str, created: float):
+        self._mem[key] = (value, created)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    def _mem_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit and self._fresh(hit[1]):
+                self._mem.move_to_end(key)
+                self.stats["hits"] += 1
+                CACHE_HITS.inc(cache="translation")
+                return hit[0]
+            self._mem.pop(key, None)
+            return None
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute("SELECT value, created FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if not self._fresh(row[1]):
+                self._db.execute("DELETE FROM translations WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+        with self._lock:
+            self._remember(key, row[0], row[1])
+            self.stats["disk_hits"] += 1
+        CACHE_HITS.inc(cache="translation")
+        return row[0]
+
+    def _disk_put(self, key: str, value: str, created: float):
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute("INSERT OR REPLACE INTO translations (key, value, created) VALUES (?, ?, ?)",
+                             (key, value, created))
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._mem_get(key)
+        return value if value is not None else self._disk_get(key)
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        self._disk_put(key, value, now)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for the event loop: the SQLite lookup runs in a worker thread."""
+        value = self._mem_get(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._disk_get, key)
+        return value
+
+    async def aput(self, key: str, value: str):
+        """put() for the event loop: the SQLite write runs in a worker thread."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_put, key, value, now)
+
+    def get_or_compute(self, key: str, compute: Callable[[], str], bypass: bool = False) -> str:
+        """
+        Cached value for key, else compute() once even if many threads ask at
+        the same time. bypass=True skips the lookup but still refreshes the cache.
+        Empty results are returned but not stored.
+        """
+        if not bypass:
+            value = self.get(key)
+            if value is not None:
+                return value
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats["misses"] += 1
+                CACHE_MISSES.inc(cache="translation")
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = compute()
+            if flight.value:
+                self.put(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[str]], bypass: bool = False) -> str:
+        """
+        asyncio twin of get_or_compute: concurrent awaiters share one compute().
+        Only the memory tier is touched on the event loop; SQLite reads and
+        writes run in a worker thread.
+        """
+        if not bypass:
+            value = await self.aget(key)
+            if value is not None:
+                return value
+        with self._lock:
+            flights = self._aflights.setdefault(asyncio.get_running_loop(), {})
+        fut = flights.get(key)
+        if fut is not None:
+            with self._lock:
+                self.stats["coalesced"] += 1
+            return await asyncio.shield(fut)
+        with self._lock:
+            self.stats["misses"] += 1
+        CACHE_MISSES.inc(cache="translation")
+        fut = asyncio.ensure_future(compute())
+        flights[key] = fut
+
+        def _done(f: "asyncio.Future"):
+            flights.pop(key, None)
+            if not f.cancelled() and f.exception() is None and f.result():
+                now = time.time()
+                with self._lock:
+                    self._remember(key, f.result(), now)
+                if self._db is not None:
+                    asyncio.get_running_loop().run_in_executor(None, self._disk_put, key, f.result(), now)
+        fut.add_done_callback(_done)
+        # shielded: a caller that disconnects does not cancel the shared upstream call
+        return await asyncio.shield(fut)
+
+_cache: Optional[TranslationCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> TranslationCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TranslationCache()
+    return _cache
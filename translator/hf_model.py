@@ -1,13 +1,48 @@
 # translator/hf_model.py
 from __future__ import annotations
-import threading
+import asyncio, os, threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from translator.batching import DynamicBatcher
 
 # Small, CPU-friendly baseline. You can switch later (e.g., codet5-base).
 _MODEL_NAME = "Salesforce/codet5-small"
+# Inference backend: "torch" (full precision), "int8" (dynamically quantized
+# Linear layers) or "onnx" (ONNX Runtime via optimum, exported once to
+# ONNX_DIR; the decoder reuses past key/values and the encoder output).
+# CT_HF_DECODE=greedy trades the 4-beam search for one beam.
+BACKEND = os.getenv("CT_HF_BACKEND", "torch")
+DECODE = os.getenv("CT_HF_DECODE", "beam")
+ONNX_DIR = Path(os.getenv("CT_HF_ONNX_DIR", str(Path(__file__).resolve().parents[1] / ".cache" / "onnx" / "codet5-small")))
+# Concurrent prompts are padded into one generate() call: a batch runs once
+# it holds MAX_BATCH prompts or MAX_WAIT_MS after its first one arrived.
+# Only prompts with the same max_new_tokens share a batch.
+MAX_BATCH = int(os.getenv("CT_HF_MAX_BATCH", "8"))
+MAX_WAIT_MS = float(os.getenv("CT_HF_MAX_WAIT_MS", "10"))
 _lock = threading.Lock()
 _tokenizer = None
 _model = None
+_batcher: Optional[DynamicBatcher] = None
+
+def _load_model(backend: str):
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise RuntimeError("CT_HF_BACKEND=onnx needs optimum with onnxruntime: pip install optimum[onnxruntime]") from e
+        if (ONNX_DIR / "config.json").exists():
+            return ORTModelForSeq2SeqLM.from_pretrained(ONNX_DIR, use_cache=True)
+        model = ORTModelForSeq2SeqLM.from_pretrained(_MODEL_NAME, export=True, use_cache=True)
+        model.save_pretrained(ONNX_DIR)
+        return model
+    model = AutoModelForSeq2SeqLM.from_pretrained(_MODEL_NAME).eval()
+    if backend == "int8":
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend != "torch":
+        raise ValueError(f"Unknown CT_HF_BACKEND {backend!r} (torch, int8 or onnx)")
+    return model
 
 def _lazy_load():
     global _tokenizer, _model
@@ -15,17 +50,32 @@ def _lazy_load():
         with _lock:
             if _tokenizer is None or _model is None:
                 _tokenizer = AutoTokenizer.from_pretrained(_MODEL_NAME)
-                _model = AutoModelForSeq2SeqLM.from_pretrained(_MODEL_NAME)
+                _model = _load_model(BACKEND)
 
-def translate_raw(prompt: str, max_new_tokens: int = 256) -> str:
+def _decoding() -> Dict[str, Any]:
+    if DECODE == "greedy":
+        return {"num_beams": 1, "do_sample": False, "no_repeat_ngram_size": 3}
+    return {"num_beams": 4, "early_stopping": True, "no_repeat_ngram_size": 3}
+
+def _generate(prompts: List[str], max_new_tokens: int) -> List[str]:
+    """One padded generate() over a batch of prompts (same decoding as a single prompt)."""
     _lazy_load()
-    inputs = _tokenizer(prompt, return_tensors="pt")
-    out_ids = _model.generate(
-        **inputs,
-        max_new_tokens=max_new_tokens,
-        num_beams=4,
-        early_stopping=True,
-        no_repeat_ngram_size=3,
-    )
-    return _tokenizer.decode(out_ids[0], skip_special_tokens=True)
+    inputs = _tokenizer(prompts, return_tensors="pt", padding=True)
+    with torch.inference_mode():
+        out_ids = _model.generate(**inputs, max_new_tokens=max_new_tokens, **_decoding())
+    return _tokenizer.batch_decode(out_ids, skip_special_tokens=True)
+
+def _get_batcher() -> DynamicBatcher:
+    global _batcher
+    if _batcher is None:
+        with _lock:
+            if _batcher is None:
+                _batcher = DynamicBatcher(_generate, MAX_BATCH, MAX_WAIT_MS / 1000, name="ct-hf-batcher")
+    return _batcher
+
+def translate_raw(prompt: str, max_new_tokens: int = 256) -> str:
+    return _get_batcher().submit(prompt, key=max_new_tokens).result()
 
+async def translate_raw_async(prompt: str, max_new_tokens: int = 256) -> str:
+    """Same as translate_raw without blocking the event loop while the batch runs."""
+    return await asyncio.wrap_future(_get_batcher().submit(prompt, key=max_new_tokens))
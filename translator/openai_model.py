@@ -1,28 +1,113 @@
 # translator/openai_model.py
 from __future__ import annotations
 import os
-from openai import OpenAI
+from typing import TYPE_CHECKING, AsyncIterator
+from translator.cache import cache_key, get_cache
+from telemetry.metrics import span
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+INSTRUCTIONS = "You are a strict code-to-code translator. Output only code."
 _client = None
+_async_client = None
+
+# The SDK is imported on first use (it dominates import time otherwise), and
+# a missing key only fails the calls that need the model.
+def _api_key() -> str:
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        raise RuntimeError("❌ OPENAI_API_KEY not found in environment or .env file")
+    return key
 
 def _get_client() -> OpenAI:
     global _client
     if _client is None:
-        _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        from openai import OpenAI
+        _client = OpenAI(api_key=_api_key())
     return _client
 
-def translate_with_openai(prompt: str) -> str:
+def _get_async_client() -> AsyncOpenAI:
+    global _async_client
+    if _async_client is None:
+        from openai import AsyncOpenAI
+        _async_client = AsyncOpenAI(api_key=_api_key())
+    return _async_client
+
+def _model() -> str:
+    return os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+def translate_with_openai(prompt: str, use_cache: bool = True) -> str:
     """
     Uses Responses API (recommended). Returns plain text.
+    Completions are deterministic (temperature=0), so they are served from the
+    translation cache when possible; use_cache=False forces a fresh call.
     """
+    model = _model()
+    key = cache_key(model, INSTRUCTIONS, prompt)
+    return get_cache().get_or_compute(key, lambda: _complete(model, prompt), bypass=not use_cache)
+
+async def translate_with_openai_async(prompt: str, use_cache: bool = True) -> str:
+    """Same as translate_with_openai, on the async client (never blocks the event loop)."""
+    model = _model()
+    key = cache_key(model, INSTRUCTIONS, prompt)
+    return await get_cache().aget_or_compute(key, lambda: _complete_async(model, prompt), bypass=not use_cache)
+
+async def stream_with_openai_async(prompt: str, use_cache: bool = True) -> AsyncIterator[str]:
+    """
+    Yield output text deltas as the model produces them. A cached completion
+    is yielded in one piece; a finished stream is stored in the cache.
+    """
+    model = _model()
+    key = cache_key(model, INSTRUCTIONS, prompt)
+    cache = get_cache()
+    if use_cache:
+        hit = await cache.aget(key)
+        if hit is not None:
+            yield hit
+            return
+    parts = []
+    with span("llm"):  # includes time the consumer spends between deltas
+        stream = await _get_async_client().responses.create(
+            model=model,
+            input=prompt,
+            instructions=INSTRUCTIONS,
+            temperature=0,
+            stream=True,
+        )
+        async for event in stream:
+            if event.type == "response.output_text.delta":
+                parts.append(event.delta)
+                yield event.delta
+            elif event.type in ("response.failed", "error"):
+                raise RuntimeError(f"OpenAI stream failed: {getattr(event, 'message', None) or event.type}")
+    text = "".join(parts)
+    if text:
+        await cache.aput(key, text)
+
+def _complete(model: str, prompt: str) -> str:
     client = _get_client()
-    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-    resp = client.responses.create(
-        model=model,
-        input=prompt,
-        instructions="You are a strict code-to-code translator. Output only code.",
-        temperature=0
-    )
+    with span("llm"):
+        resp = client.responses.create(
+            model=model,
+            input=prompt,
+            instructions=INSTRUCTIONS,
+            temperature=0
+        )
+    return _output_text(resp)
+
+async def _complete_async(model: str, prompt: str) -> str:
+    client = _get_async_client()
+    with span("llm"):
+        resp = await client.responses.create(
+            model=model,
+            input=prompt,
+            instructions=INSTRUCTIONS,
+            temperature=0
+        )
+    return _output_text(resp)
+
+def _output_text(resp) -> str:
     # The SDK exposes a convenience to combine outputs:
     try:
         return resp.output_text
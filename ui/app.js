@@ -50,6 +50,37 @@ async function callAPI(url, body){
   return await r.json();
 }
 
+// POST + Server-Sent Events reader (EventSource only supports GET)
+async function streamAPI(url, body, onEvent){
+  const r = await fetch(url, {
+    method:'POST',
+    headers:{'Content-Type':'application/json', 'Accept':'text/event-stream'},
+    body: JSON.stringify(body)
+  });
+  if(!r.ok || !r.body){
+    throw new Error(`HTTP ${r.status}: ${await r.text()}`);
+  }
+  const reader = r.body.getReader();
+  const decoder = new TextDecoder();
+  let buf = "";
+  for(;;){
+    const {value, done} = await reader.read();
+    if(done) break;
+    buf += decoder.decode(value, {stream:true});
+    let sep;
+    while((sep = buf.indexOf('\n\n')) >= 0){
+      const block = buf.slice(0, sep);
+      buf = buf.slice(sep + 2);
+      let name = 'message', data = '';
+      block.split('\n').forEach((line)=>{
+        if(line.startsWith('event:')) name = line.slice(6).trim();
+        else if(line.startsWith('data:')) data += line.slice(5).trim();
+      });
+      if(data) onEvent(name, JSON.parse(data));
+    }
+  }
+}
+
 function getPayload(){
   let inputs = null;
   const raw = (customInp.value || "").trim();
@@ -88,13 +119,20 @@ function showResults(rep, job_id){
   resultsBox.classList.remove('hidden');
 }
 
-function renderHistory(items){
-  historyList.innerHTML = "";
-  window.historyData = items || [];
-  if(!items.length){
+let historyCursor = null;
+
+function renderHistory(items, append){
+  if(!append){
+    historyList.innerHTML = "";
+    window.historyData = [];
+  }
+  window.historyData = (window.historyData || []).concat(items || []);
+  if(!window.historyData.length){
     historyList.innerHTML = `<div class="history-item"><div class="history-meta">No history yet.</div></div>`;
     return;
   }
+  const more = document.getElementById('btn-history-more');
+  if(more) more.remove();
   items.forEach((it)=>{
     const div = document.createElement('div');
     div.className = 'history-item';
@@ -102,25 +140,45 @@ function renderHistory(items){
     const title = `${it.source_lang} → ${it.target_lang} · ${it.function_name || 'func'}`;
     const sub = `#${it.job_id || '—'} · ${it.verified ? 'Verified' : 'Unverified'} · ${Math.round((it.pass_rate||0)*100)}% · ${ts}`;
     div.innerHTML = `<div class="history-title">${title}</div><div class="history-meta">${sub}</div>`;
-    div.addEventListener('click', ()=>{
-      // Load into UI
-      sourceSel.value = it.source_lang;
-      targetSel.value = it.target_lang;
-      fnameInp.value  = it.function_name || 'func';
-      codeTa.value    = it.source_code || '';
-      outTa.value     = it.translated_code || '';
-      lastTranslatedCode = it.translated_code || '';
-      lastTarget = it.target_lang || lastTarget;
-      // If report exists show it
-      if(it.report){
-        showResults(it.report, it.job_id);
-      }else{
-        resultsBox.classList.add('hidden');
-      }
-      window.scrollTo({top:0, behavior:'smooth'});
-    });
+    div.addEventListener('click', ()=> openHistoryItem(it));
     historyList.appendChild(div);
   });
+  if(historyCursor){
+    const btn = document.createElement('button');
+    btn.id = 'btn-history-more';
+    btn.className = 'secondary sm';
+    btn.textContent = 'Load more';
+    btn.addEventListener('click', ()=> loadHistory(true));
+    historyList.appendChild(btn);
+  }
+}
+
+// History entries are summaries; fetch the full job (code + report) on click
+async function openHistoryItem(summary){
+  let it = summary;
+  try{
+    const r = await fetch(`/api/history/${encodeURIComponent(summary.job_id)}`);
+    if(r.ok) it = await r.json();
+  }catch(e){
+    console.error('history detail error', e);
+  }
+  // grouped (multi-target) jobs open on their first target
+  const target = Array.isArray(it.target_lang) ? it.target_lang[0] : it.target_lang;
+  const one = (it.targets && it.targets[target]) || it;
+  sourceSel.value = it.source_lang;
+  targetSel.value = target;
+  fnameInp.value  = it.function_name || 'func';
+  codeTa.value    = it.source_code || '';
+  outTa.value     = one.translated_code || '';
+  lastTranslatedCode = one.translated_code || '';
+  lastTarget = target || lastTarget;
+  // If report exists show it
+  if(one.report){
+    showResults(one.report, it.job_id);
+  }else{
+    resultsBox.classList.add('hidden');
+  }
+  window.scrollTo({top:0, behavior:'smooth'});
 }
 
 // Actions
@@ -130,11 +188,19 @@ btnTranslate.addEventListener('click', async ()=>{
   lastTarget = payload.target_lang;
 
   showStatus('Translating…');
+  outTa.value = '';
   try{
-    const data = await callAPI('/api/translate', payload);
-    const code = data.translated_code || data.error || '';
-    lastTranslatedCode = code;
-    outTa.value = code;
+    await streamAPI('/api/translate/stream', payload, (name, data)=>{
+      if(name === 'delta'){
+        hideStatus();
+        outTa.value += data.text;
+      }else if(name === 'done'){
+        lastTranslatedCode = data.translated_code || '';
+        outTa.value = lastTranslatedCode;
+      }else if(name === 'error'){
+        outTa.value = `Error: ${data.error}`;
+      }
+    });
   }catch(err){
     outTa.value = `Error: ${err.message}`;
   }finally{
@@ -194,15 +260,19 @@ btnLoadExample.addEventListener('click', ()=>{
 
 btnRefreshHistory.addEventListener('click', loadHistory);
 
-// History loader
-async function loadHistory(){
+// History loader (append=true fetches the next page)
+async function loadHistory(append){
+  append = append === true;
   try{
-    const r = await fetch('/api/history');
+    const qs = new URLSearchParams({limit: '25'});
+    if(append && historyCursor) qs.set('cursor', historyCursor);
+    const r = await fetch(`/api/history?${qs}`);
     const data = await r.json();
-    renderHistory(data.items || []);
+    historyCursor = data.next_cursor || null;
+    renderHistory(data.items || [], append);
   }catch(e){
     console.error('history error', e);
-    renderHistory([]);
+    if(!append) renderHistory([]);
   }
 }
 
@@ -0,0 +1,230 @@
+# verifier/build_cache.py
+from __future__ import annotations
+import asyncio, hashlib, os, shutil, subprocess, tempfile, threading, uuid, weakref
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from verifier.sandbox import mkworkdir, write_file, run_cmd, run_cmd_async, cleanup, RunResult
+from telemetry.metrics import CACHE_HITS, CACHE_MISSES, COMPILE_FAILURES, span
+
+# Content-addressed cache of compiled artifacts. An entry is keyed by the
+# generated sources, the compiler binary + version and the compile flags, and
+# lives in CACHE_DIR/<sha256>/ with a ".ok" marker written last. The marker's
+# mtime is bumped on every hit, so eviction drops least recently used entries
+# once the directory grows past MAX_BYTES. Callers that pass `into` get the
+# outputs hard-linked into their own run directory, so an eviction can never
+# remove a binary a harness is still (re)starting from.
+CACHE_DIR = Path(os.getenv("CT_BUILD_CACHE_DIR", str(Path(tempfile.gettempdir()) / "ct_build_cache")))
+MAX_BYTES = int(os.getenv("CT_BUILD_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+_lock = threading.Lock()
+_stripes = [threading.Lock() for _ in range(64)]  # per-key locks: one compile per key at a time
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_LANG_OF = {"gcc": "c", "g++": "cpp", "javac": "java"}  # metric label per compiler
+
+@lru_cache(maxsize=None)
+def compiler_id(compiler: str) -> str:
+    """Resolved compiler path plus its version banner (part of every cache key)."""
+    path = shutil.which(compiler) or compiler
+    for flag in ("--version", "-version"):
+        try:
+            cp = subprocess.run([path, flag], capture_output=True, text=True, timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            break
+        if cp.returncode == 0:
+            return f"{path}\n{(cp.stdout or cp.stderr).strip()}"
+    return path
+
+def cache_key(sources: Dict[str, str], cmd: List[str]) -> str:
+    h = hashlib.sha256(compiler_id(cmd[0]).encode("utf-8"))
+    for part in cmd[1:]:
+        h.update(b"\0" + part.encode("utf-8"))
+    for name in sorted(sources):
+        h.update(b"\0" + name.encode("utf-8") + b"\0" + sources[name].encode("utf-8"))
+    return h.hexdigest()
+
+def _count(name: str, n: int = 1):
+    with _lock:
+        _stats[name] += n
+    if name in ("hits", "misses"):
+        (CACHE_HITS if name == "hits" else CACHE_MISSES).inc(n, cache="build")
+
+def _stripe(key: str) -> threading.Lock:
+    return _stripes[int(key[:8], 16) % len(_stripes)]
+
+def _link(src: Path, patterns: List[str], dst: Path):
+    """Hard-link (or copy, across file systems) the files of `src` matching `patterns` into `dst`."""
+    for pattern in patterns:
+        for f in src.glob(pattern):
+            try:
+                os.link(f, dst / f.name)
+            except OSError:
+                shutil.copy2(f, dst / f.name)
+
+def _take(key: str, outputs: List[str], into: Optional[Path], count: bool = True) -> Optional[Path]:
+    """
+    The cache entry for `key` (bumping its LRU time), or None. With `into`,
+    the outputs are linked there while eviction is locked out and `into` is
+    returned instead of the entry.
+    """
+    entry = CACHE_DIR / key
+    marker = entry / ".ok"
+    with _lock:
+        if not marker.exists():
+            return None
+        try:
+            os.utime(marker)
+        except OSError:
+            pass
+        if into is not None:
+            _link(entry, outputs, into)
+    if count:
+        _count("hits")
+    return entry if into is None else into
+
+def _publish(key: str, work: Path, outputs: List[str]) -> Path:
+    """Copy build outputs from `work` into the cache entry for `key`."""
+    entry = CACHE_DIR / key
+    tmp = CACHE_DIR / f".tmp-{key}-{uuid.uuid4().hex[:8]}"
+    tmp.mkdir(parents=True)
+    for pattern in outputs:
+        for f in work.glob(pattern):
+            shutil.copy2(f, tmp / f.name)
+    (tmp / ".ok").write_text("", encoding="utf-8")
+    if (entry / ".ok").exists():
+        cleanup(tmp)  # another builder published the same entry first
+        return entry
+    cleanup(entry)  # leftover of an interrupted build, if any
+    try:
+        os.replace(tmp, entry)
+    except OSError:
+        cleanup(tmp)
+    return entry
+
+def _compile(cmd: List[str], work: Path) -> RunResult:
+    lang = _LANG_OF.get(Path(cmd[0]).name, cmd[0])
+    with span("compile", lang):
+        cc = run_cmd(cmd, cwd=work)
+    if not cc.ok:
+        COMPILE_FAILURES.inc(lang=lang)
+    return cc
+
+def build(sources: Dict[str, str], cmd: List[str], outputs: List[str],
+          into: Optional[Path] = None) -> Tuple[Optional[Path], RunResult]:
+    """
+    Compile `sources` with `cmd` (run inside a scratch dir, so use relative
+    file names) unless an identical build is cached. Returns the directory
+    holding the files matching `outputs` (glob patterns) and the compile
+    result; the directory is None when compilation failed. Failures are not
+    cached. With `into`, the outputs are linked into that directory (use it
+    when the files are executed afterwards); otherwise the cache entry itself
+    is returned.
+    """
+    key = cache_key(sources, cmd)
+    with _stripe(key):
+        entry = _take(key, outputs, into)
+        if entry is not None:
+            return entry, RunResult(True, 0, "", "", entry)
+        _count("misses")
+        work = mkworkdir("ct_build_")
+        try:
+            for name, text in sources.items():
+                write_file(work / name, text)
+            cc = _compile(cmd, work)
+            if not cc.ok:
+                return None, cc
+            entry = _publish(key, work, outputs)
+            if into is not None:
+                _link(work, outputs, into)
+                entry = into
+        finally:
+            cleanup(work)
+    evict(keep=key)
+    return entry, cc
+
+# async builds in progress, so a key compiles once; futures belong to one event loop
+_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = weakref.WeakKeyDictionary()
+
+async def build_async(sources: Dict[str, str], cmd: List[str], outputs: List[str],
+                      into: Optional[Path] = None) -> Tuple[Optional[Path], RunResult]:
+    """asyncio twin of build(); concurrent callers for the same key share one compile."""
+    key = cache_key(sources, cmd)
+    count = True
+    while True:
+        entry = await asyncio.to_thread(_take, key, outputs, into, count)
+        if entry is not None:
+            return entry, RunResult(True, 0, "", "", entry)
+        flights = _inflight.setdefault(asyncio.get_running_loop(), {})
+        fut = flights.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(_compile_async(key, sources, cmd, outputs))
+            flights[key] = fut
+            fut.add_done_callback(lambda _: flights.pop(key, None))
+        entry, cc = await asyncio.shield(fut)
+        if entry is None:
+            return None, cc
+        count = False  # take the fresh entry; compiles again only if it was evicted meanwhile
+
+async def _compile_async(key: str, sources: Dict[str, str], cmd: List[str], outputs: List[str]) -> Tuple[Optional[Path], RunResult]:
+    _count("misses")
+    work = mkworkdir("ct_build_")
+    try:
+        for name, text in sources.items():
+            write_file(work / name, text)
+        lang = _LANG_OF.get(Path(cmd[0]).name, cmd[0])
+        with span("compile", lang):
+            cc = await run_cmd_async(cmd, cwd=work)
+        if not cc.ok:
+            COMPILE_FAILURES.inc(lang=lang)
+            return None, cc
+
+        def publish() -> Path:
+            with _stripe(key):
+                return _publish(key, work, outputs)
+        entry = await asyncio.to_thread(publish)
+    finally:
+        cleanup(work)
+    await asyncio.to_thread(evict, key)
+    return entry, cc
+
+def _entries() -> List[Tuple[float, int, Path]]:
+    rows = []
+    if not CACHE_DIR.exists():
+        return rows
+    for p in CACHE_DIR.iterdir():
+        marker = p / ".ok"
+        if p.name.startswith(".") or not marker.exists():
+            continue
+        try:
+            size = sum(f.stat().st_size for f in p.iterdir())
+            rows.append((marker.stat().st_mtime, size, p))
+        except OSError:
+            continue
+    return rows
+
+def evict(keep: str = "", max_bytes: Optional[int] = None) -> int:
+    """Drop least recently used entries until the cache fits; returns bytes freed."""
+    limit = MAX_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        rows = sorted(_entries())
+        total = sum(size for _, size, _ in rows)
+        freed = 0
+        for _, size, p in rows:
+            if total <= limit:
+                break
+            if p.name == keep:
+                continue
+            cleanup(p)
+            total -= size
+            freed += size
+            _stats["evictions"] += 1
+    return freed
+
+def clear():
+    """Remove every entry (used by benchmarks to measure cold builds)."""
+    evict(max_bytes=0)
+
+def stats() -> Dict[str, int]:
+    rows = _entries()
+    with _lock:
+        return {**_stats, "entries": len(rows), "bytes": sum(size for _, size, _ in rows)}
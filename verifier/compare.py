@@ -1,7 +1,7 @@
 # verifier/compare.py
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 @dataclass
 class CaseResult:
@@ -14,7 +14,9 @@ class CaseResult:
 def norm_int(s: str) -> str:
     return s.strip().splitlines()[-1].strip()
 
-def build_report(cases: List[List[int]], ref_out: List[str], tgt_out: List[str]) -> Dict[str, Any]:
+def build_report(cases: List[List[int]], ref_out: List[str], tgt_out: List[str],
+                 ref_cached: Optional[List[bool]] = None) -> Dict[str, Any]:
+    """ref_cached flags the cases whose expected output came from the reference memo."""
     rows: List[CaseResult] = []
     passed = 0
     for args, e, g in zip(cases, ref_out, tgt_out):
@@ -23,9 +25,14 @@ def build_report(cases: List[List[int]], ref_out: List[str], tgt_out: List[str])
         ok = (e1 == g1)
         if ok: passed += 1
         rows.append(CaseResult(args=args, expected=e1, got=g1, ok=ok))
-    return {
+    report = {
         "total": len(cases),
         "passed": passed,
         "pass_rate": (passed / len(cases)) if cases else 0.0,
         "cases": [r.__dict__ for r in rows],
     }
+    if ref_cached is not None:
+        for row, hit in zip(report["cases"], ref_cached):
+            row["ref_cached"] = hit
+        report["ref_cached"] = sum(ref_cached)
+    return report
@@ -0,0 +1,119 @@
+# verifier/executor.py
+from __future__ import annotations
+import asyncio, contextvars, math, os, threading, weakref
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Awaitable, Callable, Dict, List, Optional
+from verifier.sandbox import RunResult
+
+# Thread pools that run test cases as concurrent chunks. Every chunk is a
+# batch runner call (a subprocess or a worker round-trip), so threads only
+# wait on I/O. Each language has its own pool, sized to how many chunks of
+# that language may run at once, so a burst of one language queues without
+# holding threads the others need; limits derive from the CPU count and can
+# be set with CT_CONCURRENCY_<LANG>.
+CPU = os.cpu_count() or 1
+_DEFAULT_LIMITS = {"python": CPU, "c": CPU, "cpp": CPU, "java": max(1, CPU // 2)}
+LANG_LIMITS: Dict[str, int] = {
+    lang: max(1, int(os.getenv(f"CT_CONCURRENCY_{lang.upper()}", str(n)))) for lang, n in _DEFAULT_LIMITS.items()
+}
+MIN_CHUNK = int(os.getenv("CT_MIN_CHUNK", "4"))  # smallest number of cases worth its own chunk
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pool_lock = threading.Lock()
+
+def get_executor(lang: str) -> ThreadPoolExecutor:
+    pool = _pools.get(lang)
+    if pool is None:
+        with _pool_lock:
+            pool = _pools.get(lang)
+            if pool is None:
+                pool = _pools[lang] = ThreadPoolExecutor(max_workers=LANG_LIMITS.get(lang, 1),
+                                                         thread_name_prefix=f"ct-cases-{lang}")
+    return pool
+
+def _parts(lang: str, n_cases: int) -> int:
+    return max(1, min(LANG_LIMITS.get(lang, 1), math.ceil(n_cases / MIN_CHUNK)))
+
+def _split(cases: List[List[int]], parts: int) -> List[List[List[int]]]:
+    if not cases:
+        return []
+    size = math.ceil(len(cases) / parts)
+    return [cases[i:i + size] for i in range(0, len(cases), size)]
+
+def _guarded(run: Callable[[List[List[int]]], List[RunResult]], chunk: List[List[int]],
+             cancelled: threading.Event) -> List[RunResult]:
+    if cancelled.is_set():  # cancelled while it was being picked up
+        return []
+    return run(chunk)
+
+class CaseBatch:
+    """Cases of one language running as ordered chunks on that language's pool."""
+    def __init__(self, lang: str, run: Callable[[List[List[int]]], List[RunResult]], cases: List[List[int]]):
+        parts = _parts(lang, len(cases))
+        pool = get_executor(lang)
+        self._cancelled = threading.Event()
+        # each chunk runs in a copy of the caller's context (request timings follow it)
+        self.futures: List[Future] = [
+            pool.submit(contextvars.copy_context().run, _guarded, run, chunk, self._cancelled)
+            for chunk in _split(cases, parts)
+        ]
+
+    def results(self) -> List[RunResult]:
+        """All results in case order (blocks until every chunk is done)."""
+        return [r for f in self.futures for r in f.result()]
+
+    def first_failure(self) -> Optional[RunResult]:
+        """
+        Wait for chunks in completion order; on the first failed case cancel the
+        chunks that have not started and return that failure.
+        """
+        for f in as_completed(self.futures):
+            for r in f.result():
+                if not r.ok:
+                    self.cancel()
+                    return r
+        return None
+
+    def cancel(self):
+        self._cancelled.set()
+        for f in self.futures:
+            f.cancel()
+
+# ---------- asyncio variant ----------
+class CaseFailed(Exception):
+    """Raised by gather_cases(fail_fast=True) with the first failing case result."""
+    def __init__(self, result: RunResult):
+        super().__init__(result.stderr)
+        self.result = result
+
+# asyncio semaphores belong to one event loop, so keep a set per loop
+_loop_sems: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+def _async_sem(lang: str) -> asyncio.Semaphore:
+    sems = _loop_sems.setdefault(asyncio.get_running_loop(), {})
+    if lang not in sems:
+        sems[lang] = asyncio.Semaphore(LANG_LIMITS.get(lang, 1))
+    return sems[lang]
+
+async def gather_cases(lang: str, run: Callable[[List[List[int]]], Awaitable[List[RunResult]]],
+                       cases: List[List[int]], fail_fast: bool = False) -> List[RunResult]:
+    """
+    Run cases as concurrent chunks under the language limit and return results
+    in case order. With fail_fast the first failing chunk cancels the others
+    and CaseFailed is raised.
+    """
+    async def one(chunk: List[List[int]]) -> List[RunResult]:
+        async with _async_sem(lang):
+            return await run(chunk)
+
+    tasks = [asyncio.ensure_future(one(chunk)) for chunk in _split(cases, _parts(lang, len(cases)))]
+    try:
+        if fail_fast:
+            for fut in asyncio.as_completed(tasks):
+                for r in await fut:
+                    if not r.ok:
+                        raise CaseFailed(r)
+        return [r for t in tasks for r in await t]
+    finally:
+        for t in tasks:
+            t.cancel()
@@ -0,0 +1,87 @@
+# verifier/ref_cache.py
+from __future__ import annotations
+import hashlib, os, threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from verifier.sandbox import RunResult
+from telemetry.metrics import CACHE_HITS, CACHE_MISSES
+
+# Memo of reference (source-language) results per test case, keyed by
+# (language, hash of the source with unified line endings, function, arguments),
+# so re-verifying a source against another target or an edited translation
+# only executes the cases not seen before. Only successful runs are stored
+# (failures may be timeouts or resource limits). In-memory LRU of MAX_ITEMS
+# cases; CT_REF_CACHE_SIZE=0 disables it.
+MAX_ITEMS = int(os.getenv("CT_REF_CACHE_SIZE", "4096"))
+
+def normalize_source(code: str) -> str:
+    """
+    Only line endings are unified: any other whitespace may sit inside a
+    string literal (Python triple quotes, C line continuations) and change
+    what the program prints.
+    """
+    return code.replace("\r\n", "\n").replace("\r", "\n")
+
+def source_hash(code: str) -> str:
+    return hashlib.sha256(normalize_source(code).encode("utf-8")).hexdigest()
+
+class RefCache:
+    def __init__(self, max_items: int = MAX_ITEMS):
+        self.max_items = max_items
+        self._items: "OrderedDict[tuple, Tuple[str, str]]" = OrderedDict()  # key -> (stdout, stderr)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def lookup(self, lang: str, code: str, func_name: str, cases: List[List[int]]) -> List[Optional[RunResult]]:
+        """A cached RunResult per case, None where the case still has to run."""
+        if self.max_items <= 0:
+            return [None] * len(cases)
+        h = source_hash(code)
+        out: List[Optional[RunResult]] = []
+        with self._lock:
+            for args in cases:
+                key = (lang, h, func_name, tuple(args))
+                hit = self._items.get(key)
+                if hit is None:
+                    out.append(None)
+                    continue
+                self._items.move_to_end(key)
+                out.append(RunResult(True, 0, hit[0], hit[1], None))
+            hits = sum(r is not None for r in out)
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(cases) - hits
+        if hits:
+            CACHE_HITS.inc(hits, cache="reference")
+        if len(cases) > hits:
+            CACHE_MISSES.inc(len(cases) - hits, cache="reference")
+        return out
+
+    def store(self, lang: str, code: str, func_name: str, cases: List[List[int]], results: List[RunResult]):
+        if self.max_items <= 0:
+            return
+        h = source_hash(code)
+        with self._lock:
+            for args, r in zip(cases, results):
+                if not r.ok:
+                    continue
+                key = (lang, h, func_name, tuple(args))
+                self._items[key] = (r.stdout, r.stderr)
+                self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+_cache: Optional[RefCache] = None
+_cache_lock = threading.Lock()
+
+def get_ref_cache() -> RefCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RefCache()
+    return _cache
@@ -1,44 +1,126 @@
 # verifier/runners/c_runner.py
 from __future__ import annotations
 from pathlib import Path
-from verifier.sandbox import mkworkdir, write_file, run_cmd, cleanup, RunResult
+from typing import List
+from verifier.sandbox import mkworkdir, run_batch, run_batch_async, cleanup, RunResult, DEFAULT_TIMEOUT
+from verifier.build_cache import build, build_async
+from telemetry.metrics import count_timeouts, span
 
+# Batch harness: compiled once, reads one argument tuple per stdin line and
+# prints one marked result line per case (see verifier.sandbox.run_batch).
+# Each case runs in a forked child, so static/global state starts fresh as it
+# would with one process per case. The child hands its result back over a
+# pipe; when it dies without one, the harness ends the same way so the driver
+# sees the crash. argv[1] (optional) caps how long an orphaned child may live.
 C_TEMPLATE = r"""/* GENERATED */
+#define _POSIX_C_SOURCE 200809L
 #include <stdio.h>
 #include <stdlib.h>
+#include <signal.h>
+#ifndef _WIN32
+#include <unistd.h>
+#include <sys/wait.h>
+#endif
+#ifdef __linux__
+#include <sys/prctl.h>
+#endif
 {user_code}
 
-/* Up to 4 args for now; extend as needed */
-int __ct_dispatch(int argc, char** argv){
-    switch(argc-1){
-        case 0: return {func_name}();
-        case 1: return {func_name}(atoi(argv[1]));
-        case 2: return {func_name}(atoi(argv[1]), atoi(argv[2]));
-        case 3: return {func_name}(atoi(argv[1]), atoi(argv[2]), atoi(argv[3]));
-        case 4: return {func_name}(atoi(argv[1]), atoi(argv[2]), atoi(argv[3]), atoi(argv[4]));
-        default: return 0;
-    }
-}
-
-int main(int argc, char** argv){
-    int out = __ct_dispatch(argc, argv);
-    printf("%d\n", out);
+static int ct_call(int *a, char *res, size_t cap){{
+    (void)a;
+    return snprintf(res, cap, "%d", {func_name}({call_args}));
+}}
+
+int main(int argc, char **argv){{
+    unsigned limit = argc > 1 ? (unsigned)atoi(argv[1]) : 0;
+    char line[4096], res[64];
+    (void)limit;
+    while (fgets(line, sizeof line, stdin)) {{
+        int a[{slots}] = {{0}};
+        char *p = line, *end;
+        for (int i = 0; i < {nargs}; i++) {{
+            a[i] = (int)strtol(p, &end, 10);
+            p = end;
+        }}
+        (void)p; (void)end;
+#ifdef _WIN32
+        ct_call(a, res, sizeof res);
+#else
+        int fd[2];
+        if (pipe(fd) != 0) return 70;
+        fflush(stdout);
+        pid_t parent = getpid(), pid = fork();
+        if (pid < 0) return 71;
+        if (pid == 0) {{
+#ifdef __linux__
+            prctl(PR_SET_PDEATHSIG, SIGKILL);
+#endif
+            if (getppid() != parent) _exit(1);
+            if (limit) alarm(limit);
+            close(fd[0]);
+            int n = ct_call(a, res, sizeof res);
+            fflush(stdout);
+            _exit(write(fd[1], res, (size_t)n) == n ? 0 : 72);
+        }}
+        close(fd[1]);
+        size_t got = 0;
+        ssize_t n;
+        while (got < sizeof res - 1 && (n = read(fd[0], res + got, sizeof res - 1 - got)) > 0) got += (size_t)n;
+        close(fd[0]);
+        int st = 0;
+        waitpid(pid, &st, 0);
+        if (!got) {{
+            if (WIFSIGNALED(st)) {{ signal(WTERMSIG(st), SIG_DFL); raise(WTERMSIG(st)); }}
+            return WIFEXITED(st) ? WEXITSTATUS(st) : 1;
+        }}
+        res[got] = 0;
+#endif
+        printf("@@CT@@ %s\n", res);
+        fflush(stdout);
+    }}
     return 0;
-}
+}}
 """
 
-def run_c_func(code: str, func_name: str, args: list[int]) -> RunResult:
+COMPILE_CMD = ["gcc", "prog.c", "-O2", "-std=c11", "-o", "prog.exe"]
+
+def _harness(code: str, func_name: str, nargs: int) -> str:
+    return C_TEMPLATE.format(
+        user_code=code, func_name=func_name, nargs=nargs, slots=max(nargs, 1),
+        call_args=", ".join(f"a[{i}]" for i in range(nargs)),
+    )
+
+def run_c_batch(code: str, func_name: str, cases: List[List[int]], timeout: int = DEFAULT_TIMEOUT) -> List[RunResult]:
+    """Build the harness once (or reuse a cached build) and run every case through it."""
+    if not cases:
+        return []
     work = mkworkdir("ct_c_")
     try:
-        src = C_TEMPLATE.format(user_code=code, func_name=func_name)
-        cfile = work / "prog.c"
-        exe = work / "prog.exe"
-        write_file(cfile, src)
-
-        cc = run_cmd(["gcc", str(cfile), "-O2", "-std=c11", "-o", str(exe)], cwd=work)
-        if not cc.ok:
-            return cc
-        rr = run_cmd([str(exe), *map(str, args)], cwd=work)
-        return rr
+        exe_dir, cc = build({"prog.c": _harness(code, func_name, len(cases[0]))}, COMPILE_CMD, ["prog.exe"], into=work)
+        if exe_dir is None:
+            return [cc] * len(cases)
+        with span("run", "c"):
+            results = run_batch([str(exe_dir / "prog.exe"), str(int(timeout) + 1)], work, cases, timeout=timeout)
+        count_timeouts("c", results)
+        return results
     finally:
         cleanup(work)
+
+async def run_c_batch_async(code: str, func_name: str, cases: List[List[int]], timeout: int = DEFAULT_TIMEOUT) -> List[RunResult]:
+    """asyncio twin of run_c_batch (compile and run via asyncio subprocesses)."""
+    if not cases:
+        return []
+    work = mkworkdir("ct_c_")
+    try:
+        exe_dir, cc = await build_async({"prog.c": _harness(code, func_name, len(cases[0]))}, COMPILE_CMD, ["prog.exe"], into=work)
+        if exe_dir is None:
+            return [cc] * len(cases)
+        with span("run", "c"):
+            results = await run_batch_async([str(exe_dir / "prog.exe"), str(int(timeout) + 1)], work, cases, timeout=timeout)
+        count_timeouts("c", results)
+        return results
+    finally:
+        cleanup(work)
+
+def run_c_func(code: str, func_name: str, args: list[int]) -> RunResult:
+    return run_c_batch(code, func_name, [args])[0]
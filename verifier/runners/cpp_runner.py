@@ -1,44 +1,128 @@
 # verifier/runners/cpp_runner.py
 from __future__ import annotations
 from pathlib import Path
-from verifier.sandbox import mkworkdir, write_file, run_cmd, cleanup, RunResult
+from typing import List
+from verifier.sandbox import mkworkdir, run_batch, run_batch_async, cleanup, RunResult, DEFAULT_TIMEOUT
+from verifier.build_cache import build, build_async
+from telemetry.metrics import count_timeouts, span
 
+# Batch harness: compiled once, reads one argument tuple per stdin line and
+# prints one marked result line per case (see verifier.sandbox.run_batch).
+# Like the C harness, every case runs in a forked child so static/global
+# state does not carry over between cases.
 CPP_TEMPLATE = r"""// GENERATED
 #include <bits/stdc++.h>
+#include <csignal>
+#ifndef _WIN32
+#include <unistd.h>
+#include <sys/wait.h>
+#endif
+#ifdef __linux__
+#include <sys/prctl.h>
+#endif
 using namespace std;
 
 {user_code}
 
-int __ct_dispatch(int argc, char** argv){
-    switch(argc-1){
-        case 0: return {func_name}();
-        case 1: return {func_name}(stoi(argv[1]));
-        case 2: return {func_name}(stoi(argv[1]), stoi(argv[2]));
-        case 3: return {func_name}(stoi(argv[1]), stoi(argv[2]), stoi(argv[3]));
-        case 4: return {func_name}(stoi(argv[1]), stoi(argv[2]), stoi(argv[3]), stoi(argv[4]));
-        default: return 0;
-    }
-}
-
-int main(int argc, char** argv){
-    int out = __ct_dispatch(argc, argv);
-    cout << out << "\n";
+static string ct_call(int *a){{
+    (void)a;
+    ostringstream os;
+    os << {func_name}({call_args});
+    return os.str();
+}}
+
+int main(int argc, char **argv){{
+    unsigned limit = argc > 1 ? (unsigned)atoi(argv[1]) : 0;
+    (void)limit;
+    string line;
+    while (getline(cin, line)) {{
+        int a[{slots}] = {{0}};
+        const char* p = line.c_str();
+        char* end;
+        for (int i = 0; i < {nargs}; i++) {{
+            a[i] = (int)strtol(p, &end, 10);
+            p = end;
+        }}
+        (void)p;
+#ifdef _WIN32
+        string res = ct_call(a);
+#else
+        int fd[2];
+        if (pipe(fd) != 0) return 70;
+        cout.flush();
+        fflush(stdout);
+        pid_t parent = getpid(), pid = fork();
+        if (pid < 0) return 71;
+        if (pid == 0) {{
+#ifdef __linux__
+            prctl(PR_SET_PDEATHSIG, SIGKILL);
+#endif
+            if (getppid() != parent) _exit(1);
+            if (limit) alarm(limit);
+            close(fd[0]);
+            string out = ct_call(a);
+            cout.flush();
+            fflush(stdout);
+            _exit(write(fd[1], out.data(), out.size()) == (ssize_t)out.size() ? 0 : 72);
+        }}
+        close(fd[1]);
+        string res;
+        char buf[4096];
+        ssize_t n;
+        while ((n = read(fd[0], buf, sizeof buf)) > 0) res.append(buf, (size_t)n);
+        close(fd[0]);
+        int st = 0;
+        waitpid(pid, &st, 0);
+        if (res.empty()) {{
+            if (WIFSIGNALED(st)) {{ signal(WTERMSIG(st), SIG_DFL); raise(WTERMSIG(st)); }}
+            return WIFEXITED(st) ? WEXITSTATUS(st) : 1;
+        }}
+#endif
+        cout << "@@CT@@ " << res << endl;
+    }}
     return 0;
-}
+}}
 """
 
-def run_cpp_func(code: str, func_name: str, args: list[int]) -> RunResult:
+COMPILE_CMD = ["g++", "prog.cpp", "-O2", "-std=c++17", "-o", "prog.exe"]
+
+def _harness(code: str, func_name: str, nargs: int) -> str:
+    return CPP_TEMPLATE.format(
+        user_code=code, func_name=func_name, nargs=nargs, slots=max(nargs, 1),
+        call_args=", ".join(f"a[{i}]" for i in range(nargs)),
+    )
+
+def run_cpp_batch(code: str, func_name: str, cases: List[List[int]], timeout: int = DEFAULT_TIMEOUT) -> List[RunResult]:
+    """Build the harness once (or reuse a cached build) and run every case through it."""
+    if not cases:
+        return []
     work = mkworkdir("ct_cpp_")
     try:
-        src = CPP_TEMPLATE.format(user_code=code, func_name=func_name)
-        cppfile = work / "prog.cpp"
-        exe = work / "prog.exe"
-        write_file(cppfile, src)
-
-        cc = run_cmd(["g++", str(cppfile), "-O2", "-std=c++17", "-o", str(exe)], cwd=work)
-        if not cc.ok:
-            return cc
-        rr = run_cmd([str(exe), *map(str, args)], cwd=work)
-        return rr
+        exe_dir, cc = build({"prog.cpp": _harness(code, func_name, len(cases[0]))}, COMPILE_CMD, ["prog.exe"], into=work)
+        if exe_dir is None:
+            return [cc] * len(cases)
+        with span("run", "cpp"):
+            results = run_batch([str(exe_dir / "prog.exe"), str(int(timeout) + 1)], work, cases, timeout=timeout)
+        count_timeouts("cpp", results)
+        return results
     finally:
         cleanup(work)
+
+async def run_cpp_batch_async(code: str, func_name: str, cases: List[List[int]], timeout: int = DEFAULT_TIMEOUT) -> List[RunResult]:
+    """asyncio twin of run_cpp_batch (compile and run via asyncio subprocesses)."""
+    if not cases:
+        return []
+    work = mkworkdir("ct_cpp_")
+    try:
+        exe_dir, cc = await build_async({"prog.cpp": _harness(code, func_name, len(cases[0]))}, COMPILE_CMD, ["prog.exe"], into=work)
+        if exe_dir is None:
+            return [cc] * len(cases)
+        with span("run", "cpp"):
+            results = await run_batch_async([str(exe_dir / "prog.exe"), str(int(timeout) + 1)], work, cases, timeout=timeout)
+        count_timeouts("cpp", results)
+        return results
+    finally:
+        cleanup(work)
+
+def run_cpp_func(code: str, func_name: str, args: list[int]) -> RunResult:
+    return run_cpp_batch(code, func_name, [args])[0]
@@ -1,7 +1,12 @@
 # verifier/runners/java_runner.py
 from __future__ import annotations
+import asyncio
 from pathlib import Path
-from verifier.sandbox import mkworkdir, write_file, run_cmd, cleanup, RunResult
+from typing import List
+from verifier.sandbox import mkworkdir, run_cmd, cleanup, RunResult
+from verifier.build_cache import build
+from verifier.runners.java_worker import get_pool
+from telemetry.metrics import count_timeouts, span
 
 TRANSLATED_TEMPLATE = """\
 // GENERATED
@@ -40,13 +45,41 @@ def run_java_func(code: str, func_name: str, args: list[int]) -> RunResult:
         translated = TRANSLATED_TEMPLATE.format(user_code=code)
         main = MAIN_TEMPLATE.format(func_name=func_name)
 
-        write_file(work / "Translated.java", translated)
-        write_file(work / "Main.java", main)
-
-        c = run_cmd(["javac", "Translated.java", "Main.java"], cwd=work)
-        if not c.ok:
+        classes, c = build(
+            {"Translated.java": translated, "Main.java": main},
+            ["javac", "Translated.java", "Main.java"],
+            ["*.class"],
+            into=work,
+        )
+        if classes is None:
             return c
-        r = run_cmd(["java", "Main", *map(str, args)], cwd=work)
+        r = run_cmd(["java", "-cp", str(classes), "Main", *map(str, args)], cwd=work)
         return r
     finally:
         cleanup(work)
+
+def run_java_batch(code: str, func_name: str, cases: List[List[int]]) -> List[RunResult]:
+    """
+    Run every case on a warm JVM from the worker pool (compiled in memory once
+    per call). Falls back to cold per-case runs when the pool is disabled or
+    cannot start (e.g. a JRE without the compiler API).
+    """
+    if not cases:
+        return []
+    with span("run", "java"):  # the pool compiles in memory, so this includes javac time
+        results = _run_java_cases(code, func_name, cases)
+    count_timeouts("java", results)
+    return results
+
+def _run_java_cases(code: str, func_name: str, cases: List[List[int]]) -> List[RunResult]:
+    pool = get_pool()
+    if pool is not None:
+        try:
+            return pool.run(TRANSLATED_TEMPLATE.format(user_code=code), func_name, cases)
+        except (RuntimeError, OSError) as e:
+            print(f"⚠️ Java worker pool unavailable, using cold runs: {e}")
+    return [run_java_func(code, func_name, args) for args in cases]
+
+async def run_java_batch_async(code: str, func_name: str, cases: List[List[int]]) -> List[RunResult]:
+    """Async entry point: the pool round-trip is a blocking pipe read, so it runs in a thread."""
+    return await asyncio.to_thread(run_java_batch, code, func_name, cases)
@@ -0,0 +1,281 @@
+# verifier/runners/java_worker.py
+from __future__ import annotations
+import atexit, base64, os, threading
+from pathlib import Path
+from typing import List, Optional
+from verifier.sandbox import mkworkdir, write_file, run_cmd, cleanup, LineProcess, WorkerPool, RunResult, DEFAULT_TIMEOUT
+
+# Long-lived JVM that compiles submitted sources in memory (javax.tools),
+# loads them in a throwaway classloader per case and runs a whole batch of
+# cases (so static state is isolated exactly like one JVM per case).
+#
+# Protocol (one request per stdin line, base64 keeps payloads on one line):
+#   -> JOB \t <func> \t <ncases> \t b64(<Translated.java>) \t <case>;<case>;...   (case = a,b,c)
+#   <- COMPILED | CERR \t b64(<diagnostics>)
+#   <- OK \t b64(<stdout>) | ERR \t b64(<stack trace>)     (one per case)
+#   <- END
+WORKER_SOURCE = r"""// GENERATED
+import javax.tools.*;
+import java.io.*;
+import java.lang.reflect.*;
+import java.net.URI;
+import java.nio.charset.StandardCharsets;
+import java.util.*;
+
+public class CtWorker {
+    static final class Source extends SimpleJavaFileObject {
+        final String code;
+        Source(String name, String code) {
+            super(URI.create("string:///" + name + ".java"), Kind.SOURCE);
+            this.code = code;
+        }
+        @Override public CharSequence getCharContent(boolean ignoreEncodingErrors) { return code; }
+    }
+
+    static final class ClassBytes extends SimpleJavaFileObject {
+        final ByteArrayOutputStream bytes = new ByteArrayOutputStream();
+        ClassBytes(String name) {
+            super(URI.create("bytes:///" + name.replace('.', '/') + ".class"), Kind.CLASS);
+        }
+        @Override public OutputStream openOutputStream() { return bytes; }
+    }
+
+    static final class MemoryManager extends ForwardingJavaFileManager<StandardJavaFileManager> {
+        final Map<String, ClassBytes> classes = new HashMap<>();
+        MemoryManager(StandardJavaFileManager fm) { super(fm); }
+        @Override public JavaFileObject getJavaFileForOutput(Location loc, String name, JavaFileObject.Kind kind, FileObject sibling) {
+            ClassBytes cb = new ClassBytes(name);
+            classes.put(name, cb);
+            return cb;
+        }
+    }
+
+    static final class MemoryLoader extends ClassLoader {
+        final Map<String, ClassBytes> classes;
+        MemoryLoader(Map<String, ClassBytes> classes) {
+            super(CtWorker.class.getClassLoader());
+            this.classes = classes;
+        }
+        @Override protected Class<?> findClass(String name) throws ClassNotFoundException {
+            ClassBytes cb = classes.get(name);
+            if (cb == null) throw new ClassNotFoundException(name);
+            byte[] b = cb.bytes.toByteArray();
+            return defineClass(name, b, 0, b.length);
+        }
+    }
+
+    static final PrintStream PROTO = System.out;
+    static final JavaCompiler COMPILER = ToolProvider.getSystemJavaCompiler();
+
+    static String b64(String s) {
+        return Base64.getEncoder().encodeToString(s.getBytes(StandardCharsets.UTF_8));
+    }
+
+    static String unb64(String s) {
+        return new String(Base64.getDecoder().decode(s), StandardCharsets.UTF_8);
+    }
+
+    static String trace(Throwable t) {
+        StringWriter sw = new StringWriter();
+        t.printStackTrace(new PrintWriter(sw));
+        return sw.toString();
+    }
+
+    public static void main(String[] args) throws Exception {
+        if (COMPILER == null) {
+            PROTO.println("FATAL\t" + b64("no system Java compiler available (JRE without javac?)"));
+            PROTO.flush();
+            return;
+        }
+        PROTO.println("READY");
+        PROTO.flush();
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        String line;
+        while ((line = in.readLine()) != null) {
+            if (line.isEmpty()) continue;
+            handle(line.split("\t", -1));
+            PROTO.println("END");
+            PROTO.flush();
+        }
+    }
+
+    static void handle(String[] parts) {
+        String func = parts[1];
+        int n = Integer.parseInt(parts[2]);
+        String source = unb64(parts[3]);
+        String[] cases = parts[4].split(";", -1);
+
+        DiagnosticCollector<JavaFileObject> diags = new DiagnosticCollector<>();
+        MemoryManager fm = new MemoryManager(COMPILER.getStandardFileManager(diags, null, StandardCharsets.UTF_8));
+        List<JavaFileObject> units = Collections.singletonList(new Source("Translated", source));
+        boolean ok = COMPILER.getTask(null, fm, diags, null, null, units).call();
+        if (!ok) {
+            StringBuilder sb = new StringBuilder();
+            for (Diagnostic<? extends JavaFileObject> d : diags.getDiagnostics()) sb.append(d.toString()).append('\n');
+            PROTO.println("CERR\t" + b64(sb.toString()));
+            return;
+        }
+        try {
+            new MemoryLoader(fm.classes).loadClass("Translated");
+        } catch (Throwable t) {
+            PROTO.println("CERR\t" + b64(trace(t)));
+            return;
+        }
+        PROTO.println("COMPILED");
+        PROTO.flush();
+
+        for (int c = 0; c < n; c++) {
+            String[] toks = cases[c].isEmpty() ? new String[0] : cases[c].split(",");
+            Object[] argv = new Object[toks.length];
+            Class<?>[] sig = new Class<?>[toks.length];
+            for (int i = 0; i < toks.length; i++) {
+                argv[i] = Integer.parseInt(toks[i]);
+                sig[i] = int.class;
+            }
+            ByteArrayOutputStream captured = new ByteArrayOutputStream();
+            PrintStream cap = new PrintStream(captured, true);
+            System.setOut(cap);
+            try {
+                // a fresh loader per case re-runs static initializers, so static
+                // fields cannot carry state from one case into the next
+                Class<?> cls = new MemoryLoader(fm.classes).loadClass("Translated");
+                Method m = cls.getDeclaredMethod(func, sig);
+                m.setAccessible(true);
+                Object out = m.invoke(null, argv);
+                cap.flush();
+                PROTO.println("OK\t" + b64(captured.toString() + String.valueOf(out) + "\n"));
+            } catch (InvocationTargetException e) {
+                PROTO.println("ERR\t" + b64(trace(e.getCause())));
+            } catch (Throwable t) {
+                PROTO.println("ERR\t" + b64(trace(t)));
+            } finally {
+                System.setOut(PROTO);
+            }
+            PROTO.flush();
+        }
+    }
+}
+"""
+
+POOL_SIZE = int(os.getenv("CT_JAVA_WORKERS", "2"))           # 0 disables the warm pool
+MAX_JOBS = int(os.getenv("CT_JAVA_WORKER_MAX_JOBS", "200"))  # recycle a JVM after this many jobs
+STARTUP_TIMEOUT = 30  # seconds for a cold JVM to report READY
+COMPILE_TIMEOUT = 30  # seconds for the in-memory compile of one job
+
+def _b64(s: str) -> str:
+    return base64.b64encode(s.encode("utf-8")).decode("ascii")
+
+def _unb64(s: str) -> str:
+    return base64.b64decode(s).decode("utf-8", errors="replace")
+
+class JavaWorker:
+    """One warm JVM running CtWorker."""
+    def __init__(self, classdir: Path):
+        self.classdir = classdir
+        self.jobs = 0
+        self.lp = LineProcess(["java", "-cp", str(classdir), "CtWorker"], cwd=classdir)
+        try:
+            line = self.lp.readline(STARTUP_TIMEOUT)
+        except TimeoutError:
+            line = None
+        if line != "READY":
+            self.kill()
+            detail = _unb64(line.split("\t", 1)[1]) if line and line.startswith("FATAL\t") else self.lp.stderr_text()
+            raise RuntimeError(f"Java worker failed to start: {detail or line}")
+
+    @property
+    def alive(self) -> bool:
+        return self.lp.alive
+
+    def kill(self):
+        self.lp.kill()
+
+    def run(self, source: str, func_name: str, cases: List[List[int]], timeout: int, results: List[RunResult]) -> bool:
+        """
+        Run cases, appending one RunResult each. Stops at the first crash or
+        hang and returns False, meaning this worker must be recycled.
+        """
+        self.jobs += 1
+        payload = ";".join(",".join(map(str, args)) for args in cases)
+        if not self.lp.send("\t".join(["JOB", func_name, str(len(cases)), _b64(source), payload]) + "\n"):
+            return False
+        try:
+            head = self.lp.readline(COMPILE_TIMEOUT)
+            if head is None:
+                return False
+            if head.startswith("CERR\t"):
+                cerr = RunResult(False, 1, "", _unb64(head.split("\t", 1)[1]), self.classdir)
+                results.extend([cerr] * len(cases))
+                return self.lp.readline(DEFAULT_TIMEOUT) == "END"
+            for _ in cases:
+                line = self.lp.readline(timeout)
+                if line is None:
+                    results.append(RunResult(False, -1, "", self.lp.stderr_text() or "Java worker exited", self.classdir))
+                    return False
+                kind, _, body = line.partition("\t")
+                if kind == "OK":
+                    results.append(RunResult(True, 0, _unb64(body), "", self.classdir))
+                else:
+                    results.append(RunResult(False, 1, "", _unb64(body), self.classdir))
+            return self.lp.readline(DEFAULT_TIMEOUT) == "END"
+        except TimeoutError:
+            results.append(RunResult(False, -1, "", f"TIMEOUT after {timeout}s", self.classdir))
+            return False
+
+class JavaWorkerPool(WorkerPool):
+    """Bounded pool of warm JVMs; hung, crashed or worn-out workers are replaced."""
+    def __init__(self, size: int = POOL_SIZE, max_jobs: int = MAX_JOBS):
+        super().__init__(size, max_jobs)
+        self._classdir: Optional[Path] = None
+
+    def _bootstrap(self) -> Path:
+        with self._lock:
+            if self._classdir is None:
+                work = mkworkdir("ct_javaw_")
+                write_file(work / "CtWorker.java", WORKER_SOURCE)
+                c = run_cmd(["javac", "CtWorker.java"], cwd=work, timeout=COMPILE_TIMEOUT)
+                if not c.ok:
+                    cleanup(work)
+                    raise RuntimeError(f"Could not compile Java worker: {c.stderr}")
+                self._classdir = work
+            return self._classdir
+
+    def _spawn(self) -> JavaWorker:
+        return JavaWorker(self._bootstrap())
+
+    def run(self, source: str, func_name: str, cases: List[List[int]], timeout: int = DEFAULT_TIMEOUT) -> List[RunResult]:
+        """Run all cases, moving to a fresh worker after a crash or timeout."""
+        results: List[RunResult] = []
+        while len(results) < len(cases):
+            w = self.acquire()
+            done, healthy = len(results), False
+            try:
+                healthy = w.run(source, func_name, cases[len(results):], timeout, results)
+                if not healthy and len(results) == done:
+                    # died before answering anything: charge it to the next case so we make progress
+                    results.append(RunResult(False, -1, "", w.lp.stderr_text() or "Java worker exited", w.classdir))
+            finally:
+                self.release(w, healthy)
+        return results
+
+    def shutdown(self):
+        super().shutdown()
+        with self._lock:
+            if self._classdir is not None:
+                cleanup(self._classdir)
+                self._classdir = None
+
+_pool: Optional[JavaWorkerPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> Optional[JavaWorkerPool]:
+    """Shared pool, or None when disabled with CT_JAVA_WORKERS=0."""
+    global _pool
+    if POOL_SIZE <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = JavaWorkerPool()
+                atexit.register(_pool.shutdown)
+    return _pool
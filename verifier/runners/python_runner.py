@@ -1,7 +1,11 @@
 # verifier/runners/python_runner.py
 from __future__ import annotations
+import asyncio
 from pathlib import Path
+from typing import List
 from verifier.sandbox import mkworkdir, write_file, run_cmd, cleanup, RunResult
+from verifier.runners.python_worker import get_pool
+from telemetry.metrics import count_timeouts, span
 
 TEMPLATE = """\
 # GENERATED
@@ -27,3 +31,29 @@ def run_python_func(code: str, func_name: str, args: list[int]) -> RunResult:
         return run_cmd(["python", str(script), *map(str, args)], cwd=work)
     finally:
         cleanup(work)
+
+def run_python_batch(code: str, func_name: str, cases: List[List[int]]) -> List[RunResult]:
+    """
+    Run every case on a pre-started worker (one round-trip, forked child with
+    rlimits). Falls back to one interpreter per case when the pool is disabled
+    or unavailable (no os.fork on Windows).
+    """
+    if not cases:
+        return []
+    with span("run", "python"):
+        results = _run_python_cases(code, func_name, cases)
+    count_timeouts("python", results)
+    return results
+
+def _run_python_cases(code: str, func_name: str, cases: List[List[int]]) -> List[RunResult]:
+    pool = get_pool()
+    if pool is not None:
+        try:
+            return pool.run(code, func_name, cases)
+        except (RuntimeError, OSError) as e:
+            print(f"⚠️ Python worker pool unavailable, using one interpreter per case: {e}")
+    return [run_python_func(code, func_name, args) for args in cases]
+
+async def run_python_batch_async(code: str, func_name: str, cases: List[List[int]]) -> List[RunResult]:
+    """Async entry point: the pool round-trip is a blocking pipe read, so it runs in a thread."""
+    return await asyncio.to_thread(run_python_batch, code, func_name, cases)
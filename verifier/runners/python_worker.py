@@ -0,0 +1,191 @@
+# verifier/runners/python_worker.py
+from __future__ import annotations
+import atexit, json, os, select, signal, sys, threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from verifier.sandbox import mkworkdir, cleanup, LineProcess, WorkerPool, RunResult, DEFAULT_TIMEOUT
+
+# Pre-started Python interpreters that fork one short-lived child per job
+# (forkserver style): the child applies rlimits, execs the submitted code and
+# streams one JSON result per case back over a pipe. The worker enforces the
+# per-case timeout, kills a hung or crashed child and forks a fresh one for the
+# remaining cases, then answers the whole batch in a single JSON line.
+#
+# Protocol: -> {"code", "func_name", "cases", "timeout", "mem_mb"}   <- {"results": [...]}
+
+ROOT = Path(__file__).resolve().parents[2]
+POOL_SIZE = int(os.getenv("CT_PY_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0 disables the pool
+MAX_JOBS = int(os.getenv("CT_PY_WORKER_MAX_JOBS", "500"))
+MEM_LIMIT_MB = int(os.getenv("CT_PY_MEM_MB", "512"))  # RLIMIT_AS for each child; 0 = unlimited
+STARTUP_TIMEOUT = 10
+
+# ---------- Worker side (runs inside the pre-started interpreter) ----------
+def _apply_limits(cpu_seconds: int, mem_mb: int):
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+        if mem_mb > 0:
+            limit = mem_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass  # best effort: not every platform supports every limit
+
+def _child(job: Dict[str, Any], cases: List[List[int]], wfd: int):
+    import contextlib, io, traceback
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)  # keep stray writes to fd 1 off the protocol channel
+    _apply_limits(int(job["timeout"]) * len(cases) + 1, int(job["mem_mb"]))
+    out = os.fdopen(wfd, "w", encoding="utf-8")
+    try:
+        prog = compile(job["code"], "prog.py", "exec")
+    except SyntaxError:
+        prog, err = None, traceback.format_exc()
+    for args in cases:
+        cap = io.StringIO()
+        if prog is None:
+            res = {"ok": False, "exit_code": 1, "stdout": "", "stderr": err}
+        else:
+            try:
+                with contextlib.redirect_stdout(cap):
+                    ns: Dict[str, Any] = {"__name__": "__main__"}  # fresh namespace per case, like a new interpreter
+                    exec(prog, ns)
+                    print(ns[job["func_name"]](*args))
+                res = {"ok": True, "exit_code": 0, "stdout": cap.getvalue(), "stderr": ""}
+            except BaseException:
+                res = {"ok": False, "exit_code": 1, "stdout": cap.getvalue(), "stderr": traceback.format_exc()}
+        out.write(json.dumps(res) + "\n")
+        out.flush()
+
+def _fork_run(job: Dict[str, Any], cases: List[List[int]], results: List[Dict[str, Any]]):
+    """Run cases in one forked child until they are done or the child dies/hangs."""
+    rfd, wfd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(rfd)
+        try:
+            _child(job, cases, wfd)
+        finally:
+            os._exit(0)
+    os.close(wfd)
+    timeout = float(job["timeout"])
+    buf = b""
+    try:
+        for _ in cases:
+            while b"\n" not in buf:
+                ready, _, _ = select.select([rfd], [], [], timeout)
+                if not ready:
+                    os.kill(pid, signal.SIGKILL)
+                    results.append({"ok": False, "exit_code": -1, "stdout": "", "stderr": f"TIMEOUT after {job['timeout']}s"})
+                    return
+                chunk = os.read(rfd, 65536)
+                if not chunk:
+                    _, status = os.waitpid(pid, 0)
+                    pid = 0
+                    code = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+                    results.append({"ok": False, "exit_code": code or -1, "stdout": "",
+                                    "stderr": f"python child exited with code {code} (killed by a resource limit?)"})
+                    return
+                buf += chunk
+            line, buf = buf.split(b"\n", 1)
+            results.append(json.loads(line))
+    finally:
+        os.close(rfd)
+        if pid:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            os.waitpid(pid, 0)
+
+def serve():
+    """Worker main loop: one JSON job per stdin line, one JSON reply per job."""
+    proto = sys.stdout
+    proto.write("READY\n")
+    proto.flush()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        cases = job["cases"]
+        results: List[Dict[str, Any]] = []
+        while len(results) < len(cases):
+            _fork_run(job, cases[len(results):], results)
+        proto.write(json.dumps({"results": results}) + "\n")
+        proto.flush()
+
+# ---------- Pool side (runs in the API process) ----------
+class PythonWorker:
+    """One pre-started interpreter running serve()."""
+    def __init__(self):
+        self.jobs = 0
+        self.workdir = mkworkdir("ct_pyw_")
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.getenv("PYTHONPATH")]))}
+        self.lp = LineProcess([sys.executable, "-u", "-m", "verifier.runners.python_worker"], cwd=self.workdir, env=env)
+        try:
+            line = self.lp.readline(STARTUP_TIMEOUT)
+        except TimeoutError:
+            line = None
+        if line != "READY":
+            self.kill()
+            raise RuntimeError(f"Python worker failed to start: {self.lp.stderr_text() or line}")
+
+    @property
+    def alive(self) -> bool:
+        return self.lp.alive
+
+    def kill(self):
+        self.lp.kill()
+        cleanup(self.workdir)
+
+    def run(self, code: str, func_name: str, cases: List[List[int]], timeout: int) -> Optional[List[RunResult]]:
+        """All results in one round-trip, or None if the worker itself misbehaved."""
+        self.jobs += 1
+        job = {"code": code, "func_name": func_name, "cases": cases, "timeout": timeout, "mem_mb": MEM_LIMIT_MB}
+        if not self.lp.send(json.dumps(job) + "\n"):
+            return None
+        try:
+            line = self.lp.readline(timeout * (len(cases) + 1) + STARTUP_TIMEOUT)
+        except TimeoutError:
+            return None
+        if not line:
+            return None
+        return [RunResult(r["ok"], r["exit_code"], r["stdout"], r["stderr"], self.workdir)
+                for r in json.loads(line)["results"]]
+
+class PythonWorkerPool(WorkerPool):
+    def __init__(self, size: int = POOL_SIZE, max_jobs: int = MAX_JOBS):
+        super().__init__(size, max_jobs)
+
+    def _spawn(self) -> PythonWorker:
+        return PythonWorker()
+
+    def run(self, code: str, func_name: str, cases: List[List[int]], timeout: int = DEFAULT_TIMEOUT) -> List[RunResult]:
+        w = self.acquire()
+        results = None
+        try:
+            results = w.run(code, func_name, cases, timeout)
+        finally:
+            self.release(w, results is not None)
+        if results is None:
+            err = RunResult(False, -1, "", w.lp.stderr_text() or "Python worker stopped responding", w.workdir)
+            return [err] * len(cases)
+        return results
+
+_pool: Optional[PythonWorkerPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> Optional[PythonWorkerPool]:
+    """Shared pool, or None when disabled (CT_PY_WORKERS=0) or without os.fork (Windows)."""
+    global _pool
+    if POOL_SIZE <= 0 or not hasattr(os, "fork"):
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PythonWorkerPool()
+                atexit.register(_pool.shutdown)
+    return _pool
+
+if __name__ == "__main__":
+    serve()
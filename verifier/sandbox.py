@@ -1,10 +1,13 @@
 # verifier/sandbox.py
 from __future__ import annotations
-import shutil, subprocess, tempfile, textwrap, os
+import asyncio, shutil, subprocess, tempfile, textwrap, os, queue, threading, time
 from pathlib import Path
 from typing import List, Optional, Tuple
 
 DEFAULT_TIMEOUT = 5  # seconds (can be tweaked per language)
+BATCH_MARK = "@@CT@@"  # prefix of a per-case result line printed by batch harnesses
+ACQUIRE_TIMEOUT = float(os.getenv("CT_WORKER_ACQUIRE_TIMEOUT", "60"))  # seconds to wait for a pooled worker
+MAX_CASE_OUTPUT = 64 * 1024  # characters of user-code stdout kept per batch case
 
 class RunResult:
     def __init__(self, ok: bool, exit_code: int, stdout: str, stderr: str, workdir: Path):
@@ -34,3 +37,315 @@ def run_cmd(cmd: List[str], cwd: Path, timeout: int = DEFAULT_TIMEOUT) -> RunRes
 def cleanup(path: Path):
     if path.exists():
         shutil.rmtree(path, ignore_errors=True)
+
+class LineProcess:
+    """
+    Subprocess whose stdout is pumped line by line into a queue, so reads can
+    time out without blocking the caller (works the same on Windows and POSIX).
+    """
+    def __init__(self, cmd: List[str], cwd: Path, env: Optional[dict] = None):
+        self.proc = subprocess.Popen(
+            cmd, cwd=str(cwd), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, text=True, bufsize=1, env=env,
+        )
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._err: List[str] = []
+        self._err_thread = threading.Thread(target=self._pump_err, daemon=True)
+        self._err_thread.start()
+        threading.Thread(target=self._pump_out, daemon=True).start()
+
+    def _pump_out(self):
+        for line in self.proc.stdout:
+            self._lines.put(line.rstrip("\r\n"))
+        self._lines.put(None)  # EOF
+
+    def _pump_err(self):
+        for line in self.proc.stderr:
+            self._err.append(line)
+
+    def send(self, text: str) -> bool:
+        try:
+            self.proc.stdin.write(text)
+            self.proc.stdin.flush()
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def feed(self, text: str):
+        """Write all of stdin from a helper thread and close it (never blocks the caller)."""
+        def _write():
+            self.send(text)
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+        threading.Thread(target=_write, daemon=True).start()
+
+    def readline(self, timeout: float) -> Optional[str]:
+        """Next stdout line, None on EOF. Raises TimeoutError if nothing arrives in time."""
+        try:
+            return self._lines.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no output after {timeout}s") from None
+
+    def wait(self, timeout: float = DEFAULT_TIMEOUT) -> int:
+        try:
+            return self.proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.kill()
+            return -1
+
+    def stderr_text(self) -> str:
+        self._err_thread.join(timeout=1)
+        return "".join(self._err)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def kill(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+        try:
+            self.proc.wait(timeout=DEFAULT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            pass
+
+class WorkerPool:
+    """
+    Bounded pool of long-lived workers. Subclasses implement _spawn(); a worker
+    exposes .alive, .jobs and .kill(). Unhealthy or worn-out workers are
+    killed on release and replaced lazily: a caller waiting for a worker is
+    woken when one is returned or retired (and then spawns the replacement).
+    acquire() gives up with RuntimeError after `acquire_timeout` seconds.
+    """
+    def __init__(self, size: int, max_jobs: int, acquire_timeout: float = ACQUIRE_TIMEOUT):
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.acquire_timeout = acquire_timeout
+        self._idle: List = []
+        self._cond = threading.Condition()  # guards _idle and _created
+        self._lock = threading.Lock()  # for subclasses' own one-time setup
+        self._created = 0
+
+    def _spawn(self):
+        raise NotImplementedError
+
+    def _unreserve(self):
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise RuntimeError(f"no worker became free within {self.acquire_timeout:g}s")
+                self._cond.wait(left)
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1  # reserve a slot, spawn outside the lock
+        try:
+            return self._spawn()
+        except Exception:
+            self._unreserve()
+            raise
+
+    def prestart(self, n: Optional[int] = None) -> int:
+        """Spawn up to `n` (default: all) idle workers ahead of demand; returns how many started."""
+        started = 0
+        for _ in range(self.size if n is None else min(n, self.size)):
+            with self._cond:
+                if self._created >= self.size:
+                    break
+                self._created += 1
+            try:
+                w = self._spawn()
+            except Exception:
+                self._unreserve()
+                raise
+            with self._cond:
+                self._idle.append(w)
+                self._cond.notify()
+            started += 1
+        return started
+
+    def release(self, w, healthy: bool):
+        if healthy and w.alive and w.jobs < self.max_jobs:
+            with self._cond:
+                self._idle.append(w)
+                self._cond.notify()
+            return
+        w.kill()
+        self._unreserve()  # a waiter may now spawn the replacement
+
+    def shutdown(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for w in idle:
+            w.kill()
+
+def run_batch(cmd: List[str], cwd: Path, cases: List[List[int]], timeout: int = DEFAULT_TIMEOUT) -> List[RunResult]:
+    """
+    Run a compiled batch harness over all cases and return one RunResult per case.
+    The harness reads one argument tuple per stdin line and prints one
+    BATCH_MARK-prefixed result line per case. Every case gets `timeout`
+    seconds of wall clock, however much it prints; a case that crashes or
+    times out fails on its own and the harness is restarted for the cases
+    after it.
+    """
+    results: List[RunResult] = []
+    while len(results) < len(cases):
+        lp = LineProcess(cmd, cwd)
+        lp.feed(_batch_input(cases[len(results):]))
+        out = _CaseOutput()  # stdout the user code printed for the current case
+        deadline = time.monotonic() + timeout
+        try:
+            while len(results) < len(cases):
+                line = lp.readline(max(0.0, deadline - time.monotonic()))
+                if line is None:
+                    code = lp.wait()
+                    results.append(_batch_crash(code, lp.stderr_text(), out, cwd))
+                    break
+                r = _batch_line(line, out, cwd)
+                if r is not None:
+                    results.append(r)
+                    out = _CaseOutput()
+                    deadline = time.monotonic() + timeout
+                elif time.monotonic() >= deadline:
+                    raise TimeoutError
+        except TimeoutError:
+            results.append(RunResult(False, -1, out.text(), f"TIMEOUT after {timeout}s", cwd))
+        finally:
+            lp.kill()
+    return results
+
+class _CaseOutput:
+    """Lines printed during one batch case, keeping at most MAX_CASE_OUTPUT characters."""
+    def __init__(self):
+        self.lines: List[str] = []
+        self.size = 0
+        self.truncated = False
+
+    def add(self, line: str):
+        if self.size + len(line) > MAX_CASE_OUTPUT:
+            self.truncated = True
+            return
+        self.lines.append(line)
+        self.size += len(line) + 1
+
+    def text(self) -> str:
+        return "\n".join(self.lines + (["[output truncated]"] if self.truncated else []))
+
+def _batch_input(cases: List[List[int]]) -> str:
+    return "".join(" ".join(map(str, args)) + "\n" for args in cases)
+
+def _batch_line(line: str, out: _CaseOutput, cwd: Path) -> Optional[RunResult]:
+    """Consume one harness stdout line; returns a RunResult once a case result is seen."""
+    i = line.find(BATCH_MARK)
+    if i < 0:
+        out.add(line)
+        return None
+    if line[:i]:
+        out.add(line[:i])
+    # the result value is always kept: it is the last line the comparison reads
+    lines = out.lines + [line[i + len(BATCH_MARK):].strip()]
+    return RunResult(True, 0, "\n".join(lines) + "\n", "", cwd)
+
+def _batch_crash(code: int, stderr: str, out: _CaseOutput, cwd: Path) -> RunResult:
+    msg = stderr or f"harness exited with code {code} before producing a result"
+    return RunResult(False, code if code else -1, out.text(), msg, cwd)
+
+# ---------- asyncio variants (used by the async request path) ----------
+def _decode(b: bytes) -> str:
+    return b.decode("utf-8", errors="replace")
+
+async def _reap(proc, grace: float = 0.0):
+    # Let a process that is about to exit finish on its own first: killing it
+    # makes Popen poll() and reap it behind the child watcher's back.
+    if grace and proc.returncode is None:
+        try:
+            await asyncio.wait_for(proc.wait(), grace)
+        except asyncio.TimeoutError:
+            pass
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+    await proc.wait()
+
+async def run_cmd_async(cmd: List[str], cwd: Path, timeout: int = DEFAULT_TIMEOUT) -> RunResult:
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, cwd=str(cwd), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        return RunResult(False, -1, "", f"TIMEOUT after {timeout}s", cwd)
+    finally:
+        await _reap(proc)
+    return RunResult(proc.returncode == 0, proc.returncode, _decode(out), _decode(err), cwd)
+
+async def _feed(proc, data: bytes):
+    try:
+        proc.stdin.write(data)
+        await proc.stdin.drain()
+        proc.stdin.close()
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+
+async def _discard(stream):
+    while await stream.read(1 << 16):
+        pass
+
+async def run_batch_async(cmd: List[str], cwd: Path, cases: List[List[int]], timeout: int = DEFAULT_TIMEOUT) -> List[RunResult]:
+    """asyncio twin of run_batch: same harness protocol, per-case deadline and isolation."""
+    results: List[RunResult] = []
+    loop = asyncio.get_running_loop()
+    while len(results) < len(cases):
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, cwd=str(cwd), stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        )
+        feeder = asyncio.ensure_future(_feed(proc, _batch_input(cases[len(results):]).encode("utf-8")))
+        errs = asyncio.ensure_future(proc.stderr.read())
+        out = _CaseOutput()
+        deadline = loop.time() + timeout
+        grace = 0.5  # the harness exits by itself once stdin is drained
+        try:
+            while len(results) < len(cases):
+                try:
+                    raw = await asyncio.wait_for(proc.stdout.readline(), max(0.0, deadline - loop.time()))
+                except ValueError:  # a line over the stream limit; the reader already dropped it
+                    out.truncated = True
+                    continue
+                if not raw:
+                    code = await proc.wait()
+                    try:
+                        stderr = _decode(await asyncio.wait_for(asyncio.shield(errs), 1))
+                    except asyncio.TimeoutError:
+                        stderr = ""
+                    results.append(_batch_crash(code, stderr, out, cwd))
+                    break
+                r = _batch_line(_decode(raw).rstrip("\r\n"), out, cwd)
+                if r is not None:
+                    results.append(r)
+                    out = _CaseOutput()
+                    deadline = loop.time() + timeout
+                elif loop.time() >= deadline:
+                    raise asyncio.TimeoutError
+        except asyncio.TimeoutError:
+            grace = 0.0
+            results.append(RunResult(False, -1, out.text(), f"TIMEOUT after {timeout}s", cwd))
+        finally:
+            feeder.cancel()
+            errs.cancel()
+            drain = asyncio.ensure_future(_discard(proc.stdout))  # unread output keeps wait() from returning
+            await _reap(proc, grace)
+            drain.cancel()
+    return results